@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-from utils.api import get_json, healthcheck
+from utils.api import fetch_incremental, get_json_cached, healthcheck
 from utils.fmt import pretty_ts
+from utils.stream import live_frame
 
 st.set_page_config(page_title="Overview", layout="wide")
 
@@ -12,32 +13,56 @@ if not ok:
     st.error(f"Backend unavailable: {msg}")
     st.stop()
 
-limit = st.slider("Load recent intercepts", min_value=10, max_value=500, value=100, step=10)
-ok, data, err = get_json("/admin/intercepts", params={"limit": limit})
+WINDOWS = {"Last 24h": 24, "Last 7d": 24 * 7, "Last 30d": 24 * 30, "All time": 0}
+hours = WINDOWS[st.selectbox("Window", list(WINDOWS), index=1)]
+ok, totals, err = get_json_cached("/admin/stats/overview", params={"hours": hours})
 if not ok:
     st.error(err)
     st.stop()
 
-items = data.get("items", []) if isinstance(data, dict) else []
-df = pd.DataFrame(items)
-
 col1, col2, col3, col4 = st.columns(4)
 
-total = len(df)
-high = int((df.get("risk_level") == "HIGH").sum()) if total else 0
-blocked = int((df.get("decision") == "BLOCK").sum()) if total else 0
-forced = int((df.get("forced") == 1).sum()) if total else 0
+col1.metric("Intercepts", totals.get("total", 0))
+col2.metric("High Risk", totals.get("high", 0))
+col3.metric("Blocked", totals.get("blocked", 0))
+col4.metric("Forced Releases", totals.get("forced", 0))
 
-col1.metric("Recent Intercepts", total)
-col2.metric("High Risk", high)
-col3.metric("Blocked", blocked)
-col4.metric("Forced Releases", forced)
+ok, timeline, _ = get_json_cached("/admin/stats/timeline", params={"bucket": "hour" if 0 < hours <= 48 else "day", "hours": hours})
+tl = pd.DataFrame(timeline.get("items", [])) if ok and isinstance(timeline, dict) else pd.DataFrame()
+if not tl.empty:
+    st.subheader("Decisions over time")
+    st.bar_chart(tl.set_index("bucket").drop(columns=["total", "forced"], errors="ignore"))
 
-st.subheader("Recent Intercepts (Preview)")
-if total == 0:
-    st.warning("No intercept records yet. Create a transaction from user_app to generate logs.")
-else:
+
+def load_recent() -> pd.DataFrame:
+    # Only rows newer than the last poll come over the wire after the first load.
+    ok, df, err = fetch_incremental("overview_recent", "/admin/intercepts", params={"limit": 50}, max_rows=50)
+    if not ok:
+        st.error(err)
+        st.stop()
+    return df
+
+
+def show_recent(df: pd.DataFrame, out) -> None:
+    if df.empty:
+        out.warning("No intercept records yet. Create a transaction from user_app to generate logs.")
+        return
     df_show = df.copy()
     if "ts" in df_show.columns:
         df_show["ts"] = df_show["ts"].apply(pretty_ts)
-    st.dataframe(df_show.head(50), use_container_width=True)
+    out.dataframe(df_show.head(50), use_container_width=True)
+
+
+st.subheader("Recent Intercepts (Preview)")
+live = st.toggle("Live updates", value=False, help="Follow new intercepts over /admin/intercepts/stream")
+placeholder = st.empty()
+if live:
+    live_frame(
+        "overview_live", "/admin/intercepts/stream", "intercept",
+        snapshot=load_recent,
+        render=lambda df: show_recent(df, placeholder),
+        dedupe_on=["request_id"],
+        max_rows=50,
+    )
+else:
+    show_recent(load_recent(), placeholder)
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
-from utils.api import get_json, healthcheck
+from datetime import datetime, timedelta, timezone
+from utils.api import get_json_cached, healthcheck
 from utils.fmt import pretty_ts
+from utils.stream import live_frame
 
 st.set_page_config(page_title="Intercepts", layout="wide")
 st.title("Intercepts")
@@ -13,9 +15,9 @@ if not ok:
     st.stop()
 
 # ---------- Controls ----------
-colA, colB, colC = st.columns([2, 2, 3])
+colA, colB, colC, colD = st.columns([2, 2, 3, 2])
 with colA:
-    limit = st.number_input("Limit", min_value=10, max_value=2000, value=200, step=10)
+    limit = st.number_input("Limit", min_value=10, max_value=1000, value=200, step=10)
 
 # Virtual Wallet alerts use: INFO / WARN / CRITICAL (based on your screenshots)
 with colB:
@@ -24,61 +26,111 @@ with colB:
 with colC:
     keyword = st.text_input("Search keyword (tx_id / message)", value="").strip()
 
-# ---------- Load alerts from Virtual Wallet (8002) ----------
-# NOTE: if your backend implements /api/alerts/{tx_id} and also /api/alerts?limit=,
-# this list endpoint is correct for the Intercepts page.
-ok, data, err = get_json("/api/alerts", params={"limit": int(limit)})
-if not ok:
-    st.error(err)
-    st.stop()
-
-items = data.get("alerts", []) if isinstance(data, dict) else []
-df = pd.DataFrame(items)
+RANGES = {"All time": 0, "Last 1h": 1, "Last 24h": 24, "Last 7d": 24 * 7}
+with colD:
+    hours = RANGES[st.selectbox("Time range", list(RANGES))]
 
-if df.empty:
-    st.info("No records yet.")
-    st.stop()
-
-# ---------- Normalize columns ----------
-# Ensure expected columns exist to avoid KeyError in dataframe display
-for col in ["created_at", "level", "message", "tx_id", "risk_score", "id"]:
-    if col not in df.columns:
-        df[col] = None
+live = st.toggle("Live updates", value=False, help="Follow new alerts over /api/alerts/stream instead of reloading")
 
-# ---------- Filters ----------
+# ---------- Server-side filters ----------
+# Level / keyword / time range are applied by /api/alerts (indexed + FTS), not here.
+params = {"limit": int(limit)}
 if level_filter != "ALL":
-    df = df[df["level"].fillna("").astype(str).str.upper() == level_filter]
-
+    params["level"] = level_filter
 if keyword:
-    k = keyword.lower()
-
-    def hit(row: pd.Series) -> bool:
-        tx_id = str(row.get("tx_id", "")).lower()
-        msg_ = str(row.get("message", "")).lower()
-        lvl = str(row.get("level", "")).lower()
-        return (k in tx_id) or (k in msg_) or (k in lvl)
+    params["q"] = keyword
+if hours:
+    # Whole minutes, so reruns within a minute hit the response cache.
+    since = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(hours=hours)
+    params["since"] = since.isoformat()
 
-    df = df[df.apply(hit, axis=1)]
 
-if df.empty:
-    st.warning("No matched records after filtering.")
-    st.stop()
-
-# ---------- Beautify / display ----------
-df_show = df.copy()
-
-# created_at is ISO string in Virtual Wallet
-df_show["created_at"] = df_show["created_at"].apply(lambda x: pretty_ts(x) if x else x)
-
-# Make sure types are friendly
-df_show["tx_id"] = df_show["tx_id"].astype(str)
-df_show["level"] = df_show["level"].astype(str)
-df_show["risk_score"] = pd.to_numeric(df_show["risk_score"], errors="coerce").fillna(0).astype(int)
-
-# Reorder columns for UI
-preferred_cols = ["message", "created_at", "tx_id", "level", "id", "risk_score"]
-cols = [c for c in preferred_cols if c in df_show.columns] + [c for c in df_show.columns if c not in preferred_cols]
-df_show = df_show[cols]
-
-st.caption("Tip: copy tx_id to Transaction Detail page.")
-st.dataframe(df_show, use_container_width=True)
+# ---------- Load alerts from Virtual Wallet (8002) ----------
+def load_page(cursor=None):
+    ok, data, err = get_json_cached("/api/alerts", params={**params, "cursor": cursor} if cursor else params)
+    if not ok:
+        st.error(err)
+        st.stop()
+    data = data if isinstance(data, dict) else {}
+    return pd.DataFrame(data.get("alerts", [])), data.get("next_cursor")
+
+
+def load_alerts() -> pd.DataFrame:
+    """First page plus any older pages loaded with "Load older" for these filters."""
+    first, next_cursor = load_page()
+    pages = st.session_state.get("intercepts_pages")
+    if not pages or pages["params"] != params:
+        pages = st.session_state["intercepts_pages"] = {"params": params, "older": [], "next_cursor": next_cursor}
+    return pd.concat([first, *pages["older"]], ignore_index=True)
+
+
+def matches(df: pd.DataFrame) -> pd.DataFrame:
+    # Only for pushed rows in live mode, which arrive unfiltered.
+    if level_filter != "ALL":
+        df = df[df["level"].fillna("").astype(str).str.upper() == level_filter]
+    if keyword:
+        hit = df["tx_id"].fillna("").astype(str).str.contains(keyword, case=False, regex=False)
+        hit |= df["message"].fillna("").astype(str).str.contains(keyword, case=False, regex=False)
+        df = df[hit]
+    if hours:
+        df = df[pd.to_datetime(df["created_at"], utc=True, errors="coerce") >= since]
+    return df
+
+
+def show(df: pd.DataFrame, out) -> None:
+    out = out.container()
+    if df.empty:
+        out.info("No records yet.")
+        return
+
+    # ---------- Normalize columns ----------
+    # Ensure expected columns exist to avoid KeyError in dataframe display
+    df = df.copy()
+    for col in ["created_at", "level", "message", "tx_id", "risk_score", "id"]:
+        if col not in df.columns:
+            df[col] = None
+
+    if live:
+        df = matches(df)
+
+    if df.empty:
+        out.warning("No matched records after filtering.")
+        return
+
+    # ---------- Beautify / display ----------
+    df_show = df.copy()
+
+    # created_at is ISO string in Virtual Wallet
+    df_show["created_at"] = df_show["created_at"].apply(lambda x: pretty_ts(x) if x else x)
+
+    # Make sure types are friendly
+    df_show["tx_id"] = df_show["tx_id"].astype(str)
+    df_show["level"] = df_show["level"].astype(str)
+    df_show["risk_score"] = pd.to_numeric(df_show["risk_score"], errors="coerce").fillna(0).astype(int)
+
+    # Reorder columns for UI
+    preferred_cols = ["message", "created_at", "tx_id", "level", "id", "risk_score"]
+    cols = [c for c in preferred_cols if c in df_show.columns] + [c for c in df_show.columns if c not in preferred_cols]
+    df_show = df_show[cols]
+
+    out.caption("Tip: copy tx_id to Transaction Detail page.")
+    out.dataframe(df_show, use_container_width=True)
+
+
+placeholder = st.empty()
+if live:
+    # Snapshot once, then only pushed alerts; reruns resume from the last event id.
+    live_frame(
+        f"intercepts_live:{level_filter}:{keyword}:{hours}:{limit}", "/api/alerts/stream", "alert",
+        snapshot=load_alerts,
+        render=lambda df: show(df, placeholder),
+        dedupe_on=["tx_id", "created_at", "level", "message"],
+        max_rows=int(limit),
+    )
+else:
+    show(load_alerts(), placeholder)
+    pages = st.session_state["intercepts_pages"]
+    if pages["next_cursor"] and st.button("Load older"):
+        older, pages["next_cursor"] = load_page(pages["next_cursor"])
+        pages["older"].append(older)
+        st.rerun()
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from utils.api import get_json, healthcheck
+from utils.api import get_json_cached, healthcheck
 from utils.fmt import shorten
 
 st.set_page_config(page_title="Wallets", layout="wide")
@@ -11,38 +11,24 @@ if not ok:
     st.error(f"Backend unavailable: {msg}")
     st.stop()
 
-limit = st.slider("Load intercepts for aggregation", 50, 2000, 500, 50)
+limit = st.slider("Wallets to show", 10, 1000, 200, 10)
+sort = st.selectbox("Sort by", ["max_risk", "tx_count", "blocked", "recent"])
 
-ok, data, err = get_json("/admin/intercepts", params={"limit": int(limit)})
+# Aggregated server-side from the rollup tables; only the top rows come over the wire.
+ok, data, err = get_json_cached("/admin/stats/addresses", params={"limit": int(limit), "sort": sort})
 if not ok:
     st.error(err)
     st.stop()
 
 items = data.get("items", []) if isinstance(data, dict) else []
-df = pd.DataFrame(items)
-if df.empty:
+grp = pd.DataFrame(items)
+if grp.empty:
     st.info("No records yet.")
     st.stop()
 
-# Aggregate by to_address (risk target)
-if "to_address" not in df.columns:
-    st.error("Missing to_address in data.")
-    st.stop()
-
-grp = df.groupby("to_address").agg(
-    tx_count=("request_id", "count"),
-    max_risk=("risk_score", "max"),
-    avg_risk=("risk_score", "mean"),
-    blocked=("decision", lambda s: int((s == "BLOCK").sum())),
-    forced=("forced", lambda s: int((s == 1).sum())),
-).reset_index()
-
-grp = grp.sort_values(["max_risk", "tx_count"], ascending=[False, False])
-
 st.subheader("Wallet Risk Aggregation (by to_address)")
 grp_show = grp.copy()
 grp_show["to_address"] = grp_show["to_address"].apply(lambda x: shorten(str(x), 14))
-grp_show["avg_risk"] = grp_show["avg_risk"].round(2)
 
 st.dataframe(grp_show, use_container_width=True)
 
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from utils.api import get_json, healthcheck
+from utils.api import get_json, get_json_cached, healthcheck
 from utils.fmt import pretty_ts
 
 st.set_page_config(page_title="Wallet Profile", layout="wide")
@@ -12,7 +12,7 @@ if not ok:
     st.stop()
 
 address = st.text_input("Wallet address (to_address)", value="").strip()
-limit = st.slider("Search window (recent intercepts)", 50, 2000, 500, 50)
+limit = st.slider("Recent transactions to show", 10, 1000, 200, 10)
 
 run = st.button("Build Profile", type="primary")
 
@@ -21,39 +21,30 @@ if run:
         st.warning("Please input wallet address.")
         st.stop()
 
-    ok, data, err = get_json("/admin/intercepts", params={"limit": int(limit)})
+    ok, profile, err = get_json_cached("/admin/stats/address", params={"address": address})
     if not ok:
-        st.error(err)
-        st.stop()
-
-    items = data.get("items", []) if isinstance(data, dict) else []
-    df = pd.DataFrame(items)
-    if df.empty:
-        st.info("No records.")
-        st.stop()
-
-    df = df[df.get("to_address") == address]
-    if df.empty:
-        st.warning("No records found for this address in the selected window.")
+        if "404" in str(err):
+            st.warning("No records found for this address.")
+        else:
+            st.error(err)
         st.stop()
 
-    total = len(df)
-    max_risk = int(df["risk_score"].max())
-    avg_risk = float(df["risk_score"].mean())
-    blocked = int((df["decision"] == "BLOCK").sum())
-    forced = int((df["forced"] == 1).sum())
-
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Tx Count", total)
-    col2.metric("Max Risk", max_risk)
-    col3.metric("Avg Risk", round(avg_risk, 2))
-    col4.metric("Blocked / Forced", f"{blocked} / {forced}")
+    col1.metric("Tx Count", profile["tx_count"])
+    col2.metric("Max Risk", profile["max_risk"])
+    col3.metric("Avg Risk", profile["avg_risk"])
+    col4.metric("Blocked / Forced", f"{profile['blocked']} / {profile['forced']}")
 
     st.subheader("Risk Distribution")
-    st.bar_chart(df["risk_score"].value_counts().sort_index())
+    hist = pd.Series({int(k): v for k, v in profile.get("risk_histogram", {}).items()}).sort_index()
+    st.bar_chart(hist)
 
     st.subheader("Recent Transactions to this Wallet")
-    df_show = df.copy()
+    ok, data, err = get_json("/admin/intercepts/page", params={"to_address": address, "limit": int(limit)})
+    if not ok:
+        st.error(err)
+        st.stop()
+    df_show = pd.DataFrame(data.get("items", []) if isinstance(data, dict) else [])
     if "ts" in df_show.columns:
         df_show["ts"] = df_show["ts"].apply(pretty_ts)
-    st.dataframe(df_show.sort_values("ts", ascending=False), use_container_width=True)
+    st.dataframe(df_show, use_container_width=True)
@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-from utils.api import get_json, healthcheck
+from utils.api import fetch_incremental, healthcheck
 from utils.fmt import pretty_ts
 
 st.set_page_config(page_title="Reports", layout="wide")
@@ -13,20 +12,18 @@ if not ok:
 
 limit = st.number_input("Export last N intercepts", min_value=10, max_value=5000, value=500, step=50)
 
-ok, data, err = get_json("/admin/intercepts", params={"limit": int(limit)})
+# Reruns (e.g. the download click) only fetch rows logged since the previous load.
+ok, df, err = fetch_incremental("reports", "/admin/intercepts", params={"limit": int(limit)}, max_rows=int(limit))
 if not ok:
     st.error(err)
     st.stop()
 
-items = data.get("items", []) if isinstance(data, dict) else []
-df = pd.DataFrame(items)
-
 if df.empty:
     st.info("No data to export.")
     st.stop()
 
 if "ts" in df.columns:
-    df["ts"] = df["ts"].apply(pretty_ts)
+    df = df.assign(ts=df["ts"].apply(pretty_ts))
 
 st.dataframe(df.head(50), use_container_width=True)
 
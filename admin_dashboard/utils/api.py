@@ -1,9 +1,24 @@
 import os
 import requests
-from typing import Any, Dict, Optional, Tuple
+import pandas as pd
+import streamlit as st
+from datetime import timedelta
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 DEFAULT_BACKEND = "http://127.0.0.1:8002"
 
+# 只读接口的缓存时间（秒），以及健康检查结果的缓存时间
+CACHE_TTL_S = float(os.getenv("DASHBOARD_CACHE_TTL_S", 5))
+HEALTH_TTL_S = float(os.getenv("DASHBOARD_HEALTH_TTL_S", 15))
+# 增量拉取时回看的秒数，覆盖写入延迟（异步批量写入）与随后的更新
+INCREMENTAL_OVERLAP_S = float(os.getenv("DASHBOARD_INCREMENTAL_OVERLAP_S", 5))
+
+
+class _FetchError(Exception):
+    pass
+
+
 def backend_base() -> str:
     # 优先环境变量，其次默认本地
     return os.getenv("BACKEND_URL", DEFAULT_BACKEND).rstrip("/")
@@ -13,20 +28,49 @@ def _url(path: str) -> str:
         path = "/" + path
     return backend_base() + path
 
+@st.cache_resource
+def _session() -> requests.Session:
+    # 所有页面、所有 rerun 共用一个 keep-alive 连接池
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _get(url: str, params: Optional[Dict[str, Any]], timeout: int) -> Any:
+    try:
+        r = _session().get(url, params=params, timeout=timeout)
+    except Exception as e:
+        raise _FetchError(str(e))
+    if r.status_code >= 400:
+        raise _FetchError(f"HTTP {r.status_code}: {r.text[:200]}")
+    return r.json()
+
 def get_json(path: str, params: Optional[Dict[str, Any]] = None, timeout: int = 10) -> Tuple[bool, Any, str]:
     try:
-        r = requests.get(_url(path), params=params, timeout=timeout)
-        if r.status_code >= 400:
-            return False, None, f"HTTP {r.status_code}: {r.text[:200]}"
-        return True, r.json(), ""
+        return True, _get(_url(path), params, timeout), ""
+    except Exception as e:
+        return False, None, str(e)
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def _get_cached(url: str, params: Tuple[Tuple[str, Any], ...], timeout: int) -> Any:
+    # 失败时抛异常，st.cache_data 不缓存异常，下次 rerun 会重试
+    return _get(url, dict(params), timeout)
+
+def get_json_cached(path: str, params: Optional[Dict[str, Any]] = None, timeout: int = 10) -> Tuple[bool, Any, str]:
+    """get_json, but identical (endpoint, params) within CACHE_TTL_S share one response."""
+    try:
+        return True, _get_cached(_url(path), tuple(sorted((params or {}).items())), timeout), ""
     except Exception as e:
         return False, None, str(e)
 
 def post_json(path: str, json: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None, timeout: int = 10) -> Tuple[bool, Any, str]:
     try:
-        r = requests.post(_url(path), json=json, params=params, timeout=timeout)
+        r = _session().post(_url(path), json=json, params=params, timeout=timeout)
         if r.status_code >= 400:
             return False, None, f"HTTP {r.status_code}: {r.text[:200]}"
+        # 写操作之后，缓存的读结果可能已过期
+        _get_cached.clear()
         # 有些接口可能不返回 json
         try:
             return True, r.json(), ""
@@ -35,10 +79,54 @@ def post_json(path: str, json: Optional[Dict[str, Any]] = None, params: Optional
     except Exception as e:
         return False, None, str(e)
 
+@st.cache_data(ttl=HEALTH_TTL_S, show_spinner=False)
+def _health(url: str) -> str:
+    data = _get(url, None, 5)
+    if isinstance(data, dict) and data.get("status") == "ok":
+        return "ok"
+    raise _FetchError(f"unexpected response: {data}")
+
 def healthcheck() -> Tuple[bool, str]:
-    ok, data, err = get_json("/health")
+    # 只缓存成功结果：后端恢复后下一次 rerun 即可看到
+    try:
+        return True, _health(_url("/health"))
+    except Exception as e:
+        return False, str(e)
+
+def fetch_incremental(
+    key: str,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    items_key: str = "items",
+    ts_col: str = "ts",
+    id_cols: Sequence[str] = ("request_id",),
+    max_rows: int = 2000,
+) -> Tuple[bool, pd.DataFrame, str]:
+    """
+    Rows of `path` kept in session_state; each call only asks for rows with
+    `since` >= the newest one already held (minus INCREMENTAL_OVERLAP_S) and
+    merges them in, newest version of a row winning. Changing `params`
+    starts over with a full fetch.
+    """
+    state = st.session_state.setdefault(f"incremental:{key}", {"params": None, "df": pd.DataFrame(), "since": None})
+    if state["params"] != params:
+        state.update(params=params, df=pd.DataFrame(), since=None)
+
+    query = dict(params or {})
+    if state["since"]:
+        query["since"] = state["since"]
+    ok, data, err = get_json(path, params=query)
     if not ok:
-        return False, err
-    if isinstance(data, dict) and data.get("status") == "ok":
-        return True, "ok"
-    return False, f"unexpected response: {data}"
+        return False, state["df"], err
+
+    new = pd.DataFrame(data.get(items_key, []) if isinstance(data, dict) else [])
+    if new.empty:
+        return True, state["df"], ""
+    df = pd.concat([new, state["df"]], ignore_index=True)
+    df = df.drop_duplicates(subset=[c for c in id_cols if c in df.columns], keep="first")
+    newest = pd.to_datetime(df[ts_col], utc=True, errors="coerce")
+    df = df.assign(_ts=newest).sort_values("_ts", ascending=False).drop(columns="_ts").head(max_rows)
+    state["df"] = df.reset_index(drop=True)
+    if not pd.isna(newest.max()):
+        state["since"] = (newest.max() - timedelta(seconds=INCREMENTAL_OVERLAP_S)).isoformat()
+    return True, state["df"], ""
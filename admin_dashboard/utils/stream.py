@@ -0,0 +1,61 @@
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import requests
+import streamlit as st
+
+from .api import backend_base
+
+# 服务端每 15 秒发送心跳，超过该时间无数据视为断线
+READ_TIMEOUT_S = 45
+
+
+def sse_events(path: str, cursor: Optional[int] = None) -> Iterator[Tuple[int, str, Any]]:
+    """Yield (id, event, data) from a Server-Sent Events endpoint; resumes after `cursor`."""
+    params = {"cursor": cursor} if cursor is not None else None
+    with requests.get(backend_base() + path, params=params, stream=True, timeout=(5, READ_TIMEOUT_S)) as r:
+        r.raise_for_status()
+        frame: Dict[str, str] = {}
+        for line in r.iter_lines(decode_unicode=True):
+            if line:
+                if not line.startswith(":"):  # ":" = heartbeat comment
+                    field, _, value = line.partition(":")
+                    frame[field] = value.lstrip(" ")
+                continue
+            if "event" in frame:
+                yield int(frame.get("id", 0)), frame["event"], json.loads(frame.get("data") or "null")
+            frame = {}
+
+
+def live_frame(
+    key: str,
+    path: str,
+    event: str,
+    snapshot: Callable[[], pd.DataFrame],
+    render: Callable[[pd.DataFrame], None],
+    dedupe_on: List[str],
+    max_rows: int = 500,
+):
+    """
+    Keep a DataFrame in session_state and append pushed rows to it.
+
+    The snapshot is downloaded once (and again after a `reset`); afterwards
+    only new rows arrive over the stream. Reruns reconnect from the stored
+    cursor, so nothing is re-downloaded or missed. Blocks until the next
+    rerun, re-rendering on every event.
+    """
+    state = st.session_state.setdefault(key, {"df": None, "cursor": None})
+    if state["df"] is not None:
+        render(state["df"])
+    for event_id, name, data in sse_events(path, state["cursor"]):
+        state["cursor"] = event_id
+        if name == "reset" or (name == "hello" and state["df"] is None):
+            state["df"] = snapshot()
+        elif name == event:
+            # Newest first; the snapshot may already hold rows pushed right after "hello".
+            df = pd.concat([pd.DataFrame([data]), state["df"]], ignore_index=True)
+            state["df"] = df.drop_duplicates(subset=[c for c in dedupe_on if c in df.columns]).head(max_rows)
+        else:
+            continue
+        render(state["df"])
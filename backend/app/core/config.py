@@ -20,3 +20,77 @@ RISK_THRESHOLDS = {
     "REQUIRE_CONFIRM_MIN": int(os.getenv("REQUIRE_CONFIRM_MIN", 70)),
     "BLOCK_MIN": int(os.getenv("BLOCK_MIN", 90)),
 }
+
+# /risk/predict 微批处理（micro-batching）
+BATCH_ENABLED = os.getenv("BATCH_ENABLED", "1") == "1"
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", 2))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 64))
+BATCH_RESULT_TIMEOUT_S = float(os.getenv("BATCH_RESULT_TIMEOUT_S", 10))
+
+# /risk/predict/batch 单次请求最大行数
+BATCH_ENDPOINT_MAX_ROWS = int(os.getenv("BATCH_ENDPOINT_MAX_ROWS", 100000))
+
+# 评分引擎：sklearn（参考实现）/ booster（inplace_predict）/ numpy（展平树）
+SCORING_ENGINE = os.getenv("SCORING_ENGINE", "sklearn")
+SCORING_ENGINE_TOLERANCE = float(os.getenv("SCORING_ENGINE_TOLERANCE", 1e-5))
+
+# 模型注册表：模型目录 / 当前模型名 / 热加载轮询间隔（0 = 关闭）
+MODEL_DIR = Path(os.getenv("MODEL_DIR", str(Path(__file__).resolve().parents[1] / "models")))
+MODEL_NAME = os.getenv("MODEL_NAME", "xgboost_aml_model")
+MODEL_PREFER_UBJ = os.getenv("MODEL_PREFER_UBJ", "1") == "1"
+MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", 5))
+# 由 .pkl 导出的 .ubj 缓存目录（派生文件，不写入代码目录）；
+# SCORING_ENGINE=numpy 时展平后的树数组也导出到这里，各 worker 以 mmap 只读共享
+MODEL_CACHE_DIR = Path(os.getenv("MODEL_CACHE_DIR", str(BASE_DIR / "data" / "model_cache")))
+
+# SQLite：写锁等待时间（毫秒），避免并发写入出现 "database is locked"
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+
+# intercept_log 异步批量写入（group commit）
+INTERCEPT_WRITER_ENABLED = os.getenv("INTERCEPT_WRITER_ENABLED", "1") == "1"
+INTERCEPT_BATCH_MAX = int(os.getenv("INTERCEPT_BATCH_MAX", 256))
+INTERCEPT_FLUSH_MS = float(os.getenv("INTERCEPT_FLUSH_MS", 5))
+INTERCEPT_QUEUE_MAX = int(os.getenv("INTERCEPT_QUEUE_MAX", 10000))
+INTERCEPT_ENQUEUE_TIMEOUT_S = float(os.getenv("INTERCEPT_ENQUEUE_TIMEOUT_S", 1))
+# 1 = 请求等待所在批次提交后再返回
+INTERCEPT_DURABLE = os.getenv("INTERCEPT_DURABLE", "0") == "1"
+INTERCEPT_DURABLE_TIMEOUT_S = float(os.getenv("INTERCEPT_DURABLE_TIMEOUT_S", 5))
+
+# 黑/白名单内存索引：从 list_changes 增量同步的轮询间隔（秒，0 = 关闭）
+LIST_SYNC_INTERVAL_S = float(os.getenv("LIST_SYNC_INTERVAL_S", 1))
+
+# 大规模制裁地址过滤器（Bloom + 有序表，mmap 共享）；文件前缀，留空 = 关闭
+SANCTIONS_FILTER_PREFIX = os.getenv("SANCTIONS_FILTER_PREFIX", str(BASE_DIR / "data" / "sanctions"))
+# 重建后的过滤器文件多久被重新检测/打开（秒）
+SANCTIONS_RELOAD_INTERVAL_S = float(os.getenv("SANCTIONS_RELOAD_INTERVAL_S", 5))
+
+# 地址规范化（TRON/ETH -> 20/21 字节二进制键）的解码缓存条目数
+ADDRESS_CACHE_SIZE = int(os.getenv("ADDRESS_CACHE_SIZE", 65536))
+
+# 地址速度特征（1m / 1h / 24h 滑动窗口）：跟踪地址数上限（LRU）、每窗口对手方上限
+VELOCITY_MAX_ADDRESSES = int(os.getenv("VELOCITY_MAX_ADDRESSES", 50000))
+VELOCITY_MAX_COUNTERPARTIES = int(os.getenv("VELOCITY_MAX_COUNTERPARTIES", 1024))
+# 同一 request_id 只计入一次（/risk/check 与 /risk/predict 重复上报）：记住最近多少个 request_id
+VELOCITY_SEEN_REQUESTS = int(os.getenv("VELOCITY_SEEN_REQUESTS", 100000))
+# 速度规则阈值：1 分钟内笔数（突发）、1 小时内不同转入方（归集/骡子）、24 小时内临界金额笔数（拆分）
+VELOCITY_BURST_1M = int(os.getenv("VELOCITY_BURST_1M", 10))
+VELOCITY_FAN_IN_1H = int(os.getenv("VELOCITY_FAN_IN_1H", 10))
+VELOCITY_STRUCTURING_24H = int(os.getenv("VELOCITY_STRUCTURING_24H", 3))
+# 拆分交易的"临界金额"区间 [LOW, HIGH)
+STRUCTURING_BAND_LOW = float(os.getenv("STRUCTURING_BAND_LOW", 9000))
+STRUCTURING_BAND_HIGH = float(os.getenv("STRUCTURING_BAND_HIGH", 10000))
+# /risk/predict 是否把速度特征写入模型向量第 1..36 维。现有模型按 Elliptic 特征训练，
+# 这些槽位含义不同，未重新训练/验证前保持关闭（关闭时仍记录速度，只是不改向量）
+PREDICT_FILL_VELOCITY = os.getenv("PREDICT_FILL_VELOCITY", "0") == "1"
+
+# 决策缓存（可选）：相同 (链, 地址, 金额档, 模型版本, 名单版本) 的结果直接复用
+DECISION_CACHE_ENABLED = os.getenv("DECISION_CACHE_ENABLED", "0") == "1"
+DECISION_CACHE_TTL_S = float(os.getenv("DECISION_CACHE_TTL_S", 30))
+DECISION_CACHE_MAX = int(os.getenv("DECISION_CACHE_MAX", 100000))
+
+# /admin/intercepts 数据源：local = 本地 intercept_log；federated = 本地 + 钱包 /api/alerts 合并
+INTERCEPTS_SOURCE = os.getenv("INTERCEPTS_SOURCE", "local")
+INTERCEPTS_FEDERATED_TTL_S = float(os.getenv("INTERCEPTS_FEDERATED_TTL_S", 2))
+WALLET_BASE_URL = os.getenv("WALLET_BASE_URL", "http://127.0.0.1:8002")
+WALLET_POOL_SIZE = int(os.getenv("WALLET_POOL_SIZE", 8))
+WALLET_TIMEOUT_S = float(os.getenv("WALLET_TIMEOUT_S", 2))
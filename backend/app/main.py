@@ -1,17 +1,67 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import json
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Sequence, Union
 
-import requests
-
-import joblib
 import numpy as np
-from fastapi import FastAPI, HTTPException
-
-from .models.schemas import AMLInput, AMLPrediction, RiskResult, TxReceipt, TxRequest
-from .services.risk_engine import assess, make_request_id
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+
+from .core.config import (
+    BATCH_ENABLED,
+    BATCH_ENDPOINT_MAX_ROWS,
+    BATCH_MAX_SIZE,
+    BATCH_RESULT_TIMEOUT_S,
+    BATCH_WINDOW_MS,
+    INTERCEPT_BATCH_MAX,
+    INTERCEPT_DURABLE,
+    INTERCEPT_DURABLE_TIMEOUT_S,
+    INTERCEPT_ENQUEUE_TIMEOUT_S,
+    INTERCEPT_FLUSH_MS,
+    INTERCEPT_QUEUE_MAX,
+    INTERCEPT_WRITER_ENABLED,
+    INTERCEPTS_SOURCE,
+    MODEL_CACHE_DIR,
+    MODEL_DIR,
+    MODEL_NAME,
+    MODEL_PREFER_UBJ,
+    MODEL_WATCH_INTERVAL_S,
+    PREDICT_FILL_VELOCITY,
+    SCORING_ENGINE,
+    SCORING_ENGINE_TOLERANCE,
+)
+from .models.schemas import (
+    AMLBatchInput,
+    AMLBatchPrediction,
+    AMLInput,
+    AMLParties,
+    AMLPrediction,
+    AMLSparseInput,
+    RiskResult,
+    TxReceipt,
+    TxRequest,
+)
+from .services.batcher import MicroBatcher
+from .services.feature_extract import observe_row, observe_rows
+from .services.inference import FLOAT32_CONTENT_TYPE, decode_float32_body, decode_float32_matrix, densify_sparse
+from .services.list_index import list_index
+from .services.registry import ModelRegistry
+from .services.sanctions import get_sanctions_filter
+from .services.decision_cache import decision_cache, predict_key
+from .services.federation import close_client as close_wallet_client
+from .services.federation import federated_intercepts
+from .services.risk_engine import assess_cached
+from .services.velocity import velocity_store
+from .storage.db import close_all
+from .storage.writer import GroupCommitWriter, WriterBusy
+from .utils import stats as dashboard_stats
+from .utils.events import SSE_HEADERS, intercept_bus, parse_cursor
+from .utils.ids import new_request_id
 from .utils.logger import (
     get_by_request_id,
     get_recent_intercepts,
@@ -20,51 +70,67 @@ from .utils.logger import (
     list_get,
     list_remove,
     log_intercept,
+    log_intercepts,
+    query_intercepts,
 )
 
 # ============================================================
-# Configuration
+# Model registry (lazy, hot-reloadable)
 # ============================================================
 
-BASE_DIR = Path(__file__).resolve().parent
-MODEL_PATH = BASE_DIR / "models" / "xgboost_aml_model.pkl"
-
+registry = ModelRegistry(
+    MODEL_DIR,
+    MODEL_NAME,
+    engine_name=SCORING_ENGINE,
+    tolerance=SCORING_ENGINE_TOLERANCE,
+    prefer_ubj=MODEL_PREFER_UBJ,
+    watch_interval_s=MODEL_WATCH_INTERVAL_S,
+    cache_dir=MODEL_CACHE_DIR,
+)
 
-# ============================================================
-# Model loading + expected feature dim (Route A: auto-detect)
-# ============================================================
 
-def _load_model(model_path: Path):
-    try:
-        return joblib.load(model_path)
-    except Exception as e:
-        # Fail fast at startup (avoid runtime 500 later)
-        raise RuntimeError(f"Failed to load model from {model_path}: {e}") from e
+def _score(X: np.ndarray):
+    return registry.get().engine.score(X)
 
 
-def _infer_expected_dim(model) -> Optional[int]:
-    # 1) sklearn-style estimator
-    dim = getattr(model, "n_features_in_", None)
-    if isinstance(dim, int) and dim > 0:
-        return dim
+# Coalesces concurrent /risk/predict calls into one scoring call per batch.
+batcher = MicroBatcher(
+    _score,
+    window_ms=BATCH_WINDOW_MS,
+    max_batch=BATCH_MAX_SIZE,
+)
 
-    # 2) xgboost booster fallback
-    try:
-        booster = model.get_booster()
-        dim2 = booster.num_features()
-        if isinstance(dim2, int) and dim2 > 0:
-            return dim2
-    except Exception:
-        pass
+# Write-behind queue: /risk/check no longer waits on SQLite commits.
+intercept_writer = GroupCommitWriter(
+    log_intercepts,
+    max_batch=INTERCEPT_BATCH_MAX,
+    flush_ms=INTERCEPT_FLUSH_MS,
+    max_queue=INTERCEPT_QUEUE_MAX,
+    enqueue_timeout_s=INTERCEPT_ENQUEUE_TIMEOUT_S,
+)
 
-    return None
 
+def _record_intercept(row):
+    try:
+        if intercept_writer.running:
+            intercept_writer.write(row, durable=INTERCEPT_DURABLE, timeout=INTERCEPT_DURABLE_TIMEOUT_S)
+        else:
+            log_intercept(row)
+    except WriterBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except concurrent.futures.TimeoutError:
+        # Still queued: it may commit later, but the caller cannot rely on it.
+        raise HTTPException(
+            status_code=503,
+            detail=f"intercept {row['request_id']} not committed within {INTERCEPT_DURABLE_TIMEOUT_S}s",
+        )
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"intercept {row['request_id']} not logged: {e}")
 
-model = _load_model(MODEL_PATH)
-EXPECTED_DIM: Optional[int] = _infer_expected_dim(model)
 
-print("MODEL PATH =", MODEL_PATH)
-print("MODEL EXPECTED_DIM =", EXPECTED_DIM)
+def _intercept_row(request_id: str):
+    # Rows still waiting in the write-behind queue are not in SQLite yet.
+    return intercept_writer.pending(request_id) or get_by_request_id(request_id)
 
 
 # ============================================================
@@ -77,6 +143,31 @@ app = FastAPI(title="Wallet Firewall API")
 @app.on_event("startup")
 def _startup():
     init_db()
+    list_index.start()
+    # Load at startup (not import) so a broken model still fails fast.
+    loaded = registry.get()
+    print("MODEL =", loaded.version, "from", loaded.path)
+    print("MODEL EXPECTED_DIM =", loaded.expected_dim)
+    print("SCORING ENGINE =", loaded.engine.name)
+    registry.start_watching()
+    if BATCH_ENABLED:
+        batcher.start()
+    if INTERCEPT_WRITER_ENABLED:
+        intercept_writer.start()
+
+
+@app.on_event("shutdown")
+def _shutdown():
+    batcher.stop()
+    registry.stop_watching()
+    intercept_writer.stop()
+    list_index.stop()
+    close_all()
+
+
+@app.on_event("shutdown")
+async def _shutdown_async():
+    await close_wallet_client()
 
 
 @app.get("/")
@@ -100,8 +191,11 @@ def health():
 @app.post("/risk/check", response_model=RiskResult)
 def risk_check(req: TxRequest):
     # Keep field naming stable (amount_usdt) to avoid breaking other code paths.
-    request_id = make_request_id(req.chain, req.to_address, req.amount_usdt)
-    score, level, decision, reasons, votes = assess(req.chain, req.to_address, req.amount_usdt)
+    request_id = new_request_id()
+    model_version = registry.get().version if decision_cache.enabled else ""
+    (score, level, decision, reasons, votes), cache_key, cache_hit = assess_cached(
+        req.chain, req.to_address, req.amount_usdt, req.from_address, model_version, request_id
+    )
 
     row = {
         "request_id": request_id,
@@ -116,8 +210,10 @@ def risk_check(req: TxRequest):
         "reason_codes": ",".join(reasons),
         "forced": 0,
         "tx_hash": None,
+        "cache_key": cache_key,
+        "cache_hit": int(cache_hit),
     }
-    log_intercept(row)
+    _record_intercept(row)
 
     return RiskResult(
         risk_score=score,
@@ -134,39 +230,254 @@ def risk_check(req: TxRequest):
 # ============================================================
 
 @app.post("/risk/predict", response_model=AMLPrediction)
-def predict_risk(tx: AMLInput):
-    if EXPECTED_DIM is None:
-        raise HTTPException(
-            status_code=500,
-            detail="Model expected feature dimension is unknown (EXPECTED_DIM=None).",
-        )
+async def predict_risk(request: Request):
+    """
+    Score one transfer.
+
+    The body is JSON {"features": [...]} (dense), JSON {"indices": [...],
+    "values": [...]} (sparse: omitted slots are 0), or a one-row float32
+    matrix with Content-Type application/octet-stream. JSON bodies are
+    told apart by their keys.
+
+    JSON bodies may also carry chain / from_address / to_address /
+    request_id (query parameters for float32 bodies); with a to_address
+    the transfer is recorded in the velocity store, once per request_id,
+    so a /risk/check followed by /risk/predict with the request_id the
+    check returned counts it once.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
 
-    if len(tx.features) != EXPECTED_DIM:
-        raise HTTPException(
-            status_code=400,
-            detail=f"features must be length {EXPECTED_DIM}",
-        )
+    try:
+        if content_type == FLOAT32_CONTENT_TYPE:
+            X = decode_float32_matrix(body)
+            if X.shape[0] != 1:
+                raise ValueError("expected exactly one row")
+            features = X[0]
+            parties = AMLParties.model_validate(dict(request.query_params))
+        else:
+            payload = json.loads(body)
+            if isinstance(payload, dict) and "indices" in payload:
+                # Densified against the model's dimension in _prepare_features.
+                features = parties = AMLSparseInput.model_validate(payload)
+            else:
+                parties = AMLInput.model_validate(payload)
+                features = parties.features
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid payload: {e}")
+
+    args = (features, parties.to_address, parties.from_address, parties.chain, parties.request_id)
+    if batcher.running:
+        # Wait on the batcher's future from the event loop: no threadpool
+        # thread is parked per request, so concurrency is not capped by it.
+        return await _score_features_batched(*args)
+    return await run_in_threadpool(score_features, *args)
+
+
+class ScoringError(Exception):
+    """Raised by score_features / score_rows; mapped to `status_code` for HTTP callers."""
 
-    X = np.array([tx.features], dtype=np.float32)
+    status_code = 500
 
+
+class ModelNotReady(ScoringError):
+    status_code = 500
+
+
+class InvalidFeatures(ScoringError):
+    status_code = 400
+
+
+class BatchTooLarge(ScoringError):
+    status_code = 413
+
+
+class InferenceFailed(ScoringError):
+    status_code = 500
+
+
+@app.exception_handler(ScoringError)
+async def _scoring_error(request: Request, exc: ScoringError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
+def _expected_dim(current) -> int:
+    if current.expected_dim is None:
+        raise ModelNotReady("Model expected feature dimension is unknown (EXPECTED_DIM=None).")
+    return current.expected_dim
+
+
+def _densify(sparse: AMLSparseInput, expected_dim: int) -> np.ndarray:
+    if sparse.dim is not None and sparse.dim != expected_dim:
+        raise InvalidFeatures(f"features must be length {expected_dim}")
     try:
-        label = int(model.predict(X)[0])
+        return densify_sparse(sparse.indices, sparse.values, expected_dim)
+    except ValueError as e:
+        raise InvalidFeatures(str(e)) from e
+
+
+def _prepare_features(features, to_address, from_address, chain, request_id):
+    """(model, row, cache key, cached prediction) for one transfer."""
+    current = registry.get()
+    expected_dim = _expected_dim(current)
+    if isinstance(features, AMLSparseInput):
+        features = _densify(features, expected_dim)
+    if len(features) != expected_dim:
+        raise InvalidFeatures(f"features must be length {expected_dim}")
+
+    if to_address:
+        features = observe_row(features, to_address, from_address, chain, request_id, fill=PREDICT_FILL_VELOCITY)
 
-        # Some models have predict_proba, some don't; handle both.
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X)[0]
-            score = float(proba[1]) if len(proba) > 1 else float(proba[0])
+    key = cached = None
+    if decision_cache.enabled:
+        key = predict_key(current.version, features)
+        cached = decision_cache.get(key)
+    return current, features, key, cached
+
+
+def _prediction(label: int, score: float, key: Optional[str]) -> AMLPrediction:
+    result = AMLPrediction(
+        prediction="illicit" if label == 1 else "licit",
+        risk_score=round(score, 4),
+    )
+    if key is not None:
+        decision_cache.put(key, result)
+    return result
+
+
+def score_features(
+    features: Union[Sequence[float], AMLSparseInput],
+    to_address: Optional[str] = None,
+    from_address: Optional[str] = None,
+    chain: Optional[str] = None,
+    request_id: Optional[str] = None,
+) -> AMLPrediction:
+    """
+    Score one feature vector against the active model.
+
+    Backs /risk/predict and is also called directly by co-located callers
+    (the wallet service's in-process AML transport) to skip the HTTP hop.
+    With a to_address the transfer is recorded in the velocity store, and
+    with PREDICT_FILL_VELOCITY slots 1..36 are filled from it (see
+    services/feature_extract.py).
+    Raises ScoringError subclasses, never HTTPException.
+    """
+    current, features, key, cached = _prepare_features(features, to_address, from_address, chain, request_id)
+    if cached is not None:
+        return cached
+
+    try:
+        if batcher.running:
+            label, score = batcher.predict(features, timeout=BATCH_RESULT_TIMEOUT_S)
         else:
-            # If no probability output, use 1.0/0.0 fallback
-            score = 1.0 if label == 1 else 0.0
+            X = np.array([features], dtype=np.float32)
+            labels, scores = current.engine.score(X)
+            label, score = int(labels[0]), float(scores[0])
 
     except Exception as e:
         # Return clear error for shape mismatch / inference failures
-        raise HTTPException(status_code=500, detail=f"Model inference failed: {e}")
+        raise InferenceFailed(f"Model inference failed: {e}") from e
+
+    return _prediction(label, score, key)
+
+
+async def _score_features_batched(
+    features: Union[Sequence[float], AMLSparseInput],
+    to_address: Optional[str] = None,
+    from_address: Optional[str] = None,
+    chain: Optional[str] = None,
+    request_id: Optional[str] = None,
+) -> AMLPrediction:
+    """score_features for the event loop: awaits the batcher instead of blocking on it."""
+    # The model lookup (which may load it) and the velocity store's lock
+    # run in the threadpool; the thread is released before the batch wait.
+    _, features, key, cached = await run_in_threadpool(
+        _prepare_features, features, to_address, from_address, chain, request_id
+    )
+    if cached is not None:
+        return cached
 
-    return AMLPrediction(
-        prediction="illicit" if label == 1 else "licit",
-        risk_score=round(score, 4),
+    try:
+        label, score = await asyncio.wait_for(asyncio.wrap_future(batcher.submit(features)), BATCH_RESULT_TIMEOUT_S)
+    except Exception as e:
+        raise InferenceFailed(f"Model inference failed: {e}") from e
+
+    return _prediction(label, score, key)
+
+
+@app.post("/risk/predict/batch", response_model=AMLBatchPrediction)
+async def predict_risk_batch(request: Request):
+    """
+    Score N feature vectors in one vectorized predict_proba call.
+
+    Accepts either JSON {"features": [[...], ...]} or a binary body with
+    Content-Type application/octet-stream (see services/inference.py for
+    the float32 header layout). Optional per-row parties ("parties" in
+    JSON, a JSON trailer after the float32 matrix) are recorded in the
+    velocity store row by row, exactly as /risk/predict records them.
+    """
+    current = registry.get()
+    _expected_dim(current)
+
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    try:
+        if content_type == FLOAT32_CONTENT_TYPE:
+            X, trailer = decode_float32_body(body)
+            parties = _PARTIES_LIST.validate_json(trailer) if trailer else None
+        else:
+            payload = AMLBatchInput.model_validate_json(body)
+            X = np.array(payload.features or [[]], dtype=np.float32)[: len(payload.features)]
+            if X.ndim != 2:
+                raise ValueError("features must be a list of equal-length rows")
+            parties = payload.parties
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch payload: {e}")
+
+    return await run_in_threadpool(score_rows, X, current, parties)
+
+
+_PARTIES_LIST = TypeAdapter(List[AMLParties])
+
+
+def score_rows(X: np.ndarray, current=None, parties: Optional[Sequence[AMLParties]] = None) -> AMLBatchPrediction:
+    """
+    Score a float32 (N, dim) matrix in one engine call.
+
+    Backs /risk/predict/batch and the wallet's in-process batch transport.
+    With `parties` (one per row) each transfer is recorded in the velocity
+    store in row order, and filled in with PREDICT_FILL_VELOCITY, so a
+    batch scores like the same transfers sent one by one.
+    Raises ScoringError subclasses, never HTTPException.
+    """
+    current = current or registry.get()
+    expected_dim = _expected_dim(current)
+
+    if X.shape[0] > BATCH_ENDPOINT_MAX_ROWS:
+        raise BatchTooLarge(f"batch exceeds {BATCH_ENDPOINT_MAX_ROWS} rows")
+
+    if X.shape[0] and X.shape[1] != expected_dim:
+        raise InvalidFeatures(f"features must be length {expected_dim}")
+
+    if X.shape[0] == 0:
+        return AMLBatchPrediction(count=0, predictions=[], risk_scores=[])
+
+    if parties is not None:
+        try:
+            X = observe_rows(X, parties, fill=PREDICT_FILL_VELOCITY)
+        except ValueError as e:
+            raise InvalidFeatures(str(e)) from e
+
+    try:
+        labels, scores = current.engine.score(X)
+    except Exception as e:
+        raise InferenceFailed(f"Model inference failed: {e}") from e
+
+    return AMLBatchPrediction(
+        count=int(X.shape[0]),
+        predictions=np.where(labels == 1, "illicit", "licit").tolist(),
+        risk_scores=np.round(scores.astype(np.float64), 4).tolist(),
     )
 
 
@@ -176,7 +487,7 @@ def predict_risk(tx: AMLInput):
 
 @app.post("/tx/send", response_model=TxReceipt)
 def tx_send(request_id: str, forced: bool = False):
-    row = get_by_request_id(request_id)
+    row = _intercept_row(request_id)
     if not row:
         raise HTTPException(status_code=404, detail="request_id not found")
 
@@ -186,7 +497,7 @@ def tx_send(request_id: str, forced: bool = False):
     tx_hash = f"tx_{request_id}"
     row["forced"] = 1 if forced else 0
     row["tx_hash"] = tx_hash
-    log_intercept(row)
+    _record_intercept(row)
 
     status = "FORCED_LOGGED" if forced else "FORWARDED"
     return TxReceipt(status=status, request_id=request_id, tx_hash=tx_hash)
@@ -197,23 +508,171 @@ def tx_send(request_id: str, forced: bool = False):
 # ============================================================
 
 @app.get("/admin/intercepts")
-def admin_intercepts(limit: int = 200):
+async def admin_intercepts(limit: int = 200, source: Optional[str] = None, since: Optional[str] = None):
+    """Recent intercepts, newest first; `since` (ISO, inclusive) returns only newer rows.
+
+    source=local (default, INTERCEPTS_SOURCE) reads this backend's intercept_log;
+    source=federated also merges in the wallet service's alerts.
+    """
+    limit = max(1, min(limit, 1000))
+    source = source or INTERCEPTS_SOURCE
+    try:
+        if source == "federated":
+            return await federated_intercepts(limit, since)
+        if source != "local":
+            raise HTTPException(status_code=400, detail="source must be local or federated")
+        return {"items": await run_in_threadpool(get_recent_intercepts, limit, since)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"invalid since: {e}")
+
+
+@app.get("/admin/intercepts/stream")
+async def admin_intercepts_stream(cursor: Optional[str] = None, last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events: one `intercept` event per logged row, resumable by event id."""
+    try:
+        start = parse_cursor(cursor, last_event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    start = intercept_bus.cursor if start is None else start
+    return StreamingResponse(
+        intercept_bus.stream(start, "intercept"), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+@app.get("/admin/intercepts/events")
+def admin_intercepts_events(cursor: Optional[int] = None):
+    """Polling form of the stream: rows logged after `cursor` plus the cursor to send next.
+
+    Without a cursor returns just the current one (take it before loading a
+    snapshot). `reset` means rows were missed and the snapshot should be reloaded.
+    """
+    if cursor is None:
+        return {"items": [], "cursor": intercept_bus.cursor, "reset": False}
+    events, reset = intercept_bus.since(cursor)
+    return {
+        "items": [event for _, event in events],
+        "cursor": events[-1][0] if events else min(cursor, intercept_bus.cursor),
+        "reset": reset,
+    }
+
+
+@app.get("/admin/intercepts/page")
+def admin_intercepts_page(
+    limit: int = 200,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    to_address: Optional[str] = None,
+    decision: Optional[str] = None,
+    risk_level: Optional[str] = None,
+):
+    """Keyset-paginated intercept_log; pass back `next_cursor` for the next page."""
+    limit = max(1, min(limit, 1000))
     try:
-        r = requests.get(
-            "http://127.0.0.1:8002/api/alerts",
-            params={"limit": limit},
-            timeout=5
+        items, next_cursor = query_intercepts(
+            limit, cursor, since, to_address=to_address, decision=decision, risk_level=risk_level
         )
-        r.raise_for_status()
-        data = r.json()
-        return {"items": data.get("alerts", [])}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _since_us(hours: int) -> int:
+    """Epoch microseconds `hours` ago; hours <= 0 means all time."""
+    if hours <= 0:
+        return 0
+    return int((datetime.now(timezone.utc).timestamp() - hours * 3600) * 1_000_000)
+
+
+@app.get("/admin/stats/overview")
+def admin_stats_overview(hours: int = 0):
+    """Totals from the rollup tables: intercepts, high risk, blocked, forced."""
+    return dashboard_stats.overview(_since_us(hours))
+
+
+@app.get("/admin/stats/timeline")
+def admin_stats_timeline(bucket: str = "hour", hours: int = 24 * 7):
+    try:
+        return {"items": dashboard_stats.timeline(_since_us(hours), bucket)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/admin/stats/addresses")
+def admin_stats_addresses(limit: int = 100, sort: str = "max_risk"):
+    """Per-address tx_count, max/avg risk, blocked and forced counts."""
+    limit = max(1, min(limit, 1000))
+    try:
+        return {"items": dashboard_stats.top_addresses(limit, sort)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/admin/stats/address")
+def admin_stats_address(address: str):
+    profile = dashboard_stats.address_profile(address)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="no intercepts for this address")
+    return profile
+
+
+@app.get("/admin/stats/risk-histogram")
+def admin_stats_risk_histogram():
+    return {"items": dashboard_stats.risk_histogram()}
+
+
+@app.get("/admin/stats/edges")
+def admin_stats_edges(limit: int = 200):
+    limit = max(1, min(limit, 2000))
+    return {"items": dashboard_stats.top_edges(limit)}
+
+
+@app.get("/admin/batcher")
+def admin_batcher():
+    return batcher.stats()
+
+
+@app.get("/admin/events")
+def admin_events():
+    return intercept_bus.stats()
+
+
+@app.get("/admin/writer")
+def admin_writer():
+    return intercept_writer.stats()
+
+
+@app.get("/admin/model")
+def admin_model():
+    return registry.info()
+
+
+@app.post("/admin/model/reload")
+def admin_model_reload(name: Optional[str] = None):
+    try:
+        loaded = registry.reload(name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        return {"items": [], "error": str(e)}
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+    # Old entries can no longer hit (the version is in the key); free them now.
+    decision_cache.clear()
+    return {"ok": True, "active": loaded.info()}
+
+
+@app.get("/admin/cache")
+def admin_cache():
+    return decision_cache.stats()
+
+
+@app.post("/admin/cache/clear")
+def admin_cache_clear():
+    decision_cache.clear()
+    return {"ok": True}
 
 
 @app.get("/admin/intercepts/{request_id}")
 def admin_intercept_detail(request_id: str):
-    row = get_by_request_id(request_id)
+    row = _intercept_row(request_id)
     if not row:
         raise HTTPException(status_code=404, detail="not found")
     return row
@@ -224,6 +683,7 @@ def admin_list_add(kind: str, address: str):
     if kind not in ("BLACKLIST", "WHITELIST"):
         raise HTTPException(status_code=400, detail="kind must be BLACKLIST or WHITELIST")
     list_add(kind, address)
+    list_index.refresh()  # visible here at once; other workers pick it up on their next sync
     return {"ok": True}
 
 
@@ -232,9 +692,25 @@ def admin_list_remove(kind: str, address: str):
     if kind not in ("BLACKLIST", "WHITELIST"):
         raise HTTPException(status_code=400, detail="kind must be BLACKLIST or WHITELIST")
     list_remove(kind, address)
+    list_index.refresh()
     return {"ok": True}
 
 
+@app.get("/admin/list/index")
+def admin_list_index():
+    sanctions = get_sanctions_filter()
+    return {**list_index.stats(), "sanctions": sanctions.stats() if sanctions else None}
+
+
+@app.get("/admin/velocity")
+def admin_velocity(to_address: Optional[str] = None, from_address: Optional[str] = None):
+    """Store stats, plus the current velocity features when an address is given."""
+    out = velocity_store.stats()
+    if to_address:
+        out["features"] = velocity_store.features(from_address, to_address)
+    return out
+
+
 @app.get("/admin/list")
 def admin_list(kind: str):
     if kind not in ("BLACKLIST", "WHITELIST"):
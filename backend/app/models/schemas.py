@@ -2,14 +2,42 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Literal
 
 
-class AMLInput(BaseModel):
+class AMLParties(BaseModel):
+    # Optional: when to_address is given, the backend records the transfer
+    # in its velocity store (once per request_id) and, with
+    # PREDICT_FILL_VELOCITY, fills slots 1..36 from it before scoring.
+    chain: Optional[str] = None
+    from_address: Optional[str] = None
+    to_address: Optional[str] = None
+    request_id: Optional[str] = None
+
+
+class AMLInput(AMLParties):
     features: List[float]  # Length must be 165
 
 
+class AMLSparseInput(AMLParties):
+    # Non-zero features only; every other slot is 0.
+    dim: Optional[int] = None
+    indices: List[int]
+    values: List[float]
+
+
 class AMLPrediction(BaseModel):
     prediction: str
     risk_score: float
 
+
+class AMLBatchInput(BaseModel):
+    features: List[List[float]]  # N rows, each of length 165
+    parties: Optional[List[AMLParties]] = None  # one per row, as for /risk/predict
+
+
+class AMLBatchPrediction(BaseModel):
+    count: int
+    predictions: List[str]
+    risk_scores: List[float]
+
 Decision = Literal["ALLOW", "REQUIRE_CONFIRM", "BLOCK"]
 RiskLevel = Literal["LOW", "MEDIUM", "HIGH", "BLOCKED"]
 
@@ -0,0 +1,118 @@
+"""
+Canonical binary keys for TRON and Ethereum addresses.
+
+Every form of the same account maps to one key:
+
+- Ethereum "0x" + 40 hex (any casing, EIP-55 or not) -> 20 bytes
+- TRON base58check "T..." or hex "41" + 40 hex      -> 21 bytes (0x41 + 20)
+- anything else (demo wallet ids, malformed input)   -> b"\\x00" + UTF-8,
+  padded to at least 22 bytes so it can never equal a 20/21-byte key
+
+Keys are what the list store, the list index, the sanctions filter and
+intercept_log compare and index on; the original text is kept alongside
+for display. canonical_key is LRU-cached, so repeated addresses skip the
+decode and share one bytes object.
+"""
+import hashlib
+from functools import lru_cache
+
+from ..core.config import ADDRESS_CACHE_SIZE
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {c: i for i, c in enumerate(_B58_ALPHABET)}
+_HEX = frozenset("0123456789abcdefABCDEF")
+
+TRON_PREFIX = 0x41
+_FALLBACK_MIN_LEN = 22
+
+
+def _b58decode(s: str) -> bytes:
+    n = 0
+    for c in s:
+        n = n * 58 + _B58_INDEX[c]
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big") if n else b""
+    pad = len(s) - len(s.lstrip("1"))
+    return b"\0" * pad + body
+
+
+def _b58encode(b: bytes) -> str:
+    n = int.from_bytes(b, "big")
+    out = []
+    while n:
+        n, r = divmod(n, 58)
+        out.append(_B58_ALPHABET[r])
+    pad = len(b) - len(b.lstrip(b"\0"))
+    return "1" * pad + "".join(reversed(out))
+
+
+def _checksum(payload: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+
+
+def _is_hex(s: str) -> bool:
+    return all(c in _HEX for c in s)
+
+
+def _decode_tron_base58(a: str):
+    if len(a) != 34 or a[0] != "T" or any(c not in _B58_INDEX for c in a):
+        return None
+    raw = _b58decode(a)
+    if len(raw) != 25 or raw[0] != TRON_PREFIX or _checksum(raw[:21]) != raw[21:]:
+        return None
+    return raw[:21]
+
+
+def _fallback_key(a: str) -> bytes:
+    return (b"\0" + a.replace("\0", "").encode("utf-8")).ljust(_FALLBACK_MIN_LEN, b"\0")
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def canonical_key(address: str) -> bytes:
+    a = address.strip()
+    if len(a) == 42 and a[:2] in ("0x", "0X") and _is_hex(a[2:]):
+        return bytes.fromhex(a[2:])
+    if len(a) == 42 and a[:2] == "41" and _is_hex(a):
+        return bytes.fromhex(a)
+    if a[:1] == "T":
+        key = _decode_tron_base58(a)
+        if key is not None:
+            return key
+    # Short hex ids (e.g. "0xABC") still compare case-insensitively.
+    if a[:2] in ("0x", "0X") and _is_hex(a[2:]):
+        a = "0x" + a[2:].lower()
+    return _fallback_key(a)
+
+
+def format_address(key: bytes) -> str:
+    """Display form of a canonical key (lowercase 0x hex / TRON base58check)."""
+    if len(key) == 20:
+        return "0x" + key.hex()
+    if len(key) == 21 and key[0] == TRON_PREFIX:
+        return _b58encode(key + _checksum(key))
+    return key[1:].rstrip(b"\0").decode("utf-8", "replace")
+
+
+def cache_info():
+    return canonical_key.cache_info()
+
+
+if __name__ == "__main__":
+    # Decode-cache benchmark: cold decode vs LRU hit, per address form.
+    import secrets
+    import time
+
+    samples = {
+        "eth": ["0x" + secrets.token_hex(20) for _ in range(20000)],
+        "tron": [format_address(bytes([TRON_PREFIX]) + secrets.token_bytes(20)) for _ in range(20000)],
+    }
+    for name, addrs in samples.items():
+        canonical_key.cache_clear()
+        t0 = time.perf_counter()
+        for a in addrs:
+            canonical_key(a)
+        cold = (time.perf_counter() - t0) / len(addrs) * 1e6
+        t0 = time.perf_counter()
+        for a in addrs:
+            canonical_key(a)
+        warm = (time.perf_counter() - t0) / len(addrs) * 1e6
+        print(f"{name:<5} cold={cold:6.2f}us/addr cached={warm:6.3f}us/addr ({cold / warm:.0f}x)")
@@ -0,0 +1,167 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ScoreFn = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+_STOP = object()
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative-free counts per upper bound)."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket = +Inf
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                idx = i
+                break
+        with self._lock:
+            self.counts[idx] += 1
+            self.total += 1
+            self.sum += value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            labels = [str(b) for b in self.bounds] + ["+Inf"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.total,
+                "sum": round(self.sum, 6),
+            }
+
+
+class MicroBatcher:
+    """
+    Micro-batching scheduler for single-row model inference.
+
+    Requests are queued and flushed either when `window_ms` has elapsed
+    since the oldest queued request or when `max_batch` rows are waiting.
+    Each flush runs one `score_fn` call over the stacked float32 matrix and
+    fans the (label, score) results back to the waiting callers.
+    """
+
+    def __init__(self, score_fn: ScoreFn, window_ms: float = 2.0, max_batch: int = 64):
+        self.score_fn = score_fn
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+        self.batch_size_hist = Histogram(_pow2_bounds(self.max_batch))
+        self.queue_wait_ms_hist = Histogram([0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100])
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="aml-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, features: Sequence[float]) -> Future:
+        fut: Future = Future()
+        row = np.asarray(features, dtype=np.float32)
+        self._queue.put((row, fut, time.perf_counter()))
+        return fut
+
+    def predict(self, features: Sequence[float], timeout: Optional[float] = None) -> Tuple[int, float]:
+        return self.submit(features).result(timeout=timeout)
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "window_ms": self.window_s * 1000.0,
+            "max_batch": self.max_batch,
+            "queue_depth": self._queue.qsize(),
+            "batch_size": self.batch_size_hist.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms_hist.snapshot(),
+        }
+
+    # ------------------------------------------------------------
+    # Worker loop
+    # ------------------------------------------------------------
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = first[2] + self.window_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+        # Drain anything that raced with shutdown so no caller hangs.
+        leftover: List = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self._flush(leftover)
+
+    def _flush(self, batch: List) -> None:
+        # Callers that gave up (asyncio timeout cancels the wrapped future)
+        # are dropped; the rest can no longer be cancelled once running.
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        now = time.perf_counter()
+        for _, _, enqueued in batch:
+            self.queue_wait_ms_hist.observe((now - enqueued) * 1000.0)
+        self.batch_size_hist.observe(len(batch))
+
+        try:
+            X = np.stack([row for row, _, _ in batch]).astype(np.float32, copy=False)
+            labels, scores = self.score_fn(X)
+        except Exception as e:
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+            return
+
+        for i, (_, fut, _) in enumerate(batch):
+            fut.set_result((int(labels[i]), float(scores[i])))
+
+
+def _pow2_bounds(limit: int) -> List[int]:
+    bounds = [1]
+    while bounds[-1] < limit:
+        bounds.append(bounds[-1] * 2)
+    return bounds
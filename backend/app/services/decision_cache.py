@@ -0,0 +1,99 @@
+"""
+Opt-in TTL + LRU cache for repeated risk checks and model predictions.
+
+Keys are readable strings that spell out everything the cached verdict
+depends on, e.g.
+
+    check|TRON|41a1b2...|a2|xgboost_aml_model@1f2e3d4c|l17|s1718000000000000000
+    predict|xgboost_aml_model@1f2e3d4c|9c0e...
+
+(chain, canonical address key, amount bucket, model version, list version
+of that address, sanctions filter build id; or model version plus a digest
+of the feature row). A list change bumps the address's list version, a
+model reload changes the model version and a sanctions rebuild changes the
+build id, so stale entries are never hit again; they simply age out. The key of each /risk/check is stored with its intercept row, so a
+cached verdict can be traced back to what it was computed from.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import DECISION_CACHE_ENABLED, DECISION_CACHE_MAX, DECISION_CACHE_TTL_S
+
+
+def check_key(
+    chain: str, address_key: bytes, amount_bucket: int, model_version: str, list_version: int, sanctions_version: int
+) -> str:
+    return f"check|{chain}|{address_key.hex()}|a{amount_bucket}|{model_version}|l{list_version}|s{sanctions_version}"
+
+
+def predict_key(model_version: str, row: np.ndarray) -> str:
+    digest = hashlib.blake2b(np.ascontiguousarray(row, dtype="<f4").tobytes(), digest_size=16).hexdigest()
+    return f"predict|{model_version}|{digest}"
+
+
+class DecisionCache:
+    def __init__(self, enabled: bool = True, ttl_s: float = 30.0, max_entries: int = 100000):
+        self.enabled = enabled
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        kind = key.split("|", 1)[0]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._hits[kind] = self._hits.get(kind, 0) + 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._misses[kind] = self._misses.get(kind, 0) + 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        expires = time.monotonic() + self.ttl_s
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            kinds = sorted(set(self._hits) | set(self._misses))
+            by_kind = {}
+            for kind in kinds:
+                hits, misses = self._hits.get(kind, 0), self._misses.get(kind, 0)
+                by_kind[kind] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+                }
+            return {
+                "enabled": self.enabled,
+                "ttl_s": self.ttl_s,
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "evictions": self.evictions,
+                **by_kind,
+            }
+
+
+# Process-wide cache shared by /risk/check and /risk/predict.
+decision_cache = DecisionCache(DECISION_CACHE_ENABLED, DECISION_CACHE_TTL_S, DECISION_CACHE_MAX)
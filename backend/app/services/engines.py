@@ -0,0 +1,291 @@
+"""
+Scoring engines for the AML model.
+
+All engines take a float32 feature matrix and return (labels, scores) in the
+same shape as inference.score_matrix, so they can be swapped behind
+/risk/predict and /risk/predict/batch via SCORING_ENGINE:
+
+- "sklearn": the pickled XGBClassifier wrapper (reference path)
+- "booster": the raw xgboost Booster via inplace_predict (no DMatrix, no
+  sklearn validation)
+- "numpy":   a pure-NumPy evaluator over the trees flattened into node arrays;
+  the arrays can be saved as .npy files and mapped read-only, so worker
+  processes share one copy (see services/registry.py)
+
+Run `python -m backend.app.services.engines` to benchmark every engine
+against the reference for 1, 64 and 4096 rows.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .inference import score_matrix
+
+ENGINES = ("sklearn", "booster", "numpy")
+
+
+def _iteration_range(model) -> Tuple[int, int]:
+    # Match XGBClassifier.predict_proba: honour early stopping if it was used.
+    try:
+        best = model.best_iteration
+    except AttributeError:
+        return (0, 0)
+    return (0, int(best) + 1) if best is not None else (0, 0)
+
+
+def _labels_from_scores(scores: np.ndarray) -> np.ndarray:
+    return (scores > 0.5).astype(np.int64)
+
+
+class SklearnEngine:
+    name = "sklearn"
+
+    def __init__(self, model):
+        self.model = model
+
+    def score(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return score_matrix(self.model, X)
+
+
+class BoosterEngine:
+    """Score through Booster.inplace_predict, skipping the sklearn wrapper."""
+
+    name = "booster"
+
+    def __init__(self, model):
+        self.booster = model.get_booster() if hasattr(model, "get_booster") else model
+        self.missing = getattr(model, "missing", np.nan)
+        self.iteration_range = _iteration_range(model)
+
+    def score(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        scores = np.asarray(
+            self.booster.inplace_predict(
+                X,
+                iteration_range=self.iteration_range,
+                predict_type="value",
+                missing=self.missing,
+                validate_features=False,
+            )
+        )
+        if scores.ndim == 2:
+            scores = scores[:, 1] if scores.shape[1] > 1 else scores[:, 0]
+        return _labels_from_scores(scores), scores
+
+
+class NumpyTreeEngine:
+    """
+    Pure-NumPy tree ensemble evaluator.
+
+    The booster's JSON dump is flattened into one set of node arrays
+    (feature, threshold, left, right, default_left, leaf value) with a root
+    offset per tree. Scoring walks every (row, tree) pair one level per
+    step, so the Python loop runs max_depth times regardless of batch size.
+
+    save() writes the node arrays as .npy files; load() maps them back
+    read-only (np.load mmap_mode="r"), so every process scoring from the
+    same directory shares its pages through the page cache.
+    """
+
+    name = "numpy"
+    ARRAYS = ("roots", "feature", "threshold", "leaf_value", "left", "right", "default_left")
+
+    def __init__(self, model):
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        doc = json.loads(bytes(booster.save_raw("json")))
+        learner = doc["learner"]
+
+        objective = learner["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"numpy engine does not support objective {objective!r}")
+
+        base_score = float(learner["learner_model_param"]["base_score"])
+        self.base_margin = float(np.log(base_score / (1.0 - base_score)))
+
+        trees = learner["gradient_booster"]["model"]["trees"]
+        _, stop = _iteration_range(model)
+        if stop:
+            per_iter = int(learner["gradient_booster"]["model"]["gbtree_model_param"].get("num_parallel_tree", 1))
+            trees = trees[: stop * per_iter]
+
+        roots, feature, threshold, left, right, default_left = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for tree in trees:
+            if any(int(t) != 0 for t in tree.get("split_type", [])):
+                raise ValueError("numpy engine does not support categorical splits")
+            n = len(tree["left_children"])
+            lc = np.asarray(tree["left_children"], dtype=np.int64)
+            rc = np.asarray(tree["right_children"], dtype=np.int64)
+            is_leaf = lc == -1
+            roots.append(offset)
+            feature.append(np.asarray(tree["split_indices"], dtype=np.int64))
+            threshold.append(np.asarray(tree["split_conditions"], dtype=np.float32))
+            # Leaves point at themselves so extra steps are no-ops.
+            self_idx = np.arange(n, dtype=np.int64)
+            left.append(np.where(is_leaf, self_idx, lc) + offset)
+            right.append(np.where(is_leaf, self_idx, rc) + offset)
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            max_depth = max(max_depth, _tree_depth(lc, rc))
+            offset += n
+
+        if not roots:
+            raise ValueError("model has no trees")
+
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.feature = np.concatenate(feature)
+        # For leaves split_conditions holds the leaf value.
+        self.threshold = np.concatenate(threshold)
+        self.leaf_value = self.threshold.astype(np.float64)
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.default_left = np.concatenate(default_left)
+        self.max_depth = max_depth
+
+    def save(self, directory: Path, **meta) -> None:
+        """
+        Write the node arrays and `meta` to `directory`, which must not exist yet.
+
+        Written to a temp dir and renamed into place; if another process
+        got there first its copy is kept and ours discarded.
+        """
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=directory.parent, prefix=directory.name + ".", suffix=".tmp")
+        try:
+            for name in self.ARRAYS:
+                np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+            meta = {**meta, "base_margin": self.base_margin, "max_depth": self.max_depth}
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as handle:
+                json.dump(meta, handle)
+            try:
+                os.rename(tmp, directory)
+            except OSError:
+                if not (directory / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path) -> Tuple["NumpyTreeEngine", Dict]:
+        """(engine over read-only memory-mapped arrays, saved meta) from a save() directory."""
+        directory = Path(directory)
+        with open(directory / "meta.json", "r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        engine = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(engine, name, np.load(directory / f"{name}.npy", mmap_mode="r"))
+        engine.base_margin = float(meta["base_margin"])
+        engine.max_depth = int(meta["max_depth"])
+        return engine, meta
+
+    def margin(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.leaf_value[node].sum(axis=1) + self.base_margin
+
+    def score(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        scores = 1.0 / (1.0 + np.exp(-self.margin(X)))
+        return _labels_from_scores(scores), scores
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = 0
+    frontier = [0]
+    while True:
+        nxt = [c for n in frontier for c in (left[n], right[n]) if c != -1]
+        if not nxt:
+            return depth
+        depth += 1
+        frontier = nxt
+
+
+def build_engine(name: str, model):
+    if name == "sklearn":
+        return SklearnEngine(model)
+    if name == "booster":
+        return BoosterEngine(model)
+    if name == "numpy":
+        return NumpyTreeEngine(model)
+    raise ValueError(f"unknown scoring engine {name!r} (expected one of {', '.join(ENGINES)})")
+
+
+def probe_matrix(dim: int, rows: int = 256, seed: int = 0) -> np.ndarray:
+    """Deterministic probe rows: zeros, wide-range noise and some missing values."""
+    rng = np.random.default_rng(seed)
+    X = (rng.standard_normal((rows, dim)) * rng.choice([0.1, 1.0, 10.0], size=(rows, 1))).astype(np.float32)
+    X[0] = 0.0
+    X[1::17, ::7] = np.nan
+    return X
+
+
+def verify_engine(engine, reference, dim: int, tolerance: float) -> float:
+    """
+    Compare an engine against the reference model on probe rows.
+
+    Raises RuntimeError if any score differs by more than `tolerance`;
+    returns the max absolute difference otherwise.
+    """
+    X = probe_matrix(dim)
+    _, expected = score_matrix(reference, X)
+    _, actual = engine.score(X)
+    diff = float(np.max(np.abs(np.asarray(actual, dtype=np.float64) - np.asarray(expected, dtype=np.float64))))
+    if not np.isfinite(diff) or diff > tolerance:
+        raise RuntimeError(
+            f"Scoring engine {engine.name!r} disagrees with reference model "
+            f"(max |diff|={diff:.3g} > tolerance {tolerance:g})"
+        )
+    return diff
+
+
+def benchmark(score_fn: Callable, dim: int, sizes: Iterable[int] = (1, 64, 4096), repeat: int = 20) -> Dict[int, float]:
+    """Median wall time per call in milliseconds for each batch size."""
+    results: Dict[int, float] = {}
+    for n in sizes:
+        X = probe_matrix(dim, rows=n, seed=n)
+        score_fn(X)  # warm-up
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            score_fn(X)
+            timings.append((time.perf_counter() - t0) * 1000.0)
+        results[n] = float(np.median(timings))
+    return results
+
+
+def main(model_path: Optional[str] = None) -> None:
+    from pathlib import Path
+
+    import joblib
+
+    path = Path(model_path) if model_path else Path(__file__).resolve().parents[1] / "models" / "xgboost_aml_model.pkl"
+    model = joblib.load(path)
+    dim = int(getattr(model, "n_features_in_", 0) or model.get_booster().num_features())
+
+    print(f"model={path} dim={dim}")
+    print(f"{'engine':<10}{'max|diff|':>12}{'1 row ms':>12}{'64 rows ms':>12}{'4096 rows ms':>14}")
+    for name in ENGINES:
+        try:
+            engine = build_engine(name, model)
+            diff = verify_engine(engine, model, dim, tolerance=float("inf"))
+        except Exception as e:
+            print(f"{name:<10}unavailable: {e}")
+            continue
+        t = benchmark(engine.score, dim)
+        print(f"{name:<10}{diff:>12.2e}{t[1]:>12.3f}{t[64]:>12.3f}{t[4096]:>14.3f}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
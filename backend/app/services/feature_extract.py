@@ -1,11 +1,92 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
 
-def extract_features(chain: str, to_address: str, amount: float) -> Dict[str, Any]:
+import numpy as np
+
+from .velocity import FEATURE_NAMES, velocity_store
+
+# Width of the model input (Elliptic layout).
+FEATURE_DIM = 165
+# Slot layout inside the 165-dim vector: 0 = amount (as the wallet adapter
+# sends it), then the velocity features in FEATURE_NAMES order.
+AMOUNT_SLOT = 0
+VELOCITY_SLOTS = {name: 1 + i for i, name in enumerate(FEATURE_NAMES)}
+
+
+def extract_features(
+    chain: str,
+    to_address: str,
+    amount: float,
+    from_address: Optional[str] = None,
+    velocity: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
     """
-    Feature extraction placeholder.
+    Named features for one transfer: amount flags plus per-address velocity.
+
+    `velocity` is the snapshot returned by velocity_store.observe when the
+    caller has already recorded the transfer; otherwise the current state
+    is read without recording anything.
     """
+    if velocity is None:
+        velocity = velocity_store.features(from_address, to_address)
     return {
         "chain": chain,
         "amount": amount,
         "is_large_tx": amount >= 10000,
+        **velocity,
     }
+
+
+def to_vector(features: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Place named features into a (165,) float32 model row (missing = 0)."""
+    if out is None:
+        out = np.zeros(FEATURE_DIM, dtype=np.float32)
+    out[AMOUNT_SLOT] = features["amount"]
+    for name, slot in VELOCITY_SLOTS.items():
+        out[slot] = features.get(name, 0.0)
+    return out
+
+
+def observe_row(
+    row: Sequence[float],
+    to_address: str,
+    from_address: Optional[str] = None,
+    chain: Optional[str] = None,
+    request_id: Optional[str] = None,
+    fill: bool = False,
+) -> np.ndarray:
+    """
+    Record the transfer a model row describes; returns a float32 copy of the row.
+
+    Used by /risk/predict when the request names the transfer's addresses,
+    so transfers the wallet only scores still count towards velocity. The
+    amount is taken from slot 0 as sent. With `fill`, slots 1..36 of the
+    copy are set from the snapshot including this transfer; the current
+    model was not trained on that layout, hence PREDICT_FILL_VELOCITY.
+    """
+    out = np.array(row, dtype=np.float32)
+    amount = float(out[AMOUNT_SLOT])
+    velocity = velocity_store.observe(from_address, to_address, amount, request_id=request_id)
+    if fill:
+        to_vector(extract_features(chain or "", to_address, amount, from_address, velocity), out=out)
+    return out
+
+
+def observe_rows(X: np.ndarray, parties: Sequence, fill: bool = False) -> np.ndarray:
+    """
+    observe_row for a (N, 165) matrix, in row order.
+
+    `parties` has one entry per row (chain / from_address / to_address /
+    request_id attributes); rows without a to_address are left alone.
+    X itself is only copied when `fill` is set.
+    """
+    if len(parties) != X.shape[0]:
+        raise ValueError(f"parties has {len(parties)} entries for {X.shape[0]} rows")
+    out = np.array(X, dtype=np.float32) if fill else X
+    for i, p in enumerate(parties):
+        if not p.to_address:
+            continue
+        amount = float(X[i, AMOUNT_SLOT])
+        velocity = velocity_store.observe(p.from_address, p.to_address, amount, request_id=p.request_id)
+        if fill:
+            to_vector(extract_features(p.chain or "", p.to_address, amount, p.from_address, velocity), out=out[i])
+    return out
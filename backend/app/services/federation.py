@@ -0,0 +1,99 @@
+"""
+Federated view for /admin/intercepts: this backend's intercept_log merged
+with the wallet service's alerts (/api/alerts).
+
+Both stores are queried concurrently (the local read in the threadpool, the
+wallet over a pooled keep-alive AsyncClient), merged newest-first on the
+epoch-microsecond timestamp, and cached for INTERCEPTS_FEDERATED_TTL_S so a
+dashboard polling every few seconds costs at most one wallet round-trip per
+TTL. If the wallet is unreachable the local rows are still returned, with
+the error alongside.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.config import (
+    INTERCEPTS_FEDERATED_TTL_S,
+    WALLET_BASE_URL,
+    WALLET_POOL_SIZE,
+    WALLET_TIMEOUT_S,
+)
+from ..storage.migrations import iso_to_us
+from ..utils.logger import get_recent_intercepts
+
+# /api/alerts caps `limit` at this value.
+WALLET_ALERTS_MAX = 1000
+
+_client: Optional[httpx.AsyncClient] = None
+_cache: Dict[Tuple[int, Optional[str]], Tuple[float, Dict[str, Any]]] = {}
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=WALLET_BASE_URL,
+            limits=httpx.Limits(max_connections=WALLET_POOL_SIZE, max_keepalive_connections=WALLET_POOL_SIZE),
+            timeout=httpx.Timeout(WALLET_TIMEOUT_S),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _alert_row(alert: Dict[str, Any]) -> Dict[str, Any]:
+    # Wallet created_at is naive UTC; iso_to_us treats naive as UTC.
+    return {"source": "wallet", "_us": iso_to_us(alert.get("created_at")) or 0, **alert}
+
+
+async def _wallet_alerts(limit: int, since: Optional[str]) -> List[Dict[str, Any]]:
+    params: Dict[str, Any] = {"limit": min(limit, WALLET_ALERTS_MAX)}
+    if since:
+        params["since"] = since
+    r = await _get_client().get("/api/alerts", params=params)
+    r.raise_for_status()
+    return [_alert_row(a) for a in r.json().get("alerts", [])]
+
+
+async def _local_intercepts(limit: int, since: Optional[str]) -> List[Dict[str, Any]]:
+    rows = await run_in_threadpool(get_recent_intercepts, limit, since)
+    return [{"source": "backend", "_us": iso_to_us(row["ts"]), **row} for row in rows]
+
+
+async def federated_intercepts(limit: int, since: Optional[str] = None) -> Dict[str, Any]:
+    since_us = iso_to_us(since) if since else 0
+    now = time.monotonic()
+    cached = _cache.get((limit, since))
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    local, remote = await asyncio.gather(
+        _local_intercepts(limit, since), _wallet_alerts(limit, since), return_exceptions=True
+    )
+    if isinstance(local, BaseException):
+        raise local
+    out: Dict[str, Any] = {}
+    if isinstance(remote, BaseException):
+        out["error"] = f"wallet alerts unavailable: {remote}"
+        remote = []
+    fresh = [row for row in local + remote if row["_us"] >= since_us]
+    merged = sorted(fresh, key=lambda row: row["_us"], reverse=True)[:limit]
+    for row in merged:
+        del row["_us"]
+    out["items"] = merged
+
+    # Only successful merges are cached, so a wallet outage is retried next call.
+    if "error" not in out:
+        if len(_cache) > 64:
+            _cache.clear()
+        _cache[(limit, since)] = (now + INTERCEPTS_FEDERATED_TTL_S, out)
+    return out
@@ -0,0 +1,73 @@
+import struct
+from typing import Tuple
+
+import numpy as np
+
+# Binary batch body: b"AMLF" + uint32 rows + uint32 cols (little-endian),
+# followed by rows * cols little-endian float32 values in row-major order.
+# /risk/predict/batch also accepts a trailer after the matrix: a UTF-8 JSON
+# list with one parties object per row (see AMLParties).
+FLOAT32_MAGIC = b"AMLF"
+FLOAT32_HEADER = struct.Struct("<4sII")
+FLOAT32_CONTENT_TYPE = "application/octet-stream"
+
+
+def score_matrix(model, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score a float32 feature matrix with a single model pass.
+
+    Returns (labels, scores) where scores is the positive-class probability.
+    Labels are derived from the probabilities (same 0.5 cut as
+    XGBClassifier.predict) so the trees are only walked once.
+    """
+    if hasattr(model, "predict_proba"):
+        proba = np.asarray(model.predict_proba(X))
+        scores = proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+        labels = (scores > 0.5).astype(np.int64)
+    else:
+        # If no probability output, use 1.0/0.0 fallback
+        labels = np.asarray(model.predict(X)).astype(np.int64)
+        scores = (labels == 1).astype(np.float64)
+    return labels, scores
+
+
+def encode_float32_matrix(X: np.ndarray) -> bytes:
+    X = np.ascontiguousarray(X, dtype="<f4")
+    if X.ndim != 2:
+        raise ValueError("matrix must be 2-dimensional")
+    rows, cols = X.shape
+    return FLOAT32_HEADER.pack(FLOAT32_MAGIC, rows, cols) + X.tobytes()
+
+
+def decode_float32_body(body: bytes) -> Tuple[np.ndarray, bytes]:
+    """The matrix at the start of `body` and the bytes after it (b"" if none)."""
+    if len(body) < FLOAT32_HEADER.size:
+        raise ValueError("body too short for float32 matrix header")
+    magic, rows, cols = FLOAT32_HEADER.unpack_from(body)
+    if magic != FLOAT32_MAGIC:
+        raise ValueError("bad float32 matrix magic")
+    end = FLOAT32_HEADER.size + rows * cols * 4
+    if len(body) < end:
+        raise ValueError(f"body length {len(body)} does not match shape ({rows}, {cols})")
+    # Zero-copy view over the request body; native float32 for the model.
+    X = np.frombuffer(body, dtype="<f4", count=rows * cols, offset=FLOAT32_HEADER.size).reshape(rows, cols)
+    return X.astype(np.float32, copy=False), body[end:]
+
+
+def decode_float32_matrix(body: bytes) -> np.ndarray:
+    X, rest = decode_float32_body(body)
+    if rest:
+        raise ValueError(f"body length {len(body)} does not match shape {X.shape}")
+    return X
+
+
+def densify_sparse(indices, values, dim: int) -> np.ndarray:
+    """One (dim,) float32 row from parallel index / value lists."""
+    idx = np.asarray(indices, dtype=np.int64)
+    if idx.shape[0] != len(values):
+        raise ValueError("indices and values must have the same length")
+    if idx.size and (idx.min() < 0 or idx.max() >= dim):
+        raise ValueError(f"sparse indices must be in [0, {dim})")
+    row = np.zeros(dim, dtype=np.float32)
+    row[idx] = np.asarray(values, dtype=np.float32)
+    return row
@@ -0,0 +1,127 @@
+"""
+In-memory BLACKLIST / WHITELIST index backed by list_store.
+
+The full list is loaded once; after that only the rows appended to the
+list_changes log (filled by triggers on list_store) are applied, so every
+uvicorn worker converges on the same lists without reloading. Entries are
+the canonical 20/21-byte address keys (services/address.py) read straight
+from the address_key columns, in a set per kind: O(1) membership, and any
+checksum/base58/hex form of a listed address hits.
+"""
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from ..core.config import LIST_SYNC_INTERVAL_S
+from ..storage.db import connection
+from .address import canonical_key
+
+KINDS = ("BLACKLIST", "WHITELIST")
+
+_LOAD_LISTS = "SELECT kind, address_key FROM list_store"
+_LOAD_VERSION = "SELECT COALESCE(MAX(seq), 0) FROM list_changes"
+_LOAD_ADDRESS_VERSIONS = "SELECT address_key, MAX(seq) FROM list_changes GROUP BY address_key"
+_CHANGES_SINCE = "SELECT seq, kind, address_key, op FROM list_changes WHERE seq > ? ORDER BY seq"
+
+
+class ListIndex:
+    def __init__(self, sync_interval_s: float = 1.0):
+        self.sync_interval_s = sync_interval_s
+        self._sets: Dict[str, Set[bytes]] = {kind: set() for kind in KINDS}
+        # Last list_changes seq per address key (the decision cache keys on it).
+        self._address_versions: Dict[bytes, int] = {}
+        self.version = 0
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------
+    # Lookups (hot path, lock-free reads of a set)
+    # ------------------------------------------------------------
+
+    def contains(self, kind: str, address: str) -> bool:
+        return canonical_key(address) in self._sets[kind]
+
+    def address_version(self, key: bytes) -> int:
+        return self._address_versions.get(key, 0)
+
+    def size(self, kind: str) -> int:
+        return len(self._sets[kind])
+
+    # ------------------------------------------------------------
+    # Load / incremental sync
+    # ------------------------------------------------------------
+
+    def load(self) -> None:
+        """Full load of list_store plus the change-log version it corresponds to."""
+        conn = connection()
+        # One read transaction so the rows and the version are the same snapshot.
+        conn.execute("BEGIN")
+        try:
+            rows = conn.execute(_LOAD_LISTS).fetchall()
+            address_versions = dict(conn.execute(_LOAD_ADDRESS_VERSIONS).fetchall())
+            version = conn.execute(_LOAD_VERSION).fetchone()[0]
+        finally:
+            conn.rollback()
+
+        sets: Dict[str, Set[bytes]] = {kind: set() for kind in KINDS}
+        for kind, key in rows:
+            if kind in sets:
+                sets[kind].add(key)
+        with self._lock:
+            self._sets = sets
+            self._address_versions = address_versions
+            self.version = version
+            self.loaded = True
+
+    def refresh(self) -> int:
+        """Apply list_changes newer than our version; returns the number applied."""
+        with self._lock:
+            changes = connection().execute(_CHANGES_SINCE, (self.version,)).fetchall()
+            self._apply(changes)
+            return len(changes)
+
+    def _apply(self, changes: Iterable[Tuple[int, str, bytes, str]]) -> None:
+        for seq, kind, key, op in changes:
+            target = self._sets.get(kind)
+            if target is not None:
+                if op == "ADD":
+                    target.add(key)
+                else:
+                    target.discard(key)
+            self._address_versions[key] = seq
+            self.version = seq
+
+    def start(self) -> None:
+        if not self.loaded:
+            self.load()
+        if self.sync_interval_s <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="aml-list-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sync_interval_s):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[list-index] sync failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "loaded": self.loaded,
+            "version": self.version,
+            "sync_interval_s": self.sync_interval_s,
+            **{kind.lower(): len(self._sets[kind]) for kind in KINDS},
+        }
+
+
+# Process-wide index used by risk_engine.assess.
+list_index = ListIndex(sync_interval_s=LIST_SYNC_INTERVAL_S)
@@ -0,0 +1,303 @@
+"""
+Versioned, hot-reloadable model registry.
+
+Models live in backend/app/models/ as `<name>.pkl` (joblib XGBClassifier)
+and/or `<name>.ubj` (native UBJSON booster). A pickle is exported once to
+`<cache_dir>/<name>.ubj` (MODEL_CACHE_DIR, outside the source tree) and
+re-exported when the pickle is newer, so later cold starts load the
+native format and skip joblib and unpickling.
+
+Sharing one model across workers: with SCORING_ENGINE=numpy the first
+worker to load a model version verifies the flattened trees against the
+reference model and saves them to `<cache_dir>/<name>@<digest>.trees/`.
+Every worker then scores from those .npy files mapped read-only, so the
+node arrays sit in the page cache once for all workers, and a worker
+whose version is already exported starts without importing xgboost or
+holding a booster at all. The sklearn and booster engines need a live
+xgboost Booster, which copies the model into its own heap on load; with
+those each worker keeps a private copy and only the cold start is cut.
+
+The active model is an immutable LoadedModel snapshot. Reloads build a new
+snapshot off to the side and swap it in with one attribute assignment, so
+requests already holding the old snapshot finish on it and nothing is
+dropped.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .engines import NumpyTreeEngine, build_engine, verify_engine
+
+MODEL_SUFFIXES = (".ubj", ".pkl")
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    version: str
+    path: Path
+    model: object = field(repr=False)
+    engine: object = field(repr=False)
+    expected_dim: Optional[int]
+    mtime: float
+    loaded_at: float
+    load_ms: float
+    # Directory of the memory-mapped tree arrays when the engine scores from them.
+    shared_path: Optional[Path] = None
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "path": str(self.path),
+            "shared_path": str(self.shared_path) if self.shared_path else None,
+            "engine": self.engine.name,
+            "expected_dim": self.expected_dim,
+            "mtime": self.mtime,
+            "loaded_at": self.loaded_at,
+            "load_ms": round(self.load_ms, 3),
+        }
+
+
+def infer_expected_dim(model) -> Optional[int]:
+    # 1) sklearn-style estimator
+    dim = getattr(model, "n_features_in_", None)
+    if isinstance(dim, int) and dim > 0:
+        return dim
+
+    # 2) xgboost booster fallback
+    try:
+        booster = model.get_booster()
+        dim2 = booster.num_features()
+        if isinstance(dim2, int) and dim2 > 0:
+            return dim2
+    except Exception:
+        pass
+
+    return None
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def _export_ubj(pkl_path: Path, ubj_path: Path) -> None:
+    import joblib
+
+    model = joblib.load(pkl_path)
+    # Write next to the target and rename so concurrent workers never read
+    # a half-written file.
+    ubj_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=ubj_path.parent, suffix=".ubj.tmp")
+    os.close(fd)
+    try:
+        model.save_model(tmp)
+        os.replace(tmp, ubj_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _load_ubj(path: Path):
+    from xgboost import XGBClassifier
+
+    model = XGBClassifier()
+    model.load_model(str(path))
+    return model
+
+
+def _load_pkl(path: Path):
+    import joblib
+
+    return joblib.load(path)
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        models_dir: Path,
+        name: str,
+        engine_name: str = "sklearn",
+        tolerance: float = 1e-5,
+        prefer_ubj: bool = True,
+        watch_interval_s: float = 0.0,
+        cache_dir: Optional[Path] = None,
+    ):
+        self.models_dir = Path(models_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else Path(tempfile.gettempdir()) / "aml-model-cache"
+        self.name = name
+        self.engine_name = engine_name
+        self.tolerance = tolerance
+        self.prefer_ubj = prefer_ubj
+        self.watch_interval_s = watch_interval_s
+
+        self._current: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+
+    def versions(self) -> List[Dict]:
+        items = []
+        for p in sorted(self.models_dir.iterdir()):
+            if p.suffix in MODEL_SUFFIXES and p.is_file():
+                st = p.stat()
+                items.append({"name": p.stem, "file": p.name, "size": st.st_size, "mtime": st.st_mtime})
+        return items
+
+    def _source_path(self, name: str) -> Path:
+        pkl = self.models_dir / f"{name}.pkl"
+        ubj = self.models_dir / f"{name}.ubj"
+        if not self.prefer_ubj:
+            if pkl.exists():
+                return pkl
+            if ubj.exists():
+                return ubj
+            raise FileNotFoundError(f"no model named {name!r} in {self.models_dir}")
+
+        if not pkl.exists():
+            if ubj.exists():
+                return ubj
+            raise FileNotFoundError(f"no model named {name!r} in {self.models_dir}")
+        # A shipped .ubj at least as new as the pickle wins; otherwise use
+        # (and refresh) the export in the cache dir.
+        pkl_mtime = pkl.stat().st_mtime
+        if ubj.exists() and ubj.stat().st_mtime >= pkl_mtime:
+            return ubj
+        derived = self.cache_dir / f"{name}.ubj"
+        if not derived.exists() or derived.stat().st_mtime < pkl_mtime:
+            _export_ubj(pkl, derived)
+        return derived
+
+    def _watched_mtime(self, name: str) -> float:
+        mtimes = [
+            (self.models_dir / f"{name}{s}").stat().st_mtime
+            for s in MODEL_SUFFIXES
+            if (self.models_dir / f"{name}{s}").exists()
+        ]
+        return max(mtimes) if mtimes else 0.0
+
+    # ------------------------------------------------------------
+    # Load / swap
+    # ------------------------------------------------------------
+
+    def _build(self, name: str) -> LoadedModel:
+        t0 = time.perf_counter()
+        path = self._source_path(name)
+        mtime = self._watched_mtime(name)
+        version = f"{name}@{_file_digest(path)}"
+
+        shared_path = None
+        if self.engine_name == "numpy":
+            shared_path = self.cache_dir / f"{version}.trees"
+            if not (shared_path / "meta.json").exists():
+                self._export_trees(path, shared_path)
+            model = None
+            engine, meta = NumpyTreeEngine.load(shared_path)
+            expected_dim = meta["expected_dim"]
+        else:
+            model = _load_ubj(path) if path.suffix == ".ubj" else _load_pkl(path)
+            expected_dim = infer_expected_dim(model)
+            engine = build_engine(self.engine_name, model)
+            if expected_dim is not None and engine.name != "sklearn":
+                verify_engine(engine, model, expected_dim, self.tolerance)
+
+        return LoadedModel(
+            version=version,
+            path=path,
+            model=model,
+            engine=engine,
+            expected_dim=expected_dim,
+            mtime=mtime,
+            loaded_at=time.time(),
+            load_ms=(time.perf_counter() - t0) * 1000.0,
+            shared_path=shared_path,
+        )
+
+    def _export_trees(self, path: Path, shared_path: Path) -> None:
+        """Flatten, verify and save the trees of `path` for every worker to map."""
+        model = _load_ubj(path) if path.suffix == ".ubj" else _load_pkl(path)
+        expected_dim = infer_expected_dim(model)
+        engine = NumpyTreeEngine(model)
+        if expected_dim is not None:
+            verify_engine(engine, model, expected_dim, self.tolerance)
+        engine.save(shared_path, expected_dim=expected_dim)
+
+    def get(self) -> LoadedModel:
+        """Return the active snapshot, loading it on first use."""
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._build(self.name)
+                current = self._current
+        return current
+
+    def reload(self, name: Optional[str] = None) -> LoadedModel:
+        """
+        Load `name` (or the active name) and swap it in.
+
+        On failure the previous model keeps serving and the error is raised.
+        """
+        with self._lock:
+            target = name or self.name
+            try:
+                loaded = self._build(target)
+            except Exception as e:
+                self.last_error = f"{target}: {e}"
+                raise
+            self.name = target
+            self._current = loaded
+            self.last_error = None
+            return loaded
+
+    # ------------------------------------------------------------
+    # File watcher
+    # ------------------------------------------------------------
+
+    def start_watching(self) -> None:
+        if self.watch_interval_s <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="aml-model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.watch_interval_s):
+            current = self._current
+            if current is None:
+                continue
+            try:
+                if self._watched_mtime(self.name) > current.mtime:
+                    self.reload()
+            except Exception as e:
+                # Keep serving the old model; the error is visible via /admin/model.
+                print(f"[model-registry] reload failed: {e}")
+
+    def info(self) -> Dict:
+        current = self._current
+        return {
+            "active": current.info() if current else None,
+            "name": self.name,
+            "engine": self.engine_name,
+            "watch_interval_s": self.watch_interval_s,
+            "last_error": self.last_error,
+            "versions": self.versions(),
+        }
@@ -1,9 +1,18 @@
-import hashlib
-import time
-from typing import List, Dict, Tuple
+from bisect import bisect_right
+from typing import List, Dict, Optional, Tuple
 
-BLACKLIST = set()   # 后面接数据库
-WHITELIST = set()
+from ..core.config import (
+    STRUCTURING_BAND_HIGH,
+    STRUCTURING_BAND_LOW,
+    VELOCITY_BURST_1M,
+    VELOCITY_FAN_IN_1H,
+    VELOCITY_STRUCTURING_24H,
+)
+from .address import canonical_key
+from .decision_cache import check_key, decision_cache
+from .list_index import list_index
+from .sanctions import get_sanctions_filter, sanctions_version
+from .velocity import velocity_store
 
 def _score_to_level_decision(score: int) -> Tuple[str, str]:
     # 你后面在 A9 页面可配置阈值；先硬编码
@@ -15,14 +24,39 @@ def _score_to_level_decision(score: int) -> Tuple[str, str]:
         return "MEDIUM", "ALLOW"
     return "LOW", "ALLOW"
 
-def assess(chain: str, to_address: str, amount: float) -> Tuple[int, str, str, List[str], Dict]:
-    reason_codes: List[str] = []
-    model_votes: Dict = {}
+def _velocity_reasons(v: Dict[str, float]) -> List[str]:
+    reasons = []
+    if max(v["out_1m_count"], v["in_1m_count"]) >= VELOCITY_BURST_1M:
+        reasons.append("BURST_VELOCITY")
+    if v["in_1h_distinct_counterparties"] >= VELOCITY_FAN_IN_1H:
+        reasons.append("FAN_IN_VELOCITY")
+    if max(v["out_24h_near_threshold"], v["in_24h_near_threshold"]) >= VELOCITY_STRUCTURING_24H:
+        reasons.append("STRUCTURING_PATTERN")
+    return reasons
+
+# Amount edges the rules below branch on; amounts in one bucket always
+# get the same list/amount verdict, which is what the decision cache keys on.
+AMOUNT_EDGES = tuple(sorted({STRUCTURING_BAND_LOW, STRUCTURING_BAND_HIGH, 10000.0, 100000.0}))
+
+def amount_bucket(amount: float) -> int:
+    return bisect_right(AMOUNT_EDGES, amount)
 
-    if to_address in BLACKLIST:
-        return 100, "BLOCKED", "BLOCK", ["BLACKLIST_HIT"], {"rule": "BLACKLIST"}
+def _static_rules(to_address: str, amount: float):
+    """
+    List / sanctions / amount rules: a pure function of the address's list
+    state and the amount bucket, hence cacheable.
 
-    if to_address in WHITELIST:
+    Returns ("final", verdict) for a hard block, else ("base", (base, reasons)).
+    """
+    if list_index.contains("BLACKLIST", to_address):
+        return "final", (100, "BLOCKED", "BLOCK", ["BLACKLIST_HIT"], {"rule": "BLACKLIST"})
+
+    sanctions = get_sanctions_filter()
+    if sanctions is not None and sanctions.contains(to_address):
+        return "final", (100, "BLOCKED", "BLOCK", ["SANCTIONS_HIT"], {"rule": "SANCTIONS"})
+
+    reason_codes: List[str] = []
+    if list_index.contains("WHITELIST", to_address):
         # 白名单允许但记录
         base = 10
         reason_codes.append("WHITELIST_HIT")
@@ -36,6 +70,22 @@ def assess(chain: str, to_address: str, amount: float) -> Tuple[int, str, str, L
     elif amount >= 10000:
         base += 20
         reason_codes.append("MEDIUM_LARGE_AMOUNT")
+    return "base", (base, tuple(reason_codes))
+
+def _finish(static, velocity: Dict[str, float]) -> Tuple[int, str, str, List[str], Dict]:
+    kind, value = static
+    if kind == "final":
+        score, level, decision, reasons, votes = value
+        return score, level, decision, list(reasons), dict(votes)
+
+    base, static_reasons = value
+    reason_codes: List[str] = list(static_reasons)
+    model_votes: Dict = {}
+
+    # 速度规则：突发 / 归集 / 拆分，每命中一条 +20
+    velocity_reasons = _velocity_reasons(velocity)
+    base += 20 * len(velocity_reasons)
+    reason_codes.extend(velocity_reasons)
 
     # 假装模型投票（占位，后面换 IsolationForest/XGB/GNN）
     model_votes["IsolationForest"] = {"triggered": base >= 70, "score": base / 100}
@@ -49,6 +99,47 @@ def assess(chain: str, to_address: str, amount: float) -> Tuple[int, str, str, L
 
     return score, level, decision, reason_codes, model_votes
 
-def make_request_id(chain: str, to_address: str, amount: float) -> str:
-    raw = f"{time.time()}|{chain}|{to_address}|{amount}".encode("utf-8")
-    return hashlib.sha256(raw).hexdigest()[:16]
+def assess(
+    chain: str,
+    to_address: str,
+    amount: float,
+    from_address: Optional[str] = None,
+    request_id: Optional[str] = None,
+) -> Tuple[int, str, str, List[str], Dict]:
+    # Every attempt counts towards velocity, including ones blocked below.
+    velocity = velocity_store.observe(from_address, to_address, amount, request_id=request_id)
+    return _finish(_static_rules(to_address, amount), velocity)
+
+def assess_cached(
+    chain: str,
+    to_address: str,
+    amount: float,
+    from_address: Optional[str] = None,
+    model_version: str = "",
+    request_id: Optional[str] = None,
+) -> Tuple[Tuple[int, str, str, List[str], Dict], Optional[str], bool]:
+    """
+    assess() through the decision cache: returns (verdict, cache_key, hit).
+
+    Only the list/sanctions/amount part is cached; velocity is observed
+    and applied on every call. cache_key is None while the cache is off.
+    """
+    velocity = velocity_store.observe(from_address, to_address, amount, request_id=request_id)
+    if not decision_cache.enabled:
+        return _finish(_static_rules(to_address, amount), velocity), None, False
+
+    address_key = canonical_key(to_address)
+    key = check_key(
+        chain,
+        address_key,
+        amount_bucket(amount),
+        model_version,
+        list_index.address_version(address_key),
+        sanctions_version(),
+    )
+    static = decision_cache.get(key)
+    hit = static is not None
+    if not hit:
+        static = _static_rules(to_address, amount)
+        decision_cache.put(key, static)
+    return _finish(static, velocity), key, hit
@@ -0,0 +1,368 @@
+"""
+Memory-mapped sanctioned-address filter for very large blacklist feeds.
+
+Two read-only files are built offline from a list file (one address per
+line, '#' comments allowed):
+
+- <prefix>.bloom   Bloom filter: header + bit array packed 8 bits per byte
+- <prefix>.sorted  fixed-width records, sorted: one length byte, then the
+                   canonical address key, NUL-padded to the record width
+
+Addresses are reduced to their canonical binary key (services/address.py),
+so every ETH casing and both TRON forms hit the same entry. Lookups hash
+the key once (blake2b-128 split into two 64-bit halves, double hashing
+for the k probes). A miss in the Bloom filter is final; a hit is
+confirmed by binary search over the sorted table, so false positives
+never reach a decision. Both files are opened with mmap, so every worker
+process shares the same page-cache pages.
+
+Both the build and the lookup hash the exact canonical_key() bytes. The
+length byte keeps keys that end in 0x00 (fallback keys always do, about
+1 in 256 ETH/TRON keys too) distinct after padding, and keeps a 20-byte
+ETH key from ever matching a 21-byte TRON key.
+
+The build streams the feed twice (once to size the records, once to fill
+them) straight into a memory-mapped temp file, then sorts and dedupes it
+in place, so it never holds the keys as Python objects: a feed of tens of
+millions of addresses needs about one record per key of disk-backed
+memory plus m/8 bytes of Bloom bits.
+
+A rebuilt filter (new files renamed into place) is picked up by
+get_sanctions_filter() within SANCTIONS_RELOAD_INTERVAL_S. Its build id
+is part of the decision-cache key.
+
+Lookups are one canonicalization, one blake2b call and k byte probes in
+plain Python: a few microseconds per address, not the sub-microsecond
+a vectorized or native probe could reach.
+
+Rebuild with:
+    python -m backend.app.services.sanctions build feed.txt data/sanctions --fp 1e-4
+"""
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .address import canonical_key
+
+BLOOM_MAGIC = b"AMLBLOOM"
+SORTED_MAGIC = b"AMLSORT1"
+# magic, format version, k hashes, m bits, n entries, build id
+BLOOM_HEADER = struct.Struct("<8sIIQQQ")
+# magic, record width, n records, build id
+SORTED_HEADER = struct.Struct("<8sIQQ")
+# v2: length-prefixed canonical address keys instead of normalized UTF-8
+FORMAT_VERSION = 2
+MAX_ADDRESS_BYTES = 128
+
+_MASK64 = (1 << 64) - 1
+
+
+def _hash_pair(key: bytes) -> Tuple[int, int]:
+    d = hashlib.blake2b(key, digest_size=16).digest()
+    h1, h2 = struct.unpack("<QQ", d)
+    return h1, h2 | 1  # odd step so probes never collapse onto one bit
+
+
+def _record(key: bytes, key_width: int) -> bytes:
+    """Sorted-table record: length byte + key, NUL-padded to 1 + key_width."""
+    return bytes((len(key),)) + key.ljust(key_width, b"\0")
+
+
+def bloom_parameters(n: int, fp_rate: float) -> Tuple[int, int]:
+    """(m bits, k hashes) for n entries at the target false-positive rate."""
+    n = max(1, n)
+    m = max(64, int(math.ceil(-n * math.log(fp_rate) / (math.log(2) ** 2))))
+    k = max(1, int(round(m / n * math.log(2))))
+    return m, k
+
+
+# ============================================================
+# Offline build
+# ============================================================
+
+def read_list_file(path: Path) -> Iterator[bytes]:
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                key = canonical_key(line)
+                if len(key) <= MAX_ADDRESS_BYTES:
+                    yield key
+
+
+def _chunks(keys: Iterator[bytes], size: int) -> Iterator[List[bytes]]:
+    chunk: List[bytes] = []
+    for key in keys:
+        chunk.append(key)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build(list_path: Path, prefix: Path, fp_rate: float = 1e-4, chunk: int = 1_000_000) -> Tuple[int, int, int]:
+    """
+    Build <prefix>.bloom and <prefix>.sorted from a list file.
+
+    Keys are handled `chunk` at a time. Files are written to unique temp
+    names next to the target and renamed into place, so readers never see
+    a half-written filter and concurrent builds cannot clobber each
+    other's temp files. Builds of different feeds that race can leave a
+    .bloom and .sorted from different builds; readers refuse such a pair
+    (build ids differ) and keep the previous filter until the next build.
+    Returns (n, m, k).
+    """
+    n_raw, key_width = 0, 1
+    for key in read_list_file(list_path):
+        n_raw += 1
+        key_width = max(key_width, len(key))
+    width = 1 + key_width
+    record = np.dtype((np.void, width))
+
+    prefix.parent.mkdir(parents=True, exist_ok=True)
+    sorted_tmp = _temp_file(Path(f"{prefix}.sorted"))
+    bloom_tmp = None
+    try:
+        with open(sorted_tmp, "r+b") as handle:
+            handle.truncate(SORTED_HEADER.size + n_raw * width)
+        table = np.zeros((0, width), dtype=np.uint8)
+        n = 0
+        if n_raw:
+            table = np.memmap(sorted_tmp, dtype=np.uint8, mode="r+", offset=SORTED_HEADER.size, shape=(n_raw, width))
+            row = 0
+            for keys in _chunks(read_list_file(list_path), chunk):
+                if row + len(keys) > n_raw:
+                    raise ValueError(f"{list_path} changed during the build")
+                part = np.frombuffer(b"".join(_record(key, key_width) for key in keys), dtype=np.uint8)
+                table[row : row + len(keys)] = part.reshape(-1, width)
+                row += len(keys)
+            if row != n_raw:
+                raise ValueError(f"{list_path} changed during the build")
+            # Void records sort bytewise, the order _in_table compares in.
+            records = table.view(record).ravel()
+            records.sort()
+            keep = np.ones(n_raw, dtype=bool)
+            keep[1:] = records[1:] != records[:-1]
+            # Compact the duplicates out chunk by chunk; writes never pass reads.
+            for start in range(0, n_raw, chunk):
+                unique = records[start : start + chunk][keep[start : start + chunk]]
+                records[n : n + len(unique)] = unique
+                n += len(unique)
+            del records
+            table.flush()
+        bits, m, k = _bloom_bits(table[:n], fp_rate, chunk)
+        build_id = _content_id(table[:n], chunk)
+        del table  # unmap before the file is truncated
+
+        with open(sorted_tmp, "r+b") as handle:
+            handle.write(SORTED_HEADER.pack(SORTED_MAGIC, width, n, build_id))
+            handle.truncate(SORTED_HEADER.size + n * width)
+        bloom_tmp = _temp_file(Path(f"{prefix}.bloom"))
+        with open(bloom_tmp, "wb") as handle:
+            handle.write(BLOOM_HEADER.pack(BLOOM_MAGIC, FORMAT_VERSION, k, m, n, build_id))
+            handle.write(bits.tobytes())
+        os.replace(sorted_tmp, f"{prefix}.sorted")
+        os.replace(bloom_tmp, f"{prefix}.bloom")
+    finally:
+        for tmp in (sorted_tmp, bloom_tmp):
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+    return n, m, k
+
+
+def _bloom_bits(table: np.ndarray, fp_rate: float, chunk: int) -> Tuple[np.ndarray, int, int]:
+    """Packed Bloom bits (bit i = byte i >> 3, mask 1 << (i & 7)) over the sorted records, plus (m, k)."""
+    n = table.shape[0]
+    m, k = bloom_parameters(n, fp_rate)
+    bits = np.zeros((m + 7) // 8, dtype=np.uint8)
+    m64 = np.uint64(m)
+    for start in range(0, n, chunk):
+        part = table[start : start + chunk]
+        digests = np.frombuffer(
+            # Hash the exact key (record minus length byte and padding), as lookups do.
+            b"".join(hashlib.blake2b(bytes(row[1 : 1 + row[0]]), digest_size=16).digest() for row in part),
+            dtype="<u8",
+        ).reshape(-1, 2)
+        h1 = digests[:, 0]
+        h2 = digests[:, 1] | np.uint64(1)
+        with np.errstate(over="ignore"):
+            for i in range(k):
+                pos = (h1 + np.uint64(i) * h2) % m64
+                np.bitwise_or.at(bits, pos >> np.uint64(3), np.left_shift(1, pos & np.uint64(7)).astype(np.uint8))
+    return bits, m, k
+
+
+def _content_id(table: np.ndarray, chunk: int) -> int:
+    """
+    Build id: a digest of the sorted records, never 0.
+
+    Derived from content rather than the clock, so two builds of the same
+    feed racing to rename their files still leave a matching pair.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(struct.pack("<IQ", table.shape[1], table.shape[0]))
+    for start in range(0, table.shape[0], chunk):
+        h.update(np.ascontiguousarray(table[start : start + chunk]).tobytes())
+    return int.from_bytes(h.digest(), "little") or 1
+
+
+def _temp_file(path: Path) -> str:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    os.close(fd)
+    return tmp
+
+
+# ============================================================
+# Runtime lookup
+# ============================================================
+
+class SanctionsFilter:
+    def __init__(self, prefix: Path):
+        self.prefix = Path(prefix)
+        self._bloom_file = open(f"{prefix}.bloom", "rb")
+        self._sorted_file = open(f"{prefix}.sorted", "rb")
+        self._bloom = mmap.mmap(self._bloom_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._sorted = mmap.mmap(self._sorted_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.k, self.m, self.n, self.build_id = BLOOM_HEADER.unpack_from(self._bloom)
+        if magic != BLOOM_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{prefix}.bloom is not a v{FORMAT_VERSION} bloom filter")
+        magic, self.width, n_sorted, build_id = SORTED_HEADER.unpack_from(self._sorted)
+        if magic != SORTED_MAGIC or n_sorted != self.n or build_id != self.build_id:
+            raise ValueError(f"{prefix}.sorted does not match {prefix}.bloom")
+        self._bits_offset = BLOOM_HEADER.size
+        self._table_offset = SORTED_HEADER.size
+
+    def might_contain(self, address: str) -> bool:
+        """Bloom check only: False is definite, True may be a false positive."""
+        return self._might_contain_key(canonical_key(address))
+
+    def _might_contain_key(self, key: bytes) -> bool:
+        h1, h2 = _hash_pair(key)
+        bloom, off, m = self._bloom, self._bits_offset, self.m
+        for i in range(self.k):
+            pos = ((h1 + i * h2) & _MASK64) % m
+            if not bloom[off + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def _in_table(self, key: bytes) -> bool:
+        if len(key) >= self.width:
+            return False
+        target = _record(key, self.width - 1)
+        table, off, w = self._sorted, self._table_offset, self.width
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            rec = table[off + mid * w : off + (mid + 1) * w]
+            if rec < target:
+                lo = mid + 1
+            elif rec > target:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains(self, address: str) -> bool:
+        key = canonical_key(address)
+        return self._might_contain_key(key) and self._in_table(key)
+
+    def close(self) -> None:
+        self._bloom.close()
+        self._sorted.close()
+        self._bloom_file.close()
+        self._sorted_file.close()
+
+    def stats(self) -> dict:
+        return {
+            "prefix": str(self.prefix),
+            "entries": self.n,
+            "bits": self.m,
+            "hashes": self.k,
+            "width": self.width,
+            "build_id": self.build_id,
+        }
+
+
+_filter: Optional[SanctionsFilter] = None
+_filter_stat: Optional[Tuple[int, int]] = None
+_next_check = 0.0
+_filter_lock = threading.Lock()
+
+
+def get_sanctions_filter() -> Optional[SanctionsFilter]:
+    """
+    The configured filter (SANCTIONS_FILTER_PREFIX), or None if unset / not built.
+
+    At most every SANCTIONS_RELOAD_INTERVAL_S the .bloom file is stat'ed; a
+    rebuild (new inode / mtime) reopens the filter. The old mappings stay
+    valid for lookups still holding them and close when released.
+    """
+    global _filter, _filter_stat, _next_check
+    now = time.monotonic()
+    if now < _next_check:
+        return _filter
+    from ..core.config import SANCTIONS_FILTER_PREFIX, SANCTIONS_RELOAD_INTERVAL_S
+
+    with _filter_lock:
+        if now < _next_check:
+            return _filter
+        _next_check = now + SANCTIONS_RELOAD_INTERVAL_S
+        try:
+            st = os.stat(f"{SANCTIONS_FILTER_PREFIX}.bloom") if SANCTIONS_FILTER_PREFIX else None
+        except FileNotFoundError:
+            st = None
+        stat = (st.st_ino, st.st_mtime_ns) if st else None
+        if stat != _filter_stat:
+            try:
+                _filter = SanctionsFilter(Path(SANCTIONS_FILTER_PREFIX)) if stat else None
+                _filter_stat = stat
+            except (OSError, ValueError) as e:
+                # Caught between the .sorted and .bloom renames of a rebuild:
+                # keep serving the previous filter and retry next interval.
+                print("sanctions filter not (re)loaded, retrying later:", e)
+    return _filter
+
+
+def sanctions_version() -> int:
+    """Build id of the active filter (0 = none); changes whenever a rebuild changes its entries."""
+    f = get_sanctions_filter()
+    return f.build_id if f is not None else 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.app.services.sanctions")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="build <prefix>.bloom / <prefix>.sorted from a list file")
+    b.add_argument("list_file", type=Path)
+    b.add_argument("prefix", type=Path)
+    b.add_argument("--fp", type=float, default=1e-4, help="target false-positive rate")
+
+    c = sub.add_parser("check", help="look addresses up in a built filter")
+    c.add_argument("prefix", type=Path)
+    c.add_argument("addresses", nargs="+")
+
+    args = parser.parse_args(argv)
+    if args.cmd == "build":
+        n, m, k = build(args.list_file, args.prefix, fp_rate=args.fp)
+        print(f"entries={n} bits={m} ({m / 8 / 1024 / 1024:.1f} MiB) hashes={k} -> {args.prefix}.bloom/.sorted")
+    else:
+        f = SanctionsFilter(args.prefix)
+        for address in args.addresses:
+            print(f"{address}\tbloom={f.might_contain(address)}\thit={f.contains(address)}")
+
+
+if __name__ == "__main__":
+    main()
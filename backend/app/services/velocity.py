@@ -0,0 +1,240 @@
+"""
+Online per-address velocity features over 1 min / 1 h / 24 h windows.
+
+Every observed transfer updates two states: the sender's outgoing side and
+the receiver's incoming side, keyed by canonical address key. Each window
+is a ring of fixed-width time buckets holding count, amount sum,
+near-threshold count and inter-arrival sums; running totals are kept
+alongside, and buckets that fall out of the window are subtracted as time
+advances, so updates and reads are O(1) amortized. Window edges are
+bucket-aligned, i.e. a window covers between span - width and span
+seconds.
+
+Distinct counterparties are exact: one insertion-ordered dict per window
+(counterparty -> last seen), expired from the front and capped at
+VELOCITY_MAX_COUNTERPARTIES (counts saturate at the cap).
+
+The number of tracked addresses per side is LRU-capped at
+VELOCITY_MAX_ADDRESSES, so memory stays bounded under address churn.
+
+A transfer can reach the store more than once (/risk/check, then
+/risk/predict for the same transfer, or a client retry). Callers that
+pass a request_id get it counted once: the last VELOCITY_SEEN_REQUESTS
+ids are remembered and a repeat only reads the current features.
+"""
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..core.config import (
+    STRUCTURING_BAND_LOW,
+    STRUCTURING_BAND_HIGH,
+    VELOCITY_MAX_ADDRESSES,
+    VELOCITY_MAX_COUNTERPARTIES,
+    VELOCITY_SEEN_REQUESTS,
+)
+from .address import canonical_key
+
+# name -> (span seconds, bucket count)
+WINDOWS: Tuple[Tuple[str, int, int], ...] = (
+    ("1m", 60, 12),
+    ("1h", 3600, 12),
+    ("24h", 86400, 24),
+)
+ROLES = ("out", "in")
+STATS = ("count", "amount_sum", "distinct_counterparties", "gap_mean_s", "gap_std_s", "near_threshold")
+# Stable order of the flattened feature names, e.g. "out_1m_count".
+FEATURE_NAMES = tuple(f"{role}_{w}_{stat}" for role in ROLES for w, _, _ in WINDOWS for stat in STATS)
+_EMPTY = (0,) * len(STATS)
+
+# Per-bucket slots: count, amount, near-threshold, gap n, gap sum, gap sum of squares.
+_SLOTS = 6
+
+
+_ZERO_BUCKET = array("d", [0.0]) * _SLOTS
+
+
+class _Window:
+    __slots__ = ("width", "n", "span", "head", "buckets", "totals", "seen")
+
+    def __init__(self, span: int, n: int):
+        self.span = span
+        self.n = n
+        self.width = span / n
+        self.head = -1  # absolute index of the newest bucket
+        self.buckets = array("d", [0.0]) * (n * _SLOTS)
+        self.totals = [0.0] * _SLOTS
+        self.seen: Dict[bytes, float] = {}
+
+    def _advance(self, b: int) -> None:
+        if b <= self.head:
+            return
+        if b - self.head >= self.n:
+            # Idle for a whole window: everything expired.
+            self.buckets = array("d", [0.0]) * (self.n * _SLOTS)
+            self.totals = [0.0] * _SLOTS
+        else:
+            # Reuse the slots of the buckets that just fell out of the window;
+            # each is cleared at most once per lap, so O(1) amortized.
+            buckets, totals = self.buckets, self.totals
+            for idx in range(self.head + 1, b + 1):
+                base = (idx % self.n) * _SLOTS
+                old = buckets[base : base + _SLOTS]
+                if any(old):
+                    self.totals = totals = [t - x for t, x in zip(totals, old)]
+                    buckets[base : base + _SLOTS] = _ZERO_BUCKET
+        self.head = b
+
+    def add(self, ts: float, amount: float, near: bool, gap: Optional[float], counterparty: Optional[bytes]) -> None:
+        b = int(ts // self.width)
+        self._advance(b)
+        if b <= self.head - self.n:
+            return  # older than the window
+        base = (b % self.n) * _SLOTS
+        buckets, totals = self.buckets, self.totals
+        near_v = 1.0 if near else 0.0
+        buckets[base] += 1.0
+        buckets[base + 1] += amount
+        buckets[base + 2] += near_v
+        totals[0] += 1.0
+        totals[1] += amount
+        totals[2] += near_v
+        if gap is not None:
+            g2 = gap * gap
+            buckets[base + 3] += 1.0
+            buckets[base + 4] += gap
+            buckets[base + 5] += g2
+            totals[3] += 1.0
+            totals[4] += gap
+            totals[5] += g2
+
+        if counterparty is not None:
+            seen = self.seen
+            seen.pop(counterparty, None)
+            if len(seen) < VELOCITY_MAX_COUNTERPARTIES:
+                seen[counterparty] = ts
+            self._expire_seen(ts)
+
+    def _expire_seen(self, now: float) -> None:
+        seen, cutoff = self.seen, now - self.span
+        while seen:
+            first = next(iter(seen))
+            if seen[first] >= cutoff:
+                break
+            del seen[first]
+
+    def snapshot(self, now: float) -> Tuple[float, ...]:
+        self._advance(int(now // self.width))
+        self._expire_seen(now)
+        count, amount, near, gap_n, gap_sum, gap_sq = self.totals
+        gap_mean = gap_sum / gap_n if gap_n >= 1 else 0.0
+        gap_std = math.sqrt(max(0.0, gap_sq / gap_n - gap_mean * gap_mean)) if gap_n >= 1 else 0.0
+        # Float subtraction can leave -0.0000001 behind on empty windows.
+        return (round(max(count, 0.0)), max(amount, 0.0), len(self.seen), gap_mean, gap_std, round(max(near, 0.0)))
+
+
+class _AddressState:
+    __slots__ = ("last_ts", "windows")
+
+    def __init__(self):
+        self.last_ts: Optional[float] = None
+        self.windows = tuple(_Window(span, n) for _, span, n in WINDOWS)
+
+
+class VelocityStore:
+    def __init__(self, max_addresses: int = VELOCITY_MAX_ADDRESSES, max_seen_requests: int = VELOCITY_SEEN_REQUESTS):
+        self.max_addresses = max_addresses
+        self.max_seen_requests = max_seen_requests
+        self._states: Dict[str, "OrderedDict[bytes, _AddressState]"] = {role: OrderedDict() for role in ROLES}
+        self._seen_requests: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.repeats = 0
+
+    def _state(self, role: str, key: bytes, create: bool) -> Optional[_AddressState]:
+        states = self._states[role]
+        state = states.get(key)
+        if state is not None:
+            states.move_to_end(key)
+        elif create:
+            state = states[key] = _AddressState()
+            if len(states) > self.max_addresses:
+                states.popitem(last=False)
+                self.evictions += 1
+        return state
+
+    def _update(self, role: str, key: bytes, counterparty: Optional[bytes], amount: float, ts: float) -> None:
+        state = self._state(role, key, create=True)
+        ts = max(ts, state.last_ts or ts)  # out-of-order arrivals count as "now"
+        gap = ts - state.last_ts if state.last_ts is not None else None
+        state.last_ts = ts
+        near = STRUCTURING_BAND_LOW <= amount < STRUCTURING_BAND_HIGH
+        for window in state.windows:
+            window.add(ts, amount, near, gap, counterparty)
+
+    def observe(
+        self,
+        from_address: Optional[str],
+        to_address: str,
+        amount: float,
+        ts: Optional[float] = None,
+        request_id: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """
+        Record one transfer and return the features including it.
+
+        A request_id that was already recorded is not counted again; the
+        current features are returned instead.
+        """
+        now = time.time() if ts is None else ts
+        to_key = canonical_key(to_address)
+        from_key = canonical_key(from_address) if from_address else None
+        with self._lock:
+            if request_id is not None and not self._first_sighting(request_id):
+                self.repeats += 1
+                return self._features(from_key, to_key, now)
+            if from_key is not None:
+                self._update("out", from_key, to_key, amount, now)
+            self._update("in", to_key, from_key, amount, now)
+            return self._features(from_key, to_key, now)
+
+    def _first_sighting(self, request_id: str) -> bool:
+        seen = self._seen_requests
+        if request_id in seen:
+            return False
+        seen[request_id] = None
+        if len(seen) > self.max_seen_requests:
+            seen.popitem(last=False)
+        return True
+
+    def features(self, from_address: Optional[str], to_address: str, now: Optional[float] = None) -> Dict[str, float]:
+        """Current features without recording anything."""
+        now = time.time() if now is None else now
+        from_key = canonical_key(from_address) if from_address else None
+        with self._lock:
+            return self._features(from_key, canonical_key(to_address), now)
+
+    def _features(self, from_key: Optional[bytes], to_key: bytes, now: float) -> Dict[str, float]:
+        values = []
+        for role, key in (("out", from_key), ("in", to_key)):
+            state = self._state(role, key, create=False) if key is not None else None
+            for window in state.windows if state else (None,) * len(WINDOWS):
+                values.extend(window.snapshot(now) if window else _EMPTY)
+        return dict(zip(FEATURE_NAMES, values))
+
+    def stats(self) -> Dict:
+        return {
+            "tracked_out": len(self._states["out"]),
+            "tracked_in": len(self._states["in"]),
+            "max_addresses": self.max_addresses,
+            "evictions": self.evictions,
+            "seen_requests": len(self._seen_requests),
+            "repeats": self.repeats,
+        }
+
+
+# Process-wide store fed by risk_engine.assess.
+velocity_store = VelocityStore()
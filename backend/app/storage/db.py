@@ -1,12 +1,75 @@
 import sqlite3
+import threading
 from contextlib import contextmanager
-from backend.app.core.config import DB_PATH
+from pathlib import Path
+from typing import List
+
+from backend.app.core.config import DB_BUSY_TIMEOUT_MS, DB_PATH
+
+# One long-lived connection per thread. sqlite3 keeps a per-connection
+# statement cache, so the module-level SQL strings used by the storage
+# layer are compiled once per thread and reused across calls.
+_local = threading.local()
+_conns: List[sqlite3.Connection] = []
+_conns_lock = threading.Lock()
+_generation = 0  # bumped by close_all() so other threads reconnect
+
+STATEMENT_CACHE_SIZE = 256
+
+
+def _connect() -> sqlite3.Connection:
+    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000.0,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers run alongside the single writer; NORMAL only fsyncs
+    # at checkpoints, which is still crash-safe in WAL mode.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
+    return conn
+
+
+def connection() -> sqlite3.Connection:
+    """The calling thread's persistent connection (opened on first use)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.generation != _generation:
+        conn = _connect()
+        with _conns_lock:
+            _conns.append(conn)
+            _local.generation = _generation
+        _local.conn = conn
+    return conn
+
 
 @contextmanager
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    yield connection()
+
+
+@contextmanager
+def transaction():
+    """Yield the thread's connection; commit on success, roll back on error."""
+    conn = connection()
     try:
         yield conn
-    finally:
-        conn.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def close_all() -> None:
+    global _generation
+    with _conns_lock:
+        _generation += 1
+        for conn in _conns:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        _conns.clear()
@@ -0,0 +1,346 @@
+"""
+Schema versioning for the AML backend database.
+
+The applied version lives in SQLite's PRAGMA user_version. Each migration
+runs in its own transaction and bumps the version, so a crash mid-way
+leaves the database at the last completed version.
+"""
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from ..services.address import canonical_key
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def iso_to_us(ts: Optional[str]) -> Optional[int]:
+    """ISO-8601 timestamp (naive = UTC) -> integer epoch microseconds."""
+    if ts is None:
+        return None
+    dt = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def us_to_iso(us: Optional[int]) -> Optional[str]:
+    if us is None:
+        return None
+    return datetime.fromtimestamp(us // 1_000_000, tz=timezone.utc).replace(microsecond=us % 1_000_000).isoformat()
+
+
+def _v1_initial(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS intercept_log (
+        request_id TEXT PRIMARY KEY,
+        ts TEXT,
+        chain TEXT,
+        from_address TEXT,
+        to_address TEXT,
+        amount_usdt REAL,
+        risk_score INTEGER,
+        risk_level TEXT,
+        decision TEXT,
+        reason_codes TEXT,
+        forced INTEGER DEFAULT 0,
+        tx_hash TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS list_store (
+        kind TEXT,
+        address TEXT,
+        PRIMARY KEY(kind, address)
+    )
+    """)
+
+
+def _v2_integer_ts_and_indexes(conn: sqlite3.Connection) -> None:
+    # ts becomes epoch microseconds so ordering and range scans compare
+    # integers; unparseable legacy values fall back to 0 rather than abort.
+    def convert(ts):
+        try:
+            return iso_to_us(ts)
+        except (TypeError, ValueError):
+            return 0
+
+    conn.create_function("iso_to_us", 1, convert, deterministic=True)
+    conn.execute("""
+    CREATE TABLE intercept_log_v2 (
+        request_id TEXT PRIMARY KEY,
+        ts INTEGER NOT NULL,
+        chain TEXT,
+        from_address TEXT,
+        to_address TEXT,
+        amount_usdt REAL,
+        risk_score INTEGER,
+        risk_level TEXT,
+        decision TEXT,
+        reason_codes TEXT,
+        forced INTEGER DEFAULT 0,
+        tx_hash TEXT
+    )
+    """)
+    conn.execute("""
+    INSERT INTO intercept_log_v2
+    SELECT request_id, COALESCE(iso_to_us(ts), 0), chain, from_address, to_address, amount_usdt,
+           risk_score, risk_level, decision, reason_codes, forced, tx_hash
+    FROM intercept_log
+    ORDER BY ts
+    """)
+    conn.execute("DROP TABLE intercept_log")
+    conn.execute("ALTER TABLE intercept_log_v2 RENAME TO intercept_log")
+    # Keyset pages order by (ts, rowid); rowid is implicitly the last
+    # column of every index, so these serve the ORDER BY without a sort.
+    conn.execute("CREATE INDEX idx_intercept_ts ON intercept_log(ts)")
+    conn.execute("CREATE INDEX idx_intercept_to_ts ON intercept_log(to_address, ts)")
+    conn.execute("CREATE INDEX idx_intercept_decision_ts ON intercept_log(decision, ts)")
+
+
+def _v3_list_change_log(conn: sqlite3.Connection) -> None:
+    # Append-only log of list_store changes, filled by triggers so every
+    # writer is captured. Its max(seq) is the list version each worker
+    # compares against to apply only what changed.
+    conn.execute("""
+    CREATE TABLE list_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        address TEXT NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('ADD', 'REMOVE'))
+    )
+    """)
+    conn.execute("""
+    CREATE TRIGGER list_store_after_insert AFTER INSERT ON list_store
+    BEGIN
+        INSERT INTO list_changes(kind, address, op) VALUES (NEW.kind, NEW.address, 'ADD');
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER list_store_after_delete AFTER DELETE ON list_store
+    BEGIN
+        INSERT INTO list_changes(kind, address, op) VALUES (OLD.kind, OLD.address, 'REMOVE');
+    END
+    """)
+
+
+def _v4_address_keys(conn: sqlite3.Connection) -> None:
+    # Addresses are compared on canonical binary keys (services/address.py)
+    # so checksum/lowercase ETH and base58/hex TRON forms of one account
+    # match. The text column keeps the form that was submitted.
+    conn.create_function("address_key", 1, lambda a: None if a is None else canonical_key(a), deterministic=True)
+
+    conn.execute("""
+    CREATE TABLE list_store_v4 (
+        kind TEXT NOT NULL,
+        address_key BLOB NOT NULL,
+        address TEXT NOT NULL,
+        PRIMARY KEY(kind, address_key)
+    ) WITHOUT ROWID
+    """)
+    # Rows that collapse onto one key keep the first-added text form.
+    conn.execute("""
+    INSERT OR IGNORE INTO list_store_v4(kind, address_key, address)
+    SELECT kind, address_key(address), address FROM list_store ORDER BY rowid
+    """)
+    conn.execute("DROP TABLE list_store")  # also drops the v3 triggers
+    conn.execute("ALTER TABLE list_store_v4 RENAME TO list_store")
+
+    conn.execute("ALTER TABLE list_changes ADD COLUMN address_key BLOB")
+    conn.execute("UPDATE list_changes SET address_key = address_key(address)")
+    conn.execute("""
+    CREATE TRIGGER list_store_after_insert AFTER INSERT ON list_store
+    BEGIN
+        INSERT INTO list_changes(kind, address, address_key, op) VALUES (NEW.kind, NEW.address, NEW.address_key, 'ADD');
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER list_store_after_delete AFTER DELETE ON list_store
+    BEGIN
+        INSERT INTO list_changes(kind, address, address_key, op) VALUES (OLD.kind, OLD.address, OLD.address_key, 'REMOVE');
+    END
+    """)
+
+    conn.execute("ALTER TABLE intercept_log ADD COLUMN to_address_key BLOB")
+    conn.execute("UPDATE intercept_log SET to_address_key = address_key(to_address)")
+    conn.execute("DROP INDEX idx_intercept_to_ts")
+    conn.execute("CREATE INDEX idx_intercept_to_key_ts ON intercept_log(to_address_key, ts)")
+
+
+def _v5_decision_cache_key(conn: sqlite3.Connection) -> None:
+    # Which decision-cache entry produced the verdict (NULL = cache off).
+    conn.execute("ALTER TABLE intercept_log ADD COLUMN cache_key TEXT")
+    conn.execute("ALTER TABLE intercept_log ADD COLUMN cache_hit INTEGER DEFAULT 0")
+
+
+_HOUR_US = 3_600_000_000
+
+# Rollup tables kept current by triggers on intercept_log, so dashboard
+# views read a few hundred pre-aggregated rows instead of raw intercepts.
+# max_risk is a high-water mark: it is raised on insert/update but never
+# lowered when rows are updated or deleted.
+_STATS_TABLES = (
+    """
+    CREATE TABLE stats_address (
+        to_address_key BLOB PRIMARY KEY,
+        to_address TEXT,
+        tx_count INTEGER NOT NULL DEFAULT 0,
+        risk_sum INTEGER NOT NULL DEFAULT 0,
+        max_risk INTEGER NOT NULL DEFAULT 0,
+        blocked INTEGER NOT NULL DEFAULT 0,
+        forced INTEGER NOT NULL DEFAULT 0,
+        last_ts INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE stats_edge (
+        from_address_key BLOB NOT NULL,
+        to_address_key BLOB NOT NULL,
+        from_address TEXT,
+        to_address TEXT,
+        tx_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (from_address_key, to_address_key)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE stats_hourly (
+        bucket INTEGER NOT NULL,
+        decision TEXT NOT NULL,
+        risk_level TEXT NOT NULL,
+        n INTEGER NOT NULL DEFAULT 0,
+        forced INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (bucket, decision, risk_level)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE stats_risk_hist (
+        risk_score INTEGER PRIMARY KEY,
+        n INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+)
+
+
+def _stats_add(row: str) -> str:
+    """Trigger body statements adding `row` (NEW) to every rollup."""
+    return f"""
+        INSERT INTO stats_address(to_address_key, to_address, tx_count, risk_sum, max_risk, blocked, forced, last_ts)
+        VALUES ({row}.to_address_key, {row}.to_address, 1, COALESCE({row}.risk_score, 0), COALESCE({row}.risk_score, 0),
+                {row}.decision = 'BLOCK', COALESCE({row}.forced, 0) = 1, {row}.ts)
+        ON CONFLICT(to_address_key) DO UPDATE SET
+            tx_count = tx_count + 1,
+            risk_sum = risk_sum + excluded.risk_sum,
+            max_risk = MAX(max_risk, excluded.max_risk),
+            blocked = blocked + excluded.blocked,
+            forced = forced + excluded.forced,
+            last_ts = MAX(last_ts, excluded.last_ts);
+        INSERT INTO stats_edge(from_address_key, to_address_key, from_address, to_address, tx_count)
+        SELECT {row}.from_address_key, {row}.to_address_key, {row}.from_address, {row}.to_address, 1
+        WHERE {row}.from_address_key IS NOT NULL
+        ON CONFLICT(from_address_key, to_address_key) DO UPDATE SET tx_count = tx_count + 1;
+        INSERT INTO stats_hourly(bucket, decision, risk_level, n, forced)
+        VALUES ({row}.ts / {_HOUR_US} * {_HOUR_US}, COALESCE({row}.decision, ''), COALESCE({row}.risk_level, ''),
+                1, COALESCE({row}.forced, 0) = 1)
+        ON CONFLICT(bucket, decision, risk_level) DO UPDATE SET n = n + 1, forced = forced + excluded.forced;
+        INSERT INTO stats_risk_hist(risk_score, n) VALUES (COALESCE({row}.risk_score, 0), 1)
+        ON CONFLICT(risk_score) DO UPDATE SET n = n + 1;
+    """
+
+
+def _stats_remove(row: str) -> str:
+    """Trigger body statements taking `row` (OLD) back out of the rollups."""
+    return f"""
+        UPDATE stats_address SET
+            tx_count = tx_count - 1,
+            risk_sum = risk_sum - COALESCE({row}.risk_score, 0),
+            blocked = blocked - ({row}.decision = 'BLOCK'),
+            forced = forced - (COALESCE({row}.forced, 0) = 1)
+        WHERE to_address_key = {row}.to_address_key;
+        UPDATE stats_edge SET tx_count = tx_count - 1
+        WHERE from_address_key = {row}.from_address_key AND to_address_key = {row}.to_address_key;
+        UPDATE stats_hourly SET n = n - 1, forced = forced - (COALESCE({row}.forced, 0) = 1)
+        WHERE bucket = {row}.ts / {_HOUR_US} * {_HOUR_US}
+          AND decision = COALESCE({row}.decision, '') AND risk_level = COALESCE({row}.risk_level, '');
+        UPDATE stats_risk_hist SET n = n - 1 WHERE risk_score = COALESCE({row}.risk_score, 0);
+    """
+
+
+def _v6_dashboard_rollups(conn: sqlite3.Connection) -> None:
+    conn.create_function("address_key", 1, lambda a: None if a is None else canonical_key(a), deterministic=True)
+    conn.execute("ALTER TABLE intercept_log ADD COLUMN from_address_key BLOB")
+    conn.execute("UPDATE intercept_log SET from_address_key = address_key(from_address) WHERE from_address <> ''")
+
+    for ddl in _STATS_TABLES:
+        conn.execute(ddl)
+    # Backfill from existing rows, then let the triggers keep up.
+    conn.execute("""
+    INSERT INTO stats_address(to_address_key, to_address, tx_count, risk_sum, max_risk, blocked, forced, last_ts)
+    SELECT to_address_key, MAX(to_address), COUNT(*), COALESCE(SUM(risk_score), 0), COALESCE(MAX(risk_score), 0),
+           SUM(decision = 'BLOCK'), SUM(COALESCE(forced, 0) = 1), MAX(ts)
+    FROM intercept_log GROUP BY to_address_key
+    """)
+    conn.execute("""
+    INSERT INTO stats_edge(from_address_key, to_address_key, from_address, to_address, tx_count)
+    SELECT from_address_key, to_address_key, MAX(from_address), MAX(to_address), COUNT(*)
+    FROM intercept_log WHERE from_address_key IS NOT NULL GROUP BY from_address_key, to_address_key
+    """)
+    conn.execute(f"""
+    INSERT INTO stats_hourly(bucket, decision, risk_level, n, forced)
+    SELECT ts / {_HOUR_US} * {_HOUR_US}, COALESCE(decision, ''), COALESCE(risk_level, ''),
+           COUNT(*), SUM(COALESCE(forced, 0) = 1)
+    FROM intercept_log GROUP BY 1, 2, 3
+    """)
+    conn.execute("""
+    INSERT INTO stats_risk_hist(risk_score, n)
+    SELECT COALESCE(risk_score, 0), COUNT(*) FROM intercept_log GROUP BY 1
+    """)
+
+    conn.execute(f"CREATE TRIGGER intercept_stats_insert AFTER INSERT ON intercept_log BEGIN {_stats_add('NEW')} END")
+    conn.execute(f"CREATE TRIGGER intercept_stats_delete AFTER DELETE ON intercept_log BEGIN {_stats_remove('OLD')} END")
+    conn.execute(
+        f"CREATE TRIGGER intercept_stats_update AFTER UPDATE ON intercept_log "
+        f"BEGIN {_stats_remove('OLD')} {_stats_add('NEW')} END"
+    )
+    conn.execute("CREATE INDEX idx_stats_address_max_risk ON stats_address(max_risk DESC, tx_count DESC)")
+    conn.execute("CREATE INDEX idx_stats_edge_count ON stats_edge(tx_count DESC)")
+
+
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _v1_initial),
+    (2, _v2_integer_ts_and_indexes),
+    (3, _v3_list_change_log),
+    (4, _v4_address_keys),
+    (5, _v5_decision_cache_key),
+    (6, _v6_dashboard_rollups),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations; returns the resulting schema version."""
+    current = schema_version(conn)
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(f"database schema v{current} is newer than this code (v{SCHEMA_VERSION})")
+
+    for version, step in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another worker may have migrated while we waited for the lock.
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        current = version
+    return current
@@ -1,22 +1,8 @@
 from typing import List, Dict, Optional
-from backend.app.storage.db import get_conn
+from backend.app.utils.logger import get_by_request_id, get_recent_intercepts
 
 def fetch_recent_intercepts(limit: int = 200) -> List[Dict]:
-    with get_conn() as conn:
-        cur = conn.execute("""
-            SELECT *
-            FROM intercept_log
-            ORDER BY ts DESC
-            LIMIT ?
-        """, (limit,))
-        return [dict(row) for row in cur.fetchall()]
+    return get_recent_intercepts(limit)
 
 def fetch_intercept_by_request_id(request_id: str) -> Optional[Dict]:
-    with get_conn() as conn:
-        cur = conn.execute("""
-            SELECT *
-            FROM intercept_log
-            WHERE request_id = ?
-        """, (request_id,))
-        row = cur.fetchone()
-        return dict(row) if row else None
+    return get_by_request_id(request_id)
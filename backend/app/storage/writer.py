@@ -0,0 +1,190 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..services.batcher import Histogram, _pow2_bounds
+
+WriteFn = Callable[[Sequence[Dict[str, Any]]], None]
+
+_STOP = object()
+
+log = logging.getLogger(__name__)
+
+
+class WriterBusy(Exception):
+    """The write-behind queue stayed full for the whole enqueue timeout."""
+
+
+class GroupCommitWriter:
+    """
+    Write-behind queue for intercept_log rows.
+
+    Rows are coalesced into one `write_fn` call (a single executemany +
+    commit) per group of up to `max_batch` rows or `flush_ms` after the
+    oldest queued row. The queue is bounded: when it is full, `submit`
+    blocks for up to `enqueue_timeout_s` and then raises WriterBusy, so a
+    slow disk pushes back on callers instead of growing memory.
+
+    Rows that are queued but not yet committed stay visible through
+    `pending()`, so read-after-write lookups by request_id still work.
+
+    If a group commit fails, its rows are retried one per commit, so one
+    bad row (or a transient error) only fails that row's caller.
+    """
+
+    def __init__(
+        self,
+        write_fn: WriteFn,
+        max_batch: int = 256,
+        flush_ms: float = 5.0,
+        max_queue: int = 10000,
+        enqueue_timeout_s: float = 1.0,
+    ):
+        self.write_fn = write_fn
+        self.max_batch = max(1, int(max_batch))
+        self.flush_s = max(0.0, flush_ms) / 1000.0
+        self.enqueue_timeout_s = enqueue_timeout_s
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+
+        self.batch_size_hist = Histogram(_pow2_bounds(self.max_batch))
+        self.commit_ms_hist = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100, 250])
+        self.rows_committed = 0
+        self.rows_failed = 0
+        self.busy_rejections = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="aml-intercept-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything queued so far, then stop the worker."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, row: Dict[str, Any]) -> Future:
+        fut: Future = Future()
+        with self._pending_lock:
+            self._pending[row["request_id"]] = row
+        try:
+            self._queue.put((row, fut), timeout=self.enqueue_timeout_s)
+        except queue.Full:
+            self._forget([row])
+            self.busy_rejections += 1
+            raise WriterBusy(f"intercept writer queue full ({self._queue.maxsize} rows)") from None
+        return fut
+
+    def write(self, row: Dict[str, Any], durable: bool = False, timeout: Optional[float] = None) -> None:
+        """Queue a row; with durable=True also wait until its group has committed."""
+        fut = self.submit(row)
+        if durable:
+            fut.result(timeout=timeout)
+
+    def pending(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._pending_lock:
+            row = self._pending.get(request_id)
+            return dict(row) if row is not None else None
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "max_batch": self.max_batch,
+            "flush_ms": self.flush_s * 1000.0,
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "rows_committed": self.rows_committed,
+            "rows_failed": self.rows_failed,
+            "busy_rejections": self.busy_rejections,
+            "batch_size": self.batch_size_hist.snapshot(),
+            "commit_ms": self.commit_ms_hist.snapshot(),
+        }
+
+    # ------------------------------------------------------------
+    # Worker loop
+    # ------------------------------------------------------------
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = time.perf_counter() + self.flush_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+        # Drain anything that raced with shutdown so no row is lost.
+        leftover: List = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for i in range(0, len(leftover), self.max_batch):
+            self._flush(leftover[i : i + self.max_batch])
+
+    def _flush(self, batch: List) -> None:
+        rows = [row for row, _ in batch]
+        t0 = time.perf_counter()
+        try:
+            self.write_fn(rows)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            log.warning("group commit of %d rows failed (%s); retrying row by row", len(rows), e)
+            for item in batch:
+                self._flush([item])
+            return
+
+        self.commit_ms_hist.observe((time.perf_counter() - t0) * 1000.0)
+        self.batch_size_hist.observe(len(rows))
+        self.rows_committed += len(rows)
+        self._forget(rows)
+        for _, fut in batch:
+            fut.set_result(None)
+
+    def _fail(self, batch: List, error: Exception) -> None:
+        rows = [row for row, _ in batch]
+        self.rows_failed += len(rows)
+        self._forget(rows)
+        for row in rows:
+            log.error("intercept %s not logged: %s", row.get("request_id"), error)
+        for _, fut in batch:
+            fut.set_exception(error)
+
+    def _forget(self, rows: Sequence[Dict[str, Any]]) -> None:
+        with self._pending_lock:
+            for row in rows:
+                # A newer write for the same request_id keeps its own entry.
+                if self._pending.get(row["request_id"]) is row:
+                    del self._pending[row["request_id"]]
@@ -0,0 +1,122 @@
+"""
+In-process pub/sub with a bounded replay buffer, served as Server-Sent Events.
+
+Writers (intercept logging here, alert writes in the wallet service) call
+`publish` from any thread once their rows are committed. Each event gets a
+sequence number; the last EVENTS_REPLAY_MAX events are kept so a client
+that reconnects with its last seen id (`?cursor=` or the Last-Event-ID
+header browsers send) receives only what it missed. A client whose cursor
+has already left the buffer gets a `reset` event and should refetch a
+snapshot. Subscribers hold only a cursor and a wake-up flag, so a slow
+reader never backs up writers or grows memory.
+
+Sequence numbers are per process; a cursor ahead of the bus (the service
+restarted) also gets a `reset`.
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+EVENTS_REPLAY_MAX = int(os.getenv("EVENTS_REPLAY_MAX", 1000))
+EVENTS_HEARTBEAT_S = float(os.getenv("EVENTS_HEARTBEAT_S", 15))
+
+
+class EventBus:
+    def __init__(self, replay_max: int = 1000):
+        self._buffer: "deque[Tuple[int, Dict[str, Any]]]" = deque(maxlen=replay_max)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def cursor(self) -> int:
+        return self._seq
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.publish_many([event])
+
+    def publish_many(self, events: List[Dict[str, Any]]) -> None:
+        if not events:
+            return
+        with self._lock:
+            for event in events:
+                self._seq += 1
+                self._buffer.append((self._seq, event))
+            waiters = list(self._waiters)
+        for loop, flag in waiters:
+            try:
+                loop.call_soon_threadsafe(flag.set)
+            except RuntimeError:  # loop already closed
+                pass
+
+    def since(self, cursor: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], bool]:
+        """Events after `cursor`, oldest first, and whether the client missed any
+        (evicted from the buffer, or the cursor is from before a restart)."""
+        with self._lock:
+            restarted = cursor > self._seq
+            if restarted:
+                cursor = 0
+            out = []
+            for seq, event in reversed(self._buffer):
+                if seq <= cursor:
+                    break
+                out.append((seq, event))
+            oldest = self._buffer[0][0] if self._buffer else self._seq + 1
+        out.reverse()
+        return out, restarted or cursor + 1 < oldest
+
+    async def stream(self, cursor: int, event_name: str) -> AsyncIterator[str]:
+        """SSE frames from `cursor` on; a comment heartbeat keeps idle proxies from closing."""
+        flag = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), flag)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            # First frame tells a fresh client where the stream starts, so it can
+            # load a snapshot and dedupe the overlap instead of missing rows.
+            yield f"id: {cursor}\nevent: hello\ndata: {{}}\n\n"
+            while True:
+                flag.clear()
+                events, gap = self.since(cursor)
+                if gap:
+                    cursor = events[0][0] - 1 if events else self.cursor
+                    yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n"
+                for seq, event in events:
+                    yield f"id: {seq}\nevent: {event_name}\ndata: {json.dumps(event, default=str)}\n\n"
+                    cursor = seq
+                try:
+                    await asyncio.wait_for(flag.wait(), EVENTS_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cursor": self._seq,
+                "buffered": len(self._buffer),
+                "replay_max": self._buffer.maxlen,
+                "subscribers": len(self._waiters),
+            }
+
+
+def parse_cursor(cursor: Optional[str], last_event_id: Optional[str]) -> Optional[int]:
+    """Explicit ?cursor= wins over the Last-Event-ID header; None = start from now."""
+    raw = cursor if cursor not in (None, "") else last_event_id
+    if raw in (None, ""):
+        return None
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        raise ValueError("cursor must be an integer event id")
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Backend intercepts (published by utils/logger.py after each commit).
+intercept_bus = EventBus(EVENTS_REPLAY_MAX)
@@ -0,0 +1,160 @@
+"""
+Monotonic, sortable request IDs shared by the AML backend and the wallet.
+
+Snowflake layout in 64 bits, rendered as 16 lowercase hex characters (the
+same width as the old truncated SHA-256 IDs):
+
+    42 bits  milliseconds since 2024-01-01 UTC   (~139 years)
+    10 bits  node id, claimed per process         (0..1023)
+    12 bits  per-process sequence within the ms   (4096 IDs/ms/node)
+
+Fixed-width hex sorts like the integer, so IDs sort by creation time and
+new intercept_log rows append at the right edge of the request_id index
+instead of landing on random pages. Within a process IDs never repeat: if
+the clock steps back or a millisecond's sequence runs out, the generator
+keeps counting from the last timestamp instead of waiting.
+
+Uniqueness across processes comes from the node id, which every process
+claims for itself: it takes an exclusive, non-blocking lock on the first
+free <ID_NODE_LOCK_DIR>/<node>.lock in [ID_NODE_ID, ID_NODE_ID +
+ID_NODE_SLOTS) and holds it for its lifetime (flock on POSIX,
+msvcrt.locking on Windows). Forked workers claim a fresh one in the child
+and spawned workers claim one on import, so no two live processes on a
+host share a node id; the OS drops the lock with the process, even on a
+crash. Hosts that write to the same database need disjoint ranges
+(ID_NODE_ID is the host's base). A platform with neither lock API fails
+at import instead of guessing a node id.
+
+Benchmark against the SHA-256 path:
+    python -m backend.app.utils.ids
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+NODE_BITS = 10
+SEQ_BITS = 12
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQ = (1 << SEQ_BITS) - 1
+
+# This host's node ids: [ID_NODE_ID, ID_NODE_ID + ID_NODE_SLOTS).
+ID_NODE_ID = int(os.getenv("ID_NODE_ID", 0))
+ID_NODE_SLOTS = int(os.getenv("ID_NODE_SLOTS", MAX_NODE + 1 - ID_NODE_ID))
+ID_NODE_LOCK_DIR = os.getenv("ID_NODE_LOCK_DIR") or os.path.join(tempfile.gettempdir(), "wallet-firewall-node-ids")
+
+
+def _try_lock(fd: int) -> bool:
+    """Exclusive, non-blocking lock on an open file; False if another process holds it."""
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+    if msvcrt is not None:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)  # first byte; the file may be empty
+        except OSError:
+            return False
+        return True
+    raise RuntimeError("no file locking on this platform (fcntl / msvcrt); cannot claim a unique node id")
+
+
+def claim_node_id(base: int, slots: int, lock_dir: str) -> Tuple[int, int]:
+    """Lock the first free node id in [base, base + slots); returns (node id, fd holding the lock)."""
+    os.makedirs(lock_dir, exist_ok=True)
+    last = min(base + slots, MAX_NODE + 1)
+    for node_id in range(base, last):
+        fd = os.open(os.path.join(lock_dir, f"{node_id}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            locked = _try_lock(fd)
+        except BaseException:
+            os.close(fd)
+            raise
+        if locked:
+            return node_id, fd
+        os.close(fd)
+    raise RuntimeError(f"no free node id in [{base}, {last}) under {lock_dir}; raise ID_NODE_SLOTS")
+
+
+class IdGenerator:
+    def __init__(self, node_id: Optional[int] = None):
+        self._lock_fd: Optional[int] = None
+        if node_id is None:
+            node_id, self._lock_fd = claim_node_id(ID_NODE_ID, ID_NODE_SLOTS, ID_NODE_LOCK_DIR)
+        if not 0 <= node_id <= MAX_NODE:
+            raise ValueError(f"node id must be in [0, {MAX_NODE}]")
+        self.node_id = node_id
+        self._node_bits = node_id << SEQ_BITS
+        self._last_ms = -1
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _reclaim_after_fork(self) -> None:
+        # The child inherited the parent's lock fd: closing this copy leaves
+        # the parent's claim intact, and the child claims a node id of its own.
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self.__init__()
+
+    def next_int(self) -> int:
+        with self._lock:
+            now = time.time_ns() // 1_000_000 - EPOCH_MS
+            if now > self._last_ms:
+                self._last_ms = now
+                self._seq = 0
+            else:
+                self._seq += 1
+                if self._seq > MAX_SEQ:
+                    self._last_ms += 1
+                    self._seq = 0
+            return (self._last_ms << (NODE_BITS + SEQ_BITS)) | self._node_bits | self._seq
+
+    def next(self) -> str:
+        return format(self.next_int(), "016x")
+
+
+def parse_id(request_id: str) -> Tuple[datetime, int, int]:
+    """(created_at, node_id, sequence) of an ID made by IdGenerator."""
+    value = int(request_id, 16)
+    ms = (value >> (NODE_BITS + SEQ_BITS)) + EPOCH_MS
+    node = (value >> SEQ_BITS) & MAX_NODE
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc), node, value & MAX_SEQ
+
+
+_generator = IdGenerator()
+if hasattr(os, "register_at_fork"):
+    # Forked workers (uvicorn/gunicorn) must not share the parent's node id.
+    os.register_at_fork(after_in_child=lambda: _generator._reclaim_after_fork())
+
+
+def new_request_id() -> str:
+    return _generator.next()
+
+
+if __name__ == "__main__":
+    import timeit
+
+    def sha_path(chain="TRON", addr="TJRabPrwbZy45sbavfcjinPJC18kjpRTv8", amount=1234.5):
+        raw = f"{time.time()}|{chain}|{addr}|{amount}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()[:16]
+
+    n = 200_000
+    for name, fn in (("sha256", sha_path), ("snowflake", new_request_id)):
+        per_call = min(timeit.repeat(fn, number=n, repeat=5)) / n * 1e9
+        ids = [fn() for _ in range(n)]
+        print(f"{name:<10} {per_call:7.0f} ns/id  duplicates in {n} back-to-back calls: {n - len(set(ids))}")
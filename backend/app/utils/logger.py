@@ -1,85 +1,182 @@
-import sqlite3
-from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..services.address import canonical_key
+from ..storage.db import connection, transaction
+from ..storage.migrations import iso_to_us, migrate, us_to_iso
+from .events import intercept_bus
+
+# SQL kept as module constants so each thread's connection compiles them
+# once and serves later calls from its statement cache.
+# Upsert rather than INSERT OR REPLACE: a re-logged request (tx_send
+# setting forced / tx_hash) keeps its rowid, so keyset order is stable
+# and the rollup triggers see one UPDATE instead of a delete + insert.
+# Only a re-log of the same request (same ts, receiver and amount) may
+# update; any other row with that request_id is left untouched and
+# reported as a RequestIdConflict.
+_INSERT_INTERCEPT = """
+INSERT INTO intercept_log
+(request_id, ts, chain, from_address, from_address_key, to_address, to_address_key, amount_usdt,
+ risk_score, risk_level, decision, reason_codes, forced, tx_hash, cache_key, cache_hit)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(request_id) DO UPDATE SET
+    forced = excluded.forced, tx_hash = excluded.tx_hash
+WHERE intercept_log.ts = excluded.ts
+  AND intercept_log.to_address_key = excluded.to_address_key
+  AND intercept_log.amount_usdt = excluded.amount_usdt
+"""
+_INTERCEPT_COLUMNS = (
+    "request_id, ts, chain, from_address, to_address, amount_usdt, "
+    "risk_score, risk_level, decision, reason_codes, forced, tx_hash, cache_key, cache_hit"
+)
+_SELECT_IDENTITY = "SELECT ts, to_address_key, amount_usdt FROM intercept_log WHERE request_id=?"
+_SELECT_BY_REQUEST_ID = f"""
+SELECT {_INTERCEPT_COLUMNS}
+FROM intercept_log
+WHERE request_id=?
+"""
+# Filters allowed in keyset queries (filter -> indexed column, value encoder).
+_PAGE_FILTERS = {
+    "to_address": ("to_address_key", canonical_key),
+    "decision": ("decision", str),
+    "risk_level": ("risk_level", str),
+}
+_LIST_ADD = "INSERT OR IGNORE INTO list_store(kind, address_key, address) VALUES(?, ?, ?)"
+_LIST_REMOVE = "DELETE FROM list_store WHERE kind=? AND address_key=?"
+_LIST_GET = "SELECT address FROM list_store WHERE kind=?"
 
-DB_PATH = Path(__file__).resolve().parents[3] / "data" / "app.db"
 
 def init_db():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS intercept_log (
-            request_id TEXT PRIMARY KEY,
-            ts TEXT,
-            chain TEXT,
-            from_address TEXT,
-            to_address TEXT,
-            amount_usdt REAL,
-            risk_score INTEGER,
-            risk_level TEXT,
-            decision TEXT,
-            reason_codes TEXT,
-            forced INTEGER DEFAULT 0,
-            tx_hash TEXT
-        )
-        """)
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS list_store (
-            kind TEXT,
-            address TEXT,
-            PRIMARY KEY(kind, address)
-        )
-        """)
-        conn.commit()
+    migrate(connection())
+
+
+def _intercept_params(row: Dict[str, Any]):
+    return (
+        row["request_id"], iso_to_us(row["ts"]), row["chain"],
+        row.get("from_address"), canonical_key(row["from_address"]) if row.get("from_address") else None,
+        row["to_address"], canonical_key(row["to_address"]), row["amount_usdt"],
+        row["risk_score"], row["risk_level"], row["decision"], row["reason_codes"],
+        row.get("forced", 0), row.get("tx_hash"), row.get("cache_key"), row.get("cache_hit", 0),
+    )
+
+
+class RequestIdConflict(ValueError):
+    """A request_id is already logged for a different request (an ID collision)."""
+
+
+def _check_written(conn, params: List[tuple], written: int) -> None:
+    # Raised inside the transaction, so the whole statement rolls back.
+    if written == len(params):
+        return
+    conflicts = [
+        p[0] for p in params
+        if conn.execute(_SELECT_IDENTITY, (p[0],)).fetchone() != (p[1], p[6], p[7])
+    ]
+    raise RequestIdConflict(f"request_id already used by another request: {', '.join(conflicts)}")
+
 
 def log_intercept(row: Dict[str, Any]):
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("""
-        INSERT OR REPLACE INTO intercept_log
-        (request_id, ts, chain, from_address, to_address, amount_usdt, risk_score, risk_level, decision, reason_codes, forced, tx_hash)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            row["request_id"], row["ts"], row["chain"], row.get("from_address"),
-            row["to_address"], row["amount_usdt"], row["risk_score"], row["risk_level"],
-            row["decision"], row["reason_codes"], row.get("forced", 0), row.get("tx_hash")
-        ))
-        conn.commit()
+    params = [_intercept_params(row)]
+    with transaction() as conn:
+        _check_written(conn, params, conn.execute(_INSERT_INTERCEPT, params[0]).rowcount)
+    intercept_bus.publish(dict(row))
+
+
+def log_intercepts(rows: Sequence[Dict[str, Any]]):
+    """Group commit: all rows in one executemany + one transaction."""
+    params = [_intercept_params(row) for row in rows]
+    with transaction() as conn:
+        _check_written(conn, params, conn.executemany(_INSERT_INTERCEPT, params).rowcount)
+    # Published only once committed, so stream clients never see a rolled-back row.
+    intercept_bus.publish_many([dict(row) for row in rows])
+
 
 def list_add(kind: str, address: str):
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("INSERT OR IGNORE INTO list_store(kind, address) VALUES(?, ?)", (kind, address))
-        conn.commit()
+    with transaction() as conn:
+        conn.execute(_LIST_ADD, (kind, canonical_key(address), address.strip()))
+
 
 def list_remove(kind: str, address: str):
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("DELETE FROM list_store WHERE kind=? AND address=?", (kind, address))
-        conn.commit()
+    with transaction() as conn:
+        conn.execute(_LIST_REMOVE, (kind, canonical_key(address)))
+
 
 def list_get(kind: str):
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute("SELECT address FROM list_store WHERE kind=?", (kind,))
-        return [r[0] for r in cur.fetchall()]
-
-def get_recent_intercepts(limit: int = 200):
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute("""
-        SELECT request_id, ts, chain, from_address, to_address, amount_usdt, risk_score, risk_level, decision, reason_codes, forced, tx_hash
-        FROM intercept_log
-        ORDER BY ts DESC
-        LIMIT ?
-        """, (limit,))
-        cols = [d[0] for d in cur.description]
-        return [dict(zip(cols, r)) for r in cur.fetchall()]
+    cur = connection().execute(_LIST_GET, (kind,))
+    return [r[0] for r in cur.fetchall()]
+
+
+def _row_out(row) -> Dict[str, Any]:
+    out = dict(row)
+    out["ts"] = us_to_iso(out["ts"])
+    out.pop("rowid", None)
+    return out
+
+
+def _encode_cursor(ts: int, rowid: int) -> str:
+    return f"{ts}.{rowid}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        ts, rowid = cursor.split(".", 1)
+        return int(ts), int(rowid)
+    except ValueError:
+        raise ValueError(f"invalid cursor {cursor!r}") from None
+
+
+def query_intercepts(
+    limit: int = 200,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    **filters: Optional[str],
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Newest-first keyset page of intercept_log.
+
+    `cursor` is the `next_cursor` of the previous page; each page is one
+    index range scan from (ts, rowid) onwards, so deep pages cost the same
+    as the first. Supported filters: to_address (matched on its canonical
+    key, so any address form finds the same rows), decision, risk_level.
+    `since` (ISO timestamp, inclusive) limits the page to rows at or after
+    it, for clients that only fetch what is new since their last poll.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    where: List[str] = []
+    params: List[Any] = []
+    for name, value in filters.items():
+        if name not in _PAGE_FILTERS:
+            raise ValueError(f"unsupported filter {name!r}")
+        if value is not None:
+            column, encode = _PAGE_FILTERS[name]
+            where.append(f"{column} = ?")
+            params.append(encode(value))
+    if since:
+        where.append("ts >= ?")
+        params.append(iso_to_us(since))
+    if cursor:
+        where.append("(ts, rowid) < (?, ?)")
+        params.extend(_decode_cursor(cursor))
+
+    sql = f"SELECT rowid, {_INTERCEPT_COLUMNS} FROM intercept_log"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ts DESC, rowid DESC LIMIT ?"
+    params.append(limit + 1)  # one extra row tells us whether another page exists
+
+    rows = connection().execute(sql, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(last["ts"], last["rowid"])
+    return [_row_out(r) for r in rows], next_cursor
+
+
+def get_recent_intercepts(limit: int = 200, since: Optional[str] = None):
+    items, _ = query_intercepts(limit, since=since)
+    return items
+
 
 def get_by_request_id(request_id: str):
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute("""
-        SELECT request_id, ts, chain, from_address, to_address, amount_usdt, risk_score, risk_level, decision, reason_codes, forced, tx_hash
-        FROM intercept_log
-        WHERE request_id=?
-        """, (request_id,))
-        row = cur.fetchone()
-        if not row:
-            return None
-        cols = [d[0] for d in cur.description]
-        return dict(zip(cols, row))
+    row = connection().execute(_SELECT_BY_REQUEST_ID, (request_id,)).fetchone()
+    return _row_out(row) if row else None
@@ -0,0 +1,102 @@
+"""
+Dashboard aggregates read from the trigger-maintained rollup tables
+(stats_address / stats_edge / stats_hourly / stats_risk_hist, see
+storage/migrations.py v6). Each call reads at most a few hundred small
+rows, independent of how many intercepts have been logged.
+"""
+from typing import Any, Dict, List, Optional
+
+from ..services.address import canonical_key
+from ..storage.db import connection
+from ..storage.migrations import us_to_iso
+
+_HOUR_US = 3_600_000_000
+BUCKETS_US = {"hour": _HOUR_US, "day": 24 * _HOUR_US}
+ADDRESS_SORTS = {
+    "max_risk": "max_risk DESC, tx_count DESC",
+    "tx_count": "tx_count DESC, max_risk DESC",
+    "blocked": "blocked DESC, tx_count DESC",
+    "recent": "last_ts DESC",
+}
+
+_ADDRESS_COLUMNS = (
+    "to_address, tx_count, max_risk, "
+    "ROUND(CAST(risk_sum AS REAL) / tx_count, 2) AS avg_risk, blocked, forced, last_ts"
+)
+_ADDRESS_ONE = f"SELECT {_ADDRESS_COLUMNS} FROM stats_address WHERE to_address_key = ? AND tx_count > 0"
+_ADDRESS_RISK_HIST = """
+SELECT risk_score, COUNT(*) AS n FROM intercept_log
+WHERE to_address_key = ? GROUP BY risk_score ORDER BY risk_score
+"""
+_EDGES = """
+SELECT from_address, to_address, tx_count FROM stats_edge
+WHERE tx_count > 0 ORDER BY tx_count DESC LIMIT ?
+"""
+_RISK_HIST = "SELECT risk_score, n FROM stats_risk_hist WHERE n > 0 ORDER BY risk_score"
+_HOURLY_SINCE = """
+SELECT bucket, decision, risk_level, n, forced FROM stats_hourly
+WHERE bucket >= ? AND n > 0
+"""
+
+
+def _address_out(row) -> Dict[str, Any]:
+    out = dict(row)
+    out["last_ts"] = us_to_iso(out["last_ts"])
+    return out
+
+
+def top_addresses(limit: int = 100, sort: str = "max_risk") -> List[Dict[str, Any]]:
+    """Per to_address: tx_count, max/avg risk, blocked and forced counts."""
+    if sort not in ADDRESS_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(ADDRESS_SORTS)}")
+    sql = f"SELECT {_ADDRESS_COLUMNS} FROM stats_address WHERE tx_count > 0 ORDER BY {ADDRESS_SORTS[sort]} LIMIT ?"
+    return [_address_out(r) for r in connection().execute(sql, (limit,)).fetchall()]
+
+
+def address_profile(address: str) -> Optional[Dict[str, Any]]:
+    """One address's aggregate row plus its risk-score histogram (any address form)."""
+    key = canonical_key(address)
+    conn = connection()
+    row = conn.execute(_ADDRESS_ONE, (key,)).fetchone()
+    if row is None:
+        return None
+    out = _address_out(row)
+    # Served by idx_intercept_to_key_ts; touches only this address's rows.
+    out["risk_histogram"] = {r["risk_score"]: r["n"] for r in conn.execute(_ADDRESS_RISK_HIST, (key,))}
+    return out
+
+
+def top_edges(limit: int = 200) -> List[Dict[str, Any]]:
+    return [dict(r) for r in connection().execute(_EDGES, (limit,)).fetchall()]
+
+
+def risk_histogram() -> Dict[int, int]:
+    return {r["risk_score"]: r["n"] for r in connection().execute(_RISK_HIST)}
+
+
+def timeline(since_us: int, bucket: str = "hour") -> List[Dict[str, Any]]:
+    """Decision totals per time bucket since `since_us`, oldest first."""
+    if bucket not in BUCKETS_US:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS_US)}")
+    width = BUCKETS_US[bucket]
+    buckets: Dict[int, Dict[str, int]] = {}
+    for r in connection().execute(_HOURLY_SINCE, (since_us // width * width,)):
+        start = r["bucket"] // width * width
+        b = buckets.setdefault(start, {"total": 0, "forced": 0})
+        b["total"] += r["n"]
+        b["forced"] += r["forced"]
+        b[r["decision"]] = b.get(r["decision"], 0) + r["n"]
+    return [{"bucket": us_to_iso(start), **counts} for start, counts in sorted(buckets.items())]
+
+
+def overview(since_us: int) -> Dict[str, int]:
+    """Totals since `since_us` (hour granularity): intercepts, high risk, blocked, forced."""
+    out = {"total": 0, "high": 0, "blocked": 0, "forced": 0}
+    for r in connection().execute(_HOURLY_SINCE, (since_us // _HOUR_US * _HOUR_US,)):
+        out["total"] += r["n"]
+        out["forced"] += r["forced"]
+        if r["risk_level"] == "HIGH":
+            out["high"] += r["n"]
+        if r["decision"] == "BLOCK":
+            out["blocked"] += r["n"]
+    return out
@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Config is read at import time: point the backend at throwaway files before
+# any test imports it, so the suite never touches data/app.db.
+_TMP = tempfile.mkdtemp(prefix="wallet-firewall-tests-")
+os.environ.setdefault("DB_PATH", os.path.join(_TMP, "app.db"))
+os.environ.setdefault("SANCTIONS_FILTER_PREFIX", os.path.join(_TMP, "sanctions"))
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """An empty, migrated intercept/list database private to one test."""
+    from backend.app.storage import db
+    from backend.app.utils.logger import init_db
+
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "app.db"))
+    db.close_all()
+    init_db()
+    yield db.connection()
+    db.close_all()
+
+
+class FakeEngine:
+    """Scores column 0 / 1000, clipped to [0, 1]: predictable without a model file."""
+
+    name = "fake"
+
+    def score(self, X):
+        scores = np.clip(np.asarray(X, dtype=np.float64)[:, 0] / 1000.0, 0.0, 1.0)
+        return (scores > 0.5).astype(np.int64), scores
+
+
+class FakeRegistry:
+    def __init__(self, expected_dim=165):
+        self.model = SimpleNamespace(version="fake@1", expected_dim=expected_dim, engine=FakeEngine())
+        self.gets = 0
+
+    def get(self):
+        self.gets += 1
+        return self.model
+
+
+@pytest.fixture
+def api(fresh_db, monkeypatch):
+    """(backend.app.main, TestClient) on a fake model, a fresh DB and empty velocity state; no startup hooks."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from backend.app import main
+    from backend.app.services import feature_extract, risk_engine
+    from backend.app.services.velocity import VelocityStore
+
+    store = VelocityStore()
+    monkeypatch.setattr(main, "registry", FakeRegistry())
+    monkeypatch.setattr(main, "velocity_store", store)
+    monkeypatch.setattr(feature_extract, "velocity_store", store)
+    monkeypatch.setattr(risk_engine, "velocity_store", store)
+    yield main, TestClient(main.app)
+    main.batcher.stop()
@@ -0,0 +1,39 @@
+import pytest
+
+from backend.app.services.address import TRON_PREFIX, _b58encode, _checksum, canonical_key, format_address
+
+ETH = "0x52908400098527886e0f7030069857d2e4169ee7"
+ETH_EIP55 = "0x52908400098527886E0F7030069857D2E4169EE7"
+TRON_KEY = bytes([TRON_PREFIX]) + bytes.fromhex("a614f803b6fd780986a42c78ec9c7f77e6ded13c")
+TRON_B58 = _b58encode(TRON_KEY + _checksum(TRON_KEY))
+
+
+def test_eth_forms_share_one_20_byte_key():
+    key = canonical_key(ETH)
+    assert len(key) == 20
+    assert canonical_key(ETH_EIP55) == canonical_key(ETH.upper().replace("0X", "0x")) == key
+    assert canonical_key("  " + ETH + "\n") == key
+    assert format_address(key) == ETH
+
+
+def test_tron_base58_and_hex_share_one_21_byte_key():
+    assert TRON_B58.startswith("T") and len(TRON_B58) == 34
+    assert canonical_key(TRON_B58) == canonical_key("41" + TRON_KEY[1:].hex().upper()) == TRON_KEY
+    assert format_address(TRON_KEY) == TRON_B58
+
+
+def test_bad_checksum_is_not_a_tron_key():
+    broken = TRON_B58[:-1] + ("1" if TRON_B58[-1] != "1" else "2")
+    key = canonical_key(broken)
+    assert key[0] == 0 and len(key) >= 22
+
+
+@pytest.mark.parametrize("address", ["BADWALLET1", "wallet_alice", "0xabc", "", "T" * 34])
+def test_fallback_keys_never_collide_with_chain_keys(address):
+    key = canonical_key(address)
+    assert key[0] == 0 and len(key) >= 22
+    assert format_address(key) == (address.lower() if address.startswith("0x") else address)
+
+
+def test_short_hex_ids_compare_case_insensitively():
+    assert canonical_key("0xABC") == canonical_key("0xabc") != canonical_key("abc")
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from backend.app.services.batcher import MicroBatcher
+
+
+def _score(X):
+    return (X[:, 0] > 0.5).astype(np.int64), X[:, 0].astype(np.float32)
+
+
+@pytest.fixture
+def batcher():
+    b = MicroBatcher(_score, window_ms=5, max_batch=64)
+    b.start()
+    yield b
+    b.stop()
+
+
+def test_awaited_submits_are_batched_without_threads(batcher):
+    async def run():
+        rows = [np.full(4, i / 100, dtype=np.float32) for i in range(100)]
+        return await asyncio.gather(*(asyncio.wrap_future(batcher.submit(r)) for r in rows))
+
+    before = threading.active_count()
+    results = asyncio.run(run())
+    assert threading.active_count() == before
+    assert [score for _, score in results] == pytest.approx([i / 100 for i in range(100)])
+    assert [label for label, _ in results] == [int(i / 100 > 0.5) for i in range(100)]
+    assert batcher.stats()["batch_size"]["count"] < 100
+
+
+def test_cancelled_waiter_is_skipped_and_worker_survives():
+    gate = threading.Event()
+
+    def slow_score(X):
+        gate.wait(5)
+        return _score(X)
+
+    b = MicroBatcher(slow_score, window_ms=0, max_batch=1)
+    b.start()
+    try:
+        first = b.submit(np.zeros(4, dtype=np.float32))  # occupies the worker
+        abandoned = b.submit(np.ones(4, dtype=np.float32))
+
+        async def give_up():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.wrap_future(abandoned), 0.01)
+
+        asyncio.run(give_up())
+        assert abandoned.cancelled()
+        gate.set()
+        assert first.result(timeout=5) == (0, 0.0)
+        assert b.predict(np.ones(4, dtype=np.float32), timeout=5) == (1, 1.0)
+        assert b.running
+    finally:
+        gate.set()
+        b.stop()
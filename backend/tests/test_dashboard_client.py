@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("requests")
+st = pytest.importorskip("streamlit")
+
+from admin_dashboard.utils import api  # noqa: E402
+
+T0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _row(i, seconds, forced=0):
+    return {"request_id": f"r{i}", "ts": (T0 + timedelta(seconds=seconds)).isoformat(), "forced": forced}
+
+
+class Backend:
+    """/admin/intercepts over a list: newest first, `since` inclusive, `limit` rows."""
+
+    def __init__(self, rows):
+        self.rows = {row["request_id"]: row for row in rows}
+        self.queries = []
+        self.down = False
+
+    def upsert(self, *rows):
+        self.rows.update((row["request_id"], row) for row in rows)
+
+    def get_json(self, path, params=None, timeout=10):
+        self.queries.append(dict(params or {}))
+        if self.down:
+            return False, None, "connection refused"
+        since = params.get("since")
+        rows = [r for r in self.rows.values() if since is None or datetime.fromisoformat(r["ts"]) >= datetime.fromisoformat(since)]
+        rows.sort(key=lambda r: r["ts"], reverse=True)
+        return True, {"items": rows[: params.get("limit", 200)]}, ""
+
+    def full(self, limit):
+        return sorted(self.rows.values(), key=lambda r: r["ts"], reverse=True)[:limit]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = Backend([_row(i, i * 10) for i in range(1, 6)])
+    monkeypatch.setattr(api, "get_json", backend.get_json)
+    monkeypatch.setattr(st, "session_state", {})
+    monkeypatch.setattr(api, "INCREMENTAL_OVERLAP_S", 5)
+    return backend
+
+
+def _fetch(params=None, max_rows=2000):
+    ok, df, err = api.fetch_incremental("t", "/admin/intercepts", params=params or {"limit": 50}, max_rows=max_rows)
+    assert ok, err
+    return df.to_dict("records")
+
+
+def test_first_fetch_is_full_then_only_newer_rows_are_asked_for(backend):
+    assert _fetch() == backend.full(50)
+    assert backend.queries == [{"limit": 50}]
+
+    backend.upsert(_row(6, 60), _row(7, 70))
+    assert _fetch() == backend.full(50)
+    # Newest held row was at +50s; the overlap re-asks for the last 5 seconds.
+    assert backend.queries[-1] == {"limit": 50, "since": (T0 + timedelta(seconds=45)).isoformat()}
+
+
+def test_updates_inside_the_overlap_replace_the_held_row(backend):
+    _fetch()
+    backend.upsert(_row(5, 50, forced=1), _row(6, 52))
+    rows = _fetch()
+    assert rows == backend.full(50)
+    assert [r["forced"] for r in rows if r["request_id"] == "r5"] == [1]
+
+
+def test_repeated_polls_converge_on_a_full_fetch(backend):
+    for step in range(6, 30):
+        backend.upsert(_row(step, step * 10))
+        if step % 3 == 0:
+            backend.upsert(_row(step - 1, (step - 1) * 10, forced=1))
+        assert _fetch(max_rows=12) == backend.full(12)
+    assert all("since" in q for q in backend.queries[1:])
+
+
+def test_changed_params_start_over(backend):
+    _fetch()
+    _fetch({"limit": 3})
+    assert backend.queries[-1] == {"limit": 3}
+
+
+def test_failed_poll_keeps_the_rows_already_held(backend):
+    held = _fetch()
+    backend.down = True
+    ok, df, err = api.fetch_incremental("t", "/admin/intercepts", params={"limit": 50})
+    assert not ok and err == "connection refused"
+    assert df.to_dict("records") == held
+
+
+class FakeSession:
+    """requests.Session stand-in recording the path of every GET."""
+
+    def __init__(self):
+        self.gets = []
+        self.health = "ok"
+
+    def get(self, url, params=None, timeout=None):
+        path = url[len(api.backend_base()):]
+        self.gets.append(path)
+        return FakeResponse({"status": self.health} if path == "/health" else {"path": path, "params": params})
+
+    def post(self, url, json=None, params=None, timeout=None):
+        return FakeResponse({"ok": True})
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def _dashboard_page():
+    # Runs inside AppTest: st.cache_data only caches with a Streamlit runtime.
+    from admin_dashboard.utils import api
+
+    for _ in range(3):
+        api.get_json_cached("/admin/stats/overview", {"hours": 24})
+        api.healthcheck()
+    api.get_json_cached("/admin/stats/overview", {"hours": 1})
+    api.get_json_cached("/admin/stats/edges", {"hours": 24})
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(api, "_session", lambda: session)
+    api._get_cached.clear()
+    api._health.clear()
+    yield session
+    api._get_cached.clear()
+    api._health.clear()
+
+
+def test_reads_and_health_are_cached_across_reruns(session):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(_dashboard_page)
+    app.run()
+    assert not app.exception
+    # One GET per distinct (endpoint, params), one health probe.
+    assert sorted(session.gets) == ["/admin/stats/edges", "/admin/stats/overview", "/admin/stats/overview", "/health"]
+
+    app.run()
+    assert len(session.gets) == 4
+
+    api.post_json("/admin/lists/add", json={"address": "x"})  # writes drop cached reads
+    app.run()
+    assert len(session.gets) == 7 and session.gets.count("/health") == 1
+
+
+def test_failed_healthcheck_is_retried_on_every_call(session):
+    from streamlit.testing.v1 import AppTest
+
+    session.health = "starting"
+    app = AppTest.from_function(_dashboard_page)
+    app.run()
+    assert session.gets.count("/health") == 3
+
+    session.health = "ok"
+    app.run()
+    app.run()
+    assert session.gets.count("/health") == 4
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from backend.app.core import config
+from backend.app.services import risk_engine, sanctions
+from backend.app.services.decision_cache import DecisionCache, predict_key
+from backend.app.services.list_index import ListIndex
+from backend.app.services.velocity import VelocityStore
+
+TARGET = "0x" + "12" * 20
+OTHER = "0x" + "34" * 20
+
+
+@pytest.fixture
+def check(fresh_db, tmp_path, monkeypatch):
+    """assess_cached against a fresh list index, cache, velocity store and sanctions prefix."""
+    index = ListIndex(sync_interval_s=0)
+    index.load()
+    monkeypatch.setattr(risk_engine, "list_index", index)
+    monkeypatch.setattr(risk_engine, "decision_cache", DecisionCache(True, ttl_s=60))
+    monkeypatch.setattr(risk_engine, "velocity_store", VelocityStore())
+
+    monkeypatch.setattr(config, "SANCTIONS_FILTER_PREFIX", str(tmp_path / "sanctions"))
+    monkeypatch.setattr(config, "SANCTIONS_RELOAD_INTERVAL_S", 0.0)
+    monkeypatch.setattr(sanctions, "_next_check", 0.0)
+    monkeypatch.setattr(sanctions, "_filter_stat", None)
+    monkeypatch.setattr(sanctions, "_filter", None)
+
+    def run(address=TARGET, model_version="m@1"):
+        verdict, key, hit = risk_engine.assess_cached("ETHEREUM", address, 50.0, None, model_version)
+        return verdict[2], verdict[3], hit
+
+    run.index = index
+    return run
+
+
+def test_repeat_check_hits(check):
+    assert check()[2] is False
+    assert check() == ("ALLOW", ["NO_SIGNIFICANT_RISK"], True)
+
+
+def test_list_change_invalidates_only_that_address(check):
+    from backend.app.utils.logger import list_add, list_remove
+
+    check(), check(OTHER)
+    list_add("BLACKLIST", TARGET.upper().replace("0X", "0x"))
+    check.index.refresh()
+    assert check() == ("BLOCK", ["BLACKLIST_HIT"], False)
+    assert check(OTHER)[2] is True  # untouched address keeps its entry
+
+    list_remove("BLACKLIST", TARGET)
+    check.index.refresh()
+    assert check() == ("ALLOW", ["NO_SIGNIFICANT_RISK"], False)
+
+
+def test_model_reload_invalidates(check):
+    check()
+    assert check(model_version="m@2")[2] is False
+    assert check(model_version="m@2")[2] is True
+
+
+def test_sanctions_rebuild_invalidates(check, tmp_path):
+    check()
+    feed = tmp_path / "feed.txt"
+    feed.write_text(TARGET + "\n", encoding="utf-8")
+    sanctions.build(feed, tmp_path / "sanctions")
+    assert check() == ("BLOCK", ["SANCTIONS_HIT"], False)
+
+    feed.write_text(OTHER + "\n", encoding="utf-8")
+    sanctions.build(feed, tmp_path / "sanctions")
+    assert check() == ("ALLOW", ["NO_SIGNIFICANT_RISK"], False)
+
+
+def test_predict_key_tracks_model_and_row():
+    row = np.zeros(165, dtype=np.float32)
+    changed = row.copy()
+    changed[5] = 1.0
+    assert predict_key("m@1", row) == predict_key("m@1", row.astype(np.float64))
+    assert predict_key("m@1", row) != predict_key("m@2", row)
+    assert predict_key("m@1", row) != predict_key("m@1", changed)
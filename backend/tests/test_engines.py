@@ -0,0 +1,177 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.app.services.engines import (
+    BoosterEngine,
+    NumpyTreeEngine,
+    SklearnEngine,
+    build_engine,
+    probe_matrix,
+    verify_engine,
+)
+from backend.app.services.registry import ModelRegistry
+
+MODELS_DIR = Path(__file__).resolve().parents[1] / "app" / "models"
+
+
+def _doc(trees, base_score="2.5E-1", objective="binary:logistic"):
+    return {
+        "learner": {
+            "objective": {"name": objective},
+            "learner_model_param": {"base_score": base_score},
+            "gradient_booster": {"model": {"gbtree_model_param": {"num_parallel_tree": "1"}, "trees": trees}},
+        }
+    }
+
+
+def _depth2_tree():
+    # x0 < 1 ? (x1 < -2 ? 0.3 : -0.1) : 0.8; missing x0 goes right, missing x1 goes left.
+    return {
+        "left_children": [1, 3, -1, -1, -1],
+        "right_children": [2, 4, -1, -1, -1],
+        "split_indices": [0, 1, 0, 0, 0],
+        "split_conditions": [1.0, -2.0, 0.8, 0.3, -0.1],
+        "default_left": [0, 1, 0, 0, 0],
+        "split_type": [0, 0, 0, 0, 0],
+    }
+
+
+def _stump(feature, threshold, left_value, right_value):
+    return {
+        "left_children": [1, -1, -1],
+        "right_children": [2, -1, -1],
+        "split_indices": [feature, 0, 0],
+        "split_conditions": [threshold, left_value, right_value],
+        "default_left": [1, 0, 0],
+        "split_type": [0, 0, 0],
+    }
+
+
+class JsonBooster:
+    def __init__(self, doc):
+        self.doc = doc
+
+    def save_raw(self, raw_format):
+        return bytearray(json.dumps(self.doc).encode())
+
+
+class JsonModel:
+    def __init__(self, doc, best_iteration=None):
+        self.doc = doc
+        if best_iteration is not None:
+            self.best_iteration = best_iteration
+
+    def get_booster(self):
+        return JsonBooster(self.doc)
+
+
+def _reference_margin(row, with_stump=True):
+    x0, x1 = row
+    if np.isnan(x0) or x0 >= 1.0:
+        m = 0.8
+    else:
+        m = 0.3 if np.isnan(x1) or x1 < -2.0 else -0.1
+    if with_stump:
+        m += 0.5 if np.isnan(x1) or x1 < 0.0 else -0.25
+    return m + np.log(0.25 / 0.75)
+
+
+ROWS = np.array(
+    [[0.0, -3.0], [0.0, 5.0], [0.0, np.nan], [2.0, -3.0], [np.nan, 1.0], [1.0, 0.0], [0.999, -2.0]],
+    dtype=np.float32,
+)
+
+
+def test_numpy_engine_walks_trees_and_missing_values_like_xgboost():
+    engine = NumpyTreeEngine(JsonModel(_doc([_depth2_tree(), _stump(1, 0.0, 0.5, -0.25)])))
+    assert engine.max_depth == 2 and engine.roots.tolist() == [0, 5]
+    expected = [_reference_margin(row) for row in ROWS.tolist()]
+    np.testing.assert_allclose(engine.margin(ROWS), expected, atol=1e-12)
+    labels, scores = engine.score(ROWS)
+    np.testing.assert_allclose(scores, 1 / (1 + np.exp(-np.asarray(expected))))
+    assert labels.tolist() == (scores > 0.5).astype(int).tolist()
+
+
+def test_numpy_engine_honours_best_iteration():
+    model = JsonModel(_doc([_depth2_tree(), _stump(1, 0.0, 0.5, -0.25)]), best_iteration=0)
+    engine = NumpyTreeEngine(model)
+    np.testing.assert_allclose(engine.margin(ROWS), [_reference_margin(r, with_stump=False) for r in ROWS.tolist()])
+
+
+@pytest.mark.parametrize(
+    "doc, message",
+    [
+        (_doc([_depth2_tree()], objective="reg:squarederror"), "objective"),
+        (_doc([dict(_stump(0, 0.0, 1.0, -1.0), split_type=[1, 0, 0])]), "categorical"),
+        (_doc([]), "no trees"),
+    ],
+)
+def test_numpy_engine_rejects_models_it_cannot_reproduce(doc, message):
+    with pytest.raises(ValueError, match=message):
+        NumpyTreeEngine(JsonModel(doc))
+
+
+class ProbaModel:
+    """sklearn-style reference built on the numpy engine, so both must agree."""
+
+    def __init__(self, doc, flip=False):
+        self.engine = NumpyTreeEngine(JsonModel(doc))
+        self.flip = flip
+
+    def get_booster(self):
+        return self
+
+    def predict_proba(self, X):
+        p = self.engine.score(X)[1]
+        p = 1 - p if self.flip else p
+        return np.stack([1 - p, p], axis=1)
+
+    def inplace_predict(self, X, iteration_range, predict_type, missing, validate_features):
+        assert (iteration_range, predict_type, validate_features) == ((0, 0), "value", False)
+        return self.engine.score(X)[1].astype(np.float32)
+
+
+def test_build_engine_picks_by_name():
+    model = ProbaModel(_doc([_depth2_tree()]))
+    assert isinstance(build_engine("sklearn", model), SklearnEngine)
+    assert isinstance(build_engine("booster", model), BoosterEngine)
+    with pytest.raises(ValueError, match="unknown scoring engine"):
+        build_engine("onnx", model)
+
+
+def test_verify_engine_returns_the_gap_or_refuses_the_engine():
+    doc = _doc([_depth2_tree(), _stump(1, 0.0, 0.5, -0.25)])
+    engine = NumpyTreeEngine(JsonModel(doc))
+    assert verify_engine(engine, ProbaModel(doc), dim=2, tolerance=1e-9) == 0.0
+    assert verify_engine(BoosterEngine(ProbaModel(doc)), ProbaModel(doc), dim=2, tolerance=1e-6) < 1e-6
+    with pytest.raises(RuntimeError, match="disagrees"):
+        verify_engine(engine, ProbaModel(doc, flip=True), dim=2, tolerance=1e-3)
+
+
+@pytest.fixture(scope="module")
+def shipped_model():
+    pytest.importorskip("xgboost")
+    pytest.importorskip("sklearn")
+    joblib = pytest.importorskip("joblib")
+    return joblib.load(MODELS_DIR / "xgboost_aml_model.pkl")
+
+
+@pytest.mark.parametrize("name", ["booster", "numpy"])
+def test_engines_match_the_shipped_model(shipped_model, name):
+    dim = int(shipped_model.n_features_in_)
+    X = probe_matrix(dim, rows=1024, seed=3)
+    _, expected = SklearnEngine(shipped_model).score(X)
+    labels, scores = build_engine(name, shipped_model).score(X)
+    assert np.max(np.abs(np.asarray(scores, dtype=np.float64) - expected)) <= 1e-6
+    assert labels.tolist() == (expected > 0.5).astype(int).tolist()
+
+
+@pytest.mark.parametrize("name", ["sklearn", "booster", "numpy"])
+def test_registry_serves_the_configured_engine(shipped_model, tmp_path, name):
+    loaded = ModelRegistry(MODELS_DIR, "xgboost_aml_model", engine_name=name, cache_dir=tmp_path).get()
+    assert loaded.engine.name == name and loaded.expected_dim == shipped_model.n_features_in_
+    X = probe_matrix(loaded.expected_dim, rows=64, seed=4)
+    np.testing.assert_allclose(loaded.engine.score(X)[1], SklearnEngine(shipped_model).score(X)[1], atol=1e-6)
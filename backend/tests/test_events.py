@@ -0,0 +1,69 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from backend.app.utils.events import EventBus, parse_cursor
+
+
+def _frames(text):
+    out = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        out.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return out
+
+
+def test_since_replays_only_missed_events():
+    bus = EventBus(replay_max=10)
+    bus.publish_many([{"n": i} for i in range(5)])
+    events, gap = bus.since(2)
+    assert [seq for seq, _ in events] == [3, 4, 5] and not gap
+    assert bus.since(5) == ([], False)
+    assert bus.since(0)[1] is False
+
+
+def test_evicted_cursor_and_restart_report_a_gap():
+    bus = EventBus(replay_max=3)
+    bus.publish_many([{"n": i} for i in range(6)])
+    events, gap = bus.since(1)
+    assert gap and [seq for seq, _ in events] == [4, 5, 6]
+    assert bus.since(3)[1] is False  # oldest buffered is 4: nothing missed
+    # A cursor ahead of the bus comes from before a restart.
+    events, gap = bus.since(99)
+    assert gap and [seq for seq, _ in events] == [4, 5, 6]
+
+
+def test_parse_cursor():
+    assert parse_cursor(None, None) is None
+    assert parse_cursor("", "7") == 7
+    assert parse_cursor("3", "7") == 3
+    assert parse_cursor("-5", None) == 0
+    with pytest.raises(ValueError):
+        parse_cursor("abc", None)
+
+
+def test_stream_sends_hello_reset_and_pushed_events():
+    bus = EventBus(replay_max=2)
+    bus.publish_many([{"n": i} for i in range(4)])  # seq 1..4, only 3..4 buffered
+
+    async def run():
+        stream = bus.stream(1, "intercept")
+        frames = [await stream.__anext__() for _ in range(4)]  # hello, reset, 3, 4
+        # Published from another thread while the stream waits.
+        threading.Timer(0.05, bus.publish, ({"n": "live"},)).start()
+        frames.append(await asyncio.wait_for(stream.__anext__(), 5))
+        assert bus.stats()["subscribers"] == 1
+        await stream.aclose()
+        return frames
+
+    frames = _frames("".join(asyncio.run(run())))
+    assert frames == [
+        (1, "hello", {}),
+        (2, "reset", {}),
+        (3, "intercept", {"n": 2}),
+        (4, "intercept", {"n": 3}),
+        (5, "intercept", {"n": "live"}),
+    ]
+    assert bus.stats()["subscribers"] == 0
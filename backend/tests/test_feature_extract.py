@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from backend.app.services import feature_extract
+from backend.app.services.feature_extract import FEATURE_DIM, VELOCITY_SLOTS, observe_row, observe_rows
+from backend.app.services.velocity import FEATURE_NAMES, VelocityStore
+
+SENDER = "0x" + "aa" * 20
+RECEIVER = "0x" + "bb" * 20
+
+
+class Parties:
+    def __init__(self, to_address=None, from_address=None, chain=None, request_id=None):
+        self.to_address, self.from_address, self.chain, self.request_id = to_address, from_address, chain, request_id
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = VelocityStore()
+    monkeypatch.setattr(feature_extract, "velocity_store", store)
+    return store
+
+
+def _row(amount):
+    row = np.zeros(FEATURE_DIM, dtype=np.float32)
+    row[0] = amount
+    row[37] = np.log1p(amount)  # a wallet-side slot that must survive
+    return row
+
+
+def test_velocity_slots_cover_1_to_36():
+    assert sorted(VELOCITY_SLOTS.values()) == list(range(1, 1 + len(FEATURE_NAMES)))
+    assert len(FEATURE_NAMES) == 36
+
+
+def test_observe_row_records_without_touching_the_row_by_default(store):
+    sent = _row(500.0)
+    out = observe_row(sent, RECEIVER, SENDER, "ETHEREUM")
+    assert out is not sent and np.array_equal(out, sent)
+    assert store.features(SENDER, RECEIVER)["out_1m_count"] == 1
+
+
+def test_observe_row_fills_slots_when_asked(store):
+    sent = _row(500.0)
+    observe_row(_row(200.0), RECEIVER, SENDER, "ETHEREUM")
+    filled = observe_row(sent, RECEIVER, SENDER, "ETHEREUM", fill=True)
+
+    assert filled is not sent and not sent[1:37].any()  # caller's row untouched
+    assert filled.dtype == np.float32 and filled.shape == (FEATURE_DIM,)
+    assert filled[0] == 500.0 and filled[37] == sent[37]
+    assert filled[VELOCITY_SLOTS["out_1m_count"]] == 2
+    assert filled[VELOCITY_SLOTS["in_1m_count"]] == 2
+    assert filled[VELOCITY_SLOTS["out_1h_amount_sum"]] == 700.0
+    expected = store.features(SENDER, RECEIVER)
+    assert [filled[VELOCITY_SLOTS[name]] for name in FEATURE_NAMES] == pytest.approx(
+        [expected[name] for name in FEATURE_NAMES]
+    )
+
+
+def test_observe_row_without_sender_only_fills_incoming(store):
+    filled = observe_row(_row(10.0), RECEIVER, fill=True)
+    assert filled[VELOCITY_SLOTS["in_24h_count"]] == 1
+    assert not any(filled[VELOCITY_SLOTS[name]] for name in FEATURE_NAMES if name.startswith("out_"))
+
+
+def test_checked_transfer_is_not_counted_again_when_scored(store):
+    store.observe(SENDER, RECEIVER, 500.0, request_id="rid-1")  # /risk/check
+    filled = observe_row(_row(500.0), RECEIVER, SENDER, request_id="rid-1", fill=True)
+    assert filled[VELOCITY_SLOTS["out_1m_count"]] == 1
+
+
+def test_observe_rows_matches_observe_row_in_order(store, monkeypatch):
+    X = np.stack([_row(100.0), _row(9500.0), _row(7.0)])
+    parties = [Parties(RECEIVER, SENDER, "ETHEREUM", "a"), Parties(), Parties(RECEIVER, None, "ETHEREUM", "c")]
+    batch = observe_rows(X, parties, fill=True)
+    assert not X[:, 1:37].any()
+    assert np.array_equal(batch[1], X[1])  # no to_address: not recorded, not filled
+
+    single_store = VelocityStore()
+    monkeypatch.setattr(feature_extract, "velocity_store", single_store)
+    singles = [
+        observe_row(X[i], p.to_address, p.from_address, p.chain, p.request_id, fill=True)
+        for i, p in ((0, parties[0]), (2, parties[2]))
+    ]
+    assert np.array_equal(batch[0, 1:37], singles[0][1:37])
+    assert batch[2, VELOCITY_SLOTS["in_1m_count"]] == singles[1][VELOCITY_SLOTS["in_1m_count"]] == 2
+
+    unfilled = observe_rows(X, parties)
+    assert unfilled is X
+    assert store.features(SENDER, RECEIVER)["out_1m_count"] == 1  # ids a / c already recorded
+    with pytest.raises(ValueError):
+        observe_rows(X, parties[:2])
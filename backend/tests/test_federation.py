@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from backend.app.services import federation  # noqa: E402
+from backend.app.utils.logger import log_intercepts  # noqa: E402
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _intercept(i, minutes_ago, decision="BLOCK"):
+    return {
+        "request_id": f"{i:016x}",
+        "ts": (NOW - timedelta(minutes=minutes_ago)).isoformat(),
+        "chain": "ETHEREUM",
+        "from_address": None,
+        "to_address": "0x" + f"{i:02x}" * 20,
+        "amount_usdt": 10.0 * i,
+        "risk_score": 90,
+        "risk_level": "HIGH",
+        "decision": decision,
+        "reason_codes": "",
+        "forced": 0,
+        "tx_hash": None,
+    }
+
+
+def _alert(i, minutes_ago):
+    # Wallet alerts carry naive UTC timestamps.
+    created = (NOW - timedelta(minutes=minutes_ago)).replace(tzinfo=None)
+    return {"id": i, "created_at": created.isoformat(), "tx_id": f"tx_{i}", "level": "WARN", "message": "m", "risk_score": 0.6}
+
+
+class Wallet:
+    def __init__(self, alerts):
+        self.alerts = alerts
+        self.calls = []
+        self.down = False
+
+    def __call__(self, request):
+        self.calls.append(dict(request.url.params))
+        if self.down:
+            return httpx.Response(503, json={"detail": "down"})
+        return httpx.Response(200, json={"alerts": self.alerts})
+
+
+@pytest.fixture
+def wallet(api, monkeypatch):
+    wallet = Wallet([_alert(1, 2), _alert(2, 25)])
+    client = httpx.AsyncClient(transport=httpx.MockTransport(wallet), base_url="http://wallet")
+    monkeypatch.setattr(federation, "_client", client)
+    monkeypatch.setattr(federation, "_cache", {})
+    log_intercepts([_intercept(1, 1), _intercept(2, 10), _intercept(3, 30, decision="ALLOW")])
+    return wallet
+
+
+def test_local_source_reads_intercept_log_newest_first(api, wallet):
+    _, client = api
+    items = client.get("/admin/intercepts").json()["items"]
+    assert [row["request_id"] for row in items] == [f"{i:016x}" for i in (1, 2, 3)]
+    assert {"risk_level", "decision", "to_address"} <= set(items[0])
+    assert wallet.calls == []  # no HTTP self-proxy on the default path
+
+    since = (NOW - timedelta(minutes=10)).isoformat()
+    recent = client.get("/admin/intercepts", params={"since": since, "limit": 5}).json()["items"]
+    assert [row["request_id"] for row in recent] == [f"{i:016x}" for i in (1, 2)]  # since is inclusive
+    assert len(client.get("/admin/intercepts", params={"limit": 1}).json()["items"]) == 1
+
+
+@pytest.mark.parametrize("params", [{"since": "yesterday"}, {"source": "wallet"}])
+def test_bad_parameters_are_400(api, wallet, params):
+    _, client = api
+    assert client.get("/admin/intercepts", params=params).status_code == 400
+
+
+def test_federated_source_merges_both_stores_by_time(api, wallet):
+    _, client = api
+    body = client.get("/admin/intercepts", params={"source": "federated", "limit": 4}).json()
+    assert "error" not in body
+    order = [(row["source"], row.get("request_id") or row["tx_id"]) for row in body["items"]]
+    assert order == [
+        ("backend", f"{1:016x}"),
+        ("wallet", "tx_1"),
+        ("backend", f"{2:016x}"),
+        ("wallet", "tx_2"),
+    ]
+    assert wallet.calls == [{"limit": "4"}]
+
+
+def test_federated_since_is_forwarded_and_applied(api, wallet):
+    _, client = api
+    since = (NOW - timedelta(minutes=5)).isoformat()
+    items = client.get("/admin/intercepts", params={"source": "federated", "since": since}).json()["items"]
+    assert [row["source"] for row in items] == ["backend", "wallet"]
+    assert wallet.calls[0]["since"] == since
+
+
+def test_federated_results_are_cached_for_the_ttl(api, wallet, monkeypatch):
+    _, client = api
+    clock = [1000.0]
+    monkeypatch.setattr(federation.time, "monotonic", lambda: clock[0])
+    first = client.get("/admin/intercepts", params={"source": "federated"}).json()
+    assert client.get("/admin/intercepts", params={"source": "federated"}).json() == first
+    assert len(wallet.calls) == 1
+    clock[0] += federation.INTERCEPTS_FEDERATED_TTL_S + 0.1
+    client.get("/admin/intercepts", params={"source": "federated"})
+    assert len(wallet.calls) == 2
+
+
+def test_wallet_outage_returns_local_rows_and_is_not_cached(api, wallet):
+    _, client = api
+    wallet.down = True
+    body = client.get("/admin/intercepts", params={"source": "federated"}).json()
+    assert body["error"].startswith("wallet alerts unavailable")
+    assert [row["source"] for row in body["items"]] == ["backend"] * 3
+
+    wallet.down = False
+    body = client.get("/admin/intercepts", params={"source": "federated"}).json()
+    assert "error" not in body and len(body["items"]) == 5
+    assert len(wallet.calls) == 2
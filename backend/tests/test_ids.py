@@ -0,0 +1,150 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from backend.app.utils import ids
+from backend.app.utils.ids import IdGenerator, claim_node_id, parse_id
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_CHILD = """
+import sys
+from backend.app.utils.ids import _generator, new_request_id
+print(_generator.node_id)
+print(" ".join(new_request_id() for _ in range(2000)), flush=True)
+sys.stdin.read()  # hold the node id until the test has started every worker
+"""
+
+
+def test_ids_are_sortable_and_unique():
+    gen = IdGenerator(node_id=7)
+    out = [gen.next() for _ in range(20000)]
+    assert out == sorted(out) and len(set(out)) == len(out)
+    assert all(len(i) == 16 for i in out)
+    assert {parse_id(i)[1] for i in out} == {7}
+
+
+def test_claim_skips_held_node_ids(tmp_path):
+    first, fd1 = claim_node_id(5, 3, str(tmp_path))
+    second, fd2 = claim_node_id(5, 3, str(tmp_path))
+    third, fd3 = claim_node_id(5, 3, str(tmp_path))
+    assert (first, second, third) == (5, 6, 7)
+    with pytest.raises(RuntimeError):
+        claim_node_id(5, 3, str(tmp_path))
+    os.close(fd2)  # the lock dies with its holder
+    assert claim_node_id(5, 3, str(tmp_path))[0] == 6
+
+
+class FakeMsvcrt:
+    """msvcrt.locking stand-in: one holder per lock file, like LK_NBLCK on Windows."""
+
+    LK_NBLCK = 2
+
+    def __init__(self):
+        self.held = {}
+
+    def locking(self, fd, mode, nbytes):
+        assert (mode, nbytes) == (self.LK_NBLCK, 1)
+        key = os.fstat(fd).st_ino
+        if key in self.held:
+            raise PermissionError(13, "Permission denied")
+        self.held[key] = fd
+
+
+def test_claim_uses_msvcrt_without_flock(tmp_path, monkeypatch):
+    fake = FakeMsvcrt()
+    monkeypatch.setattr(ids, "fcntl", None)
+    monkeypatch.setattr(ids, "msvcrt", fake)
+    assert [claim_node_id(5, 2, str(tmp_path))[0] for _ in range(2)] == [5, 6]
+    with pytest.raises(RuntimeError, match="no free node id"):
+        claim_node_id(5, 2, str(tmp_path))
+    assert len(fake.held) == 2
+
+
+def test_claim_fails_loudly_without_any_file_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(ids, "fcntl", None)
+    monkeypatch.setattr(ids, "msvcrt", None)
+    with pytest.raises(RuntimeError, match="no file locking"):
+        claim_node_id(5, 2, str(tmp_path))
+    with pytest.raises(RuntimeError, match="no file locking"):
+        IdGenerator()
+    assert IdGenerator(node_id=3).node_id == 3  # an explicit node id needs no claim
+
+
+def test_concurrent_workers_get_distinct_node_ids(tmp_path):
+    env = dict(os.environ, ID_NODE_LOCK_DIR=str(tmp_path), ID_NODE_ID="100", ID_NODE_SLOTS="16")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (ROOT, env.get("PYTHONPATH")) if p)
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", _CHILD], cwd=ROOT, env=env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(8)
+    ]
+    try:
+        results = [(int(w.stdout.readline()), w.stdout.readline().split()) for w in workers]
+    finally:
+        for w in workers:
+            w.communicate("")
+
+    nodes = [node for node, _ in results]
+    assert sorted(nodes) == list(range(100, 108))
+    all_ids = [i for _, batch in results for i in batch]
+    assert len(set(all_ids)) == len(all_ids) == 8 * 2000
+    assert all(parse_id(i)[1] == node for node, batch in results for i in batch)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork only")
+def test_forked_child_claims_its_own_node_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(ids, "ID_NODE_LOCK_DIR", str(tmp_path))
+    monkeypatch.setattr(ids, "ID_NODE_ID", 200)
+    monkeypatch.setattr(ids, "ID_NODE_SLOTS", 4)
+    gen = IdGenerator()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - child
+        try:
+            gen._reclaim_after_fork()
+            os.write(write, str(gen.node_id).encode())
+        finally:
+            os._exit(0)
+    os.close(write)
+    child_node = int(os.read(read, 16))
+    os.waitpid(pid, 0)
+    os.close(read)
+    # The module's own generator re-claims in the child too, so the exact slot varies.
+    assert gen.node_id == 200 and child_node in (201, 202, 203)
+
+
+def _row(request_id, ts="2026-01-01T00:00:00.000001+00:00", to="0x" + "cc" * 20, amount=10.0):
+    return {
+        "request_id": request_id, "ts": ts, "chain": "ETHEREUM", "from_address": None,
+        "to_address": to, "amount_usdt": amount, "risk_score": 10, "risk_level": "LOW",
+        "decision": "ALLOW", "reason_codes": "", "forced": 0, "tx_hash": None,
+    }
+
+
+def test_relog_of_same_request_updates_in_place(fresh_db):
+    from backend.app.utils.logger import get_by_request_id, log_intercept
+
+    log_intercept(_row("00000000000000aa"))
+    relog = dict(get_by_request_id("00000000000000aa"), forced=1, tx_hash="tx_00000000000000aa")
+    log_intercept(relog)
+    stored = get_by_request_id("00000000000000aa")
+    assert (stored["forced"], stored["tx_hash"]) == (1, "tx_00000000000000aa")
+    assert fresh_db.execute("SELECT COUNT(*) FROM intercept_log").fetchone()[0] == 1
+
+
+def test_colliding_request_id_fails_loudly(fresh_db):
+    from backend.app.utils.logger import RequestIdConflict, get_by_request_id, log_intercept, log_intercepts
+
+    log_intercept(_row("00000000000000bb"))
+    with pytest.raises(RequestIdConflict, match="00000000000000bb"):
+        log_intercept(_row("00000000000000bb", ts="2026-01-01T00:00:01+00:00"))
+    # A batch holding a collision is rolled back as a whole.
+    with pytest.raises(RequestIdConflict):
+        log_intercepts([_row("00000000000000cc"), _row("00000000000000bb", amount=99.0)])
+    assert get_by_request_id("00000000000000cc") is None
+    assert get_by_request_id("00000000000000bb")["amount_usdt"] == 10.0
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from backend.app.services.inference import (
+    FLOAT32_HEADER,
+    decode_float32_body,
+    decode_float32_matrix,
+    densify_sparse,
+    encode_float32_matrix,
+    score_matrix,
+)
+
+
+def test_float32_matrix_round_trip():
+    X = np.random.default_rng(0).normal(size=(5, 165)).astype(np.float32)
+    body = encode_float32_matrix(X)
+    assert len(body) == FLOAT32_HEADER.size + X.nbytes
+    out = decode_float32_matrix(body)
+    assert out.dtype == np.float32 and out.shape == (5, 165)
+    np.testing.assert_array_equal(out, X)
+    assert decode_float32_matrix(encode_float32_matrix(np.zeros((0, 165)))).shape == (0, 165)
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (b"AMLF", "too short"),
+        (b"NOPE" + bytes(8), "magic"),
+        (FLOAT32_HEADER.pack(b"AMLF", 2, 3) + bytes(4 * 5), "does not match shape"),
+    ],
+)
+def test_malformed_bodies_are_rejected(body, message):
+    with pytest.raises(ValueError, match=message):
+        decode_float32_matrix(body)
+
+
+def test_float32_body_trailer_is_split_off():
+    X = np.ones((2, 3), dtype=np.float32)
+    decoded, trailer = decode_float32_body(encode_float32_matrix(X) + b'[{"to_address":"a"},{}]')
+    np.testing.assert_array_equal(decoded, X)
+    assert trailer == b'[{"to_address":"a"},{}]'
+    assert decode_float32_body(encode_float32_matrix(X))[1] == b""
+    with pytest.raises(ValueError, match="does not match shape"):
+        decode_float32_matrix(encode_float32_matrix(X) + b"[]")
+
+
+def test_densify_sparse():
+    row = densify_sparse([0, 37, 164], [5.0, 1.5, -2.0], 165)
+    assert row.dtype == np.float32 and row.shape == (165,)
+    assert np.flatnonzero(row).tolist() == [0, 37, 164]
+    assert row[[0, 37, 164]].tolist() == [5.0, 1.5, -2.0]
+    assert not densify_sparse([], [], 165).any()
+    with pytest.raises(ValueError):
+        densify_sparse([165], [1.0], 165)
+    with pytest.raises(ValueError):
+        densify_sparse([1, 2], [1.0], 165)
+
+
+def test_score_matrix_labels_follow_probabilities():
+    class Model:
+        def predict_proba(self, X):
+            p = X[:, 0]
+            return np.stack([1 - p, p], axis=1)
+
+    labels, scores = score_matrix(Model(), np.array([[0.2], [0.5], [0.9]], dtype=np.float32))
+    assert labels.tolist() == [0, 0, 1]
+    assert scores.tolist() == pytest.approx([0.2, 0.5, 0.9])
@@ -0,0 +1,44 @@
+from backend.app.services.address import canonical_key
+from backend.app.services.list_index import ListIndex
+from backend.app.utils.logger import list_add, list_get, list_remove
+
+ETH = "0x" + "5a" * 20
+
+
+def test_load_then_incremental_refresh(fresh_db):
+    list_add("BLACKLIST", "BADWALLET1")
+    index = ListIndex(sync_interval_s=0)
+    index.load()
+    assert index.contains("BLACKLIST", "BADWALLET1")
+    assert not index.contains("BLACKLIST", ETH)
+
+    # Another worker edits the list: picked up from list_changes only.
+    list_add("BLACKLIST", ETH.upper().replace("0X", "0x"))
+    list_add("WHITELIST", "GOODWALLET")
+    list_remove("BLACKLIST", "BADWALLET1")
+    assert index.refresh() == 3
+    assert index.contains("BLACKLIST", ETH)  # any casing
+    assert index.contains("WHITELIST", "GOODWALLET")
+    assert not index.contains("BLACKLIST", "BADWALLET1")
+    assert index.refresh() == 0
+    assert index.stats()["blacklist"] == 1
+
+
+def test_address_versions_move_only_for_changed_addresses(fresh_db):
+    list_add("BLACKLIST", ETH)
+    index = ListIndex(sync_interval_s=0)
+    index.load()
+    eth_version = index.address_version(canonical_key(ETH))
+    assert eth_version > 0
+    assert index.address_version(canonical_key("UNLISTED")) == 0
+
+    list_add("WHITELIST", "GOODWALLET")
+    index.refresh()
+    assert index.address_version(canonical_key(ETH)) == eth_version
+    assert index.address_version(canonical_key("GOODWALLET")) > eth_version
+
+
+def test_duplicate_spellings_store_one_row(fresh_db):
+    list_add("BLACKLIST", ETH)
+    list_add("BLACKLIST", ETH.upper().replace("0X", "0x"))
+    assert list_get("BLACKLIST") == [ETH]
@@ -0,0 +1,156 @@
+import sqlite3
+
+import pytest
+
+from backend.app.services.address import canonical_key
+from backend.app.storage import migrations
+from backend.app.storage.migrations import SCHEMA_VERSION, iso_to_us, migrate, schema_version
+
+ETH = "0x" + "ab" * 20
+SENDER = "0x" + "cd" * 20
+
+
+def _v1_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("BEGIN IMMEDIATE")
+    migrations._v1_initial(conn)
+    conn.execute("PRAGMA user_version = 1")
+    rows = [
+        ("r1", "2026-01-01T10:15:00+00:00", ETH.upper().replace("0X", "0x"), SENDER, 80, "HIGH", "BLOCK", 0),
+        ("r2", "2026-01-01T10:45:00.000250", ETH, None, 20, "LOW", "ALLOW", 1),
+        ("r3", "not a timestamp", "BADWALLET1", SENDER, 50, "MEDIUM", "REQUIRE_CONFIRM", 0),
+    ]
+    conn.executemany(
+        "INSERT INTO intercept_log(request_id, ts, chain, from_address, to_address, amount_usdt,"
+        " risk_score, risk_level, decision, reason_codes, forced, tx_hash)"
+        " VALUES (?, ?, 'ETHEREUM', ?, ?, 10.0, ?, ?, ?, '', ?, NULL)",
+        [(rid, ts, frm, to, score, level, decision, forced) for rid, ts, to, frm, score, level, decision, forced in rows],
+    )
+    # Two spellings of one ETH account collapse onto one key in v4.
+    conn.executemany(
+        "INSERT INTO list_store(kind, address) VALUES (?, ?)",
+        [("BLACKLIST", ETH.upper().replace("0X", "0x")), ("BLACKLIST", ETH), ("WHITELIST", "GOODWALLET")],
+    )
+    conn.commit()
+    return conn
+
+
+def test_v1_database_migrates_to_latest(tmp_path):
+    conn = _v1_db(str(tmp_path / "v1.db"))
+    assert migrate(conn) == SCHEMA_VERSION == 6
+    assert schema_version(conn) == 6
+
+    ts = dict(conn.execute("SELECT request_id, ts FROM intercept_log"))
+    assert ts == {
+        "r1": iso_to_us("2026-01-01T10:15:00+00:00"),
+        "r2": iso_to_us("2026-01-01T10:45:00.000250+00:00"),
+        "r3": 0,  # unparseable legacy value
+    }
+    keys = dict(conn.execute("SELECT request_id, to_address_key FROM intercept_log"))
+    assert keys["r1"] == keys["r2"] == canonical_key(ETH)
+    from_keys = dict(conn.execute("SELECT request_id, from_address_key FROM intercept_log"))
+    assert from_keys == {"r1": canonical_key(SENDER), "r2": None, "r3": canonical_key(SENDER)}
+    assert conn.execute("SELECT cache_key, cache_hit FROM intercept_log WHERE request_id='r1'").fetchone() == (None, 0)
+
+    # v4: one list row per key; v3/v4: the change log captures later edits.
+    assert conn.execute("SELECT kind, address_key FROM list_store ORDER BY kind").fetchall() == [
+        ("BLACKLIST", canonical_key(ETH)),
+        ("WHITELIST", canonical_key("GOODWALLET")),
+    ]
+    conn.execute("DELETE FROM list_store WHERE kind='WHITELIST'")
+    assert conn.execute("SELECT op, address_key FROM list_changes").fetchall() == [
+        ("REMOVE", canonical_key("GOODWALLET"))
+    ]
+
+    # v6: rollups backfilled from the migrated rows.
+    stats = conn.execute(
+        "SELECT tx_count, risk_sum, max_risk, blocked, forced FROM stats_address WHERE to_address_key=?",
+        (canonical_key(ETH),),
+    ).fetchone()
+    assert stats == (2, 100, 80, 1, 1)
+    assert conn.execute("SELECT SUM(tx_count) FROM stats_edge").fetchone()[0] == 2
+    assert conn.execute("SELECT SUM(n) FROM stats_hourly").fetchone()[0] == 3
+    assert conn.execute("SELECT SUM(n) FROM stats_risk_hist").fetchone()[0] == 3
+
+    # Re-running is a no-op.
+    assert migrate(conn) == 6
+
+
+def test_failed_step_leaves_last_completed_version(tmp_path, monkeypatch):
+    conn = _v1_db(str(tmp_path / "v1.db"))
+
+    def broken(c):
+        c.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("boom")
+
+    steps = [(v, broken if v == 5 else fn) for v, fn in migrations.MIGRATIONS]
+    monkeypatch.setattr(migrations, "MIGRATIONS", steps)
+    with pytest.raises(RuntimeError, match="boom"):
+        migrate(conn)
+    assert schema_version(conn) == 4
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name='half_done'").fetchone() is None
+
+    monkeypatch.undo()
+    assert migrate(conn) == 6
+
+
+def test_newer_schema_is_refused(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "future.db"))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    with pytest.raises(RuntimeError, match="newer than this code"):
+        migrate(conn)
+
+
+def test_rollup_triggers_follow_insert_relog_and_delete(fresh_db):
+    from backend.app.utils.logger import get_by_request_id, log_intercept
+
+    row = {
+        "request_id": "00000000000000f1", "ts": "2026-01-01T00:00:00+00:00", "chain": "ETHEREUM",
+        "from_address": SENDER, "to_address": ETH, "amount_usdt": 5.0, "risk_score": 90,
+        "risk_level": "HIGH", "decision": "BLOCK", "reason_codes": "", "forced": 0, "tx_hash": None,
+    }
+    log_intercept(row)
+    log_intercept(dict(get_by_request_id(row["request_id"]), forced=1, tx_hash="tx_1"))
+
+    def address_stats():
+        return fresh_db.execute(
+            "SELECT tx_count, blocked, forced FROM stats_address WHERE to_address_key=?", (canonical_key(ETH),)
+        ).fetchone()
+
+    assert tuple(address_stats()) == (1, 1, 1)
+    assert tuple(fresh_db.execute("SELECT SUM(n), SUM(forced) FROM stats_hourly").fetchone()) == (1, 1)
+    with fresh_db:
+        fresh_db.execute("DELETE FROM intercept_log")
+    assert tuple(address_stats()) == (0, 0, 0)
+    assert fresh_db.execute("SELECT SUM(tx_count) FROM stats_edge").fetchone()[0] == 0
+
+
+def test_keyset_pages_walk_newest_first_without_gaps(fresh_db):
+    from backend.app.utils.logger import log_intercept, query_intercepts
+
+    for i in range(7):
+        log_intercept({
+            "request_id": f"r{i}", "ts": "2026-01-01T00:00:00+00:00" if i < 4 else f"2026-01-0{i}T00:00:00+00:00",
+            "chain": "ETHEREUM", "from_address": SENDER, "to_address": ETH if i % 2 else "OTHER",
+            "amount_usdt": 5.0, "risk_score": 10 * i, "risk_level": "LOW", "decision": "ALLOW",
+            "reason_codes": "", "forced": 0, "tx_hash": None,
+        })
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = query_intercepts(limit=2, cursor=cursor)
+        seen.extend(item["request_id"] for item in items)
+        if cursor is None:
+            break
+    # Equal timestamps fall back to insertion order (rowid), newest first.
+    assert seen == ["r6", "r5", "r4", "r3", "r2", "r1", "r0"]
+    assert items[-1]["ts"] == "2026-01-01T00:00:00+00:00"
+
+    items, cursor = query_intercepts(limit=10, to_address=ETH)
+    assert [item["request_id"] for item in items] == ["r5", "r3", "r1"] and cursor is None
+    # The filter matches on the canonical key, so any spelling of the address works.
+    assert query_intercepts(limit=10, to_address=ETH.upper().replace("0X", "0x"))[0] == items
+    with pytest.raises(ValueError, match="unsupported filter"):
+        query_intercepts(chain="ETHEREUM")
+    with pytest.raises(ValueError, match="invalid cursor"):
+        query_intercepts(cursor="nope")
@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.app.services.inference import encode_float32_matrix
+
+OCTET = {"Content-Type": "application/octet-stream"}
+
+
+def _row(amount=700.0):
+    row = np.zeros(165, dtype=np.float32)
+    row[0] = amount
+    row[40] = 2.5
+    return row
+
+
+def _bodies(row):
+    idx = np.flatnonzero(row)
+    return [
+        {"json": {"features": row.tolist()}},
+        {"json": {"dim": 165, "indices": idx.tolist(), "values": row[idx].tolist()}},
+        {"json": {"indices": idx.tolist(), "values": row[idx].tolist()}},
+        {"content": encode_float32_matrix(row[None]), "headers": OCTET},
+    ]
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_every_body_format_scores_the_same(api, batched):
+    main, client = api
+    if batched:
+        main.batcher.start()
+    for body in _bodies(_row()):
+        r = client.post("/risk/predict", **body)
+        assert r.status_code == 200, r.text
+        assert r.json() == {"prediction": "illicit", "risk_score": 0.7}
+
+
+def test_json_bodies_are_told_apart_by_keys_not_bytes(api):
+    _, client = api
+    dense = {"features": _row(100.0).tolist(), "chain": "indices", "to_address": '"indices"'}
+    r = client.post("/risk/predict", json=dense)
+    assert r.status_code == 200 and r.json()["risk_score"] == 0.1
+
+
+@pytest.mark.parametrize(
+    "body, status",
+    [
+        ({"json": {"features": [1.0] * 10}}, 400),
+        ({"json": {"dim": 10, "indices": [0], "values": [1.0]}}, 400),
+        ({"json": {"indices": [165], "values": [1.0]}}, 400),
+        ({"json": {"indices": [1, 2], "values": [1.0]}}, 400),
+        ({"content": b"not json"}, 400),
+        ({"content": encode_float32_matrix(np.zeros((2, 165))), "headers": OCTET}, 400),
+    ],
+)
+def test_invalid_bodies_are_400(api, body, status):
+    _, client = api
+    assert client.post("/risk/predict", **body).status_code == status
+
+
+def test_unknown_model_dimension_is_500(api):
+    main, client = api
+    main.registry.model.expected_dim = None
+    r = client.post("/risk/predict", json={"features": _row().tolist()})
+    assert r.status_code == 500 and "EXPECTED_DIM" in r.json()["detail"]
+
+
+def test_engine_failure_is_500(api, monkeypatch):
+    main, client = api
+
+    def boom(X):
+        raise RuntimeError("trees on fire")
+
+    monkeypatch.setattr(main.registry.model.engine, "score", boom)
+    r = client.post("/risk/predict", json={"features": _row().tolist()})
+    assert r.status_code == 500 and "trees on fire" in r.json()["detail"]
+
+
+def test_batched_path_prepares_rows_off_the_event_loop(api, monkeypatch):
+    main, client = api
+    main.batcher.start()
+    prepare = main._prepare_features
+    on_loop = []
+
+    def spy(*args):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return prepare(*args)
+
+    monkeypatch.setattr(main, "_prepare_features", spy)
+    assert client.post("/risk/predict", json={"features": _row().tolist()}).status_code == 200
+    assert on_loop == [False]
+    assert main.batcher.stats()["batch_size"]["count"] >= 1
@@ -0,0 +1,132 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from backend.app.services import registry as registry_mod
+from backend.app.services.registry import ModelRegistry
+
+
+def _fake_export(calls):
+    def export(pkl_path, ubj_path):
+        calls.append(ubj_path)
+        ubj_path.parent.mkdir(parents=True, exist_ok=True)
+        ubj_path.write_bytes(b"ubj:" + pkl_path.read_bytes())
+
+    return export
+
+
+def test_pickle_is_exported_to_cache_dir_not_models_dir(tmp_path, monkeypatch):
+    models, cache = tmp_path / "models", tmp_path / "cache"
+    models.mkdir()
+    (models / "m.pkl").write_bytes(b"v1")
+    calls = []
+    monkeypatch.setattr(registry_mod, "_export_ubj", _fake_export(calls))
+    reg = ModelRegistry(models, "m", cache_dir=cache)
+
+    assert reg._source_path("m") == cache / "m.ubj"
+    assert reg._source_path("m") == cache / "m.ubj"
+    assert calls == [cache / "m.ubj"]  # exported once
+    assert sorted(p.name for p in models.iterdir()) == ["m.pkl"]
+
+    # A newer pickle is re-exported.
+    os.utime(cache / "m.ubj", (1, 1))
+    (models / "m.pkl").write_bytes(b"v2")
+    assert reg._source_path("m") == cache / "m.ubj"
+    assert (cache / "m.ubj").read_bytes() == b"ubj:v2"
+
+
+def test_shipped_ubj_is_used_as_is(tmp_path, monkeypatch):
+    models = tmp_path / "models"
+    models.mkdir()
+    (models / "m.ubj").write_bytes(b"native")
+    monkeypatch.setattr(registry_mod, "_export_ubj", _fake_export([]))
+    reg = ModelRegistry(models, "m", cache_dir=tmp_path / "cache")
+    assert reg._source_path("m") == models / "m.ubj"
+    assert not (tmp_path / "cache").exists()
+
+
+def _tree(feature, threshold, left_value, right_value, default_left):
+    return {
+        "left_children": [1, -1, -1],
+        "right_children": [2, -1, -1],
+        "split_indices": [feature, 0, 0],
+        "split_conditions": [threshold, left_value, right_value],
+        "default_left": [int(default_left), 0, 0],
+        "split_type": [0, 0, 0],
+    }
+
+
+class FakeBooster:
+    """Two stumps in xgboost's JSON model layout."""
+
+    def save_raw(self, raw_format):
+        doc = {
+            "learner": {
+                "objective": {"name": "binary:logistic"},
+                "learner_model_param": {"base_score": "5E-1"},
+                "gradient_booster": {
+                    "model": {
+                        "gbtree_model_param": {"num_parallel_tree": "1"},
+                        "trees": [_tree(0, 0.5, -1.0, 1.0, True), _tree(1, 0.0, 0.5, -0.5, False)],
+                    }
+                },
+            }
+        }
+        return bytearray(json.dumps(doc).encode())
+
+
+class FakeModel:
+    n_features_in_ = 2
+
+    def get_booster(self):
+        return FakeBooster()
+
+    def predict_proba(self, X):
+        x0, x1 = X[:, 0], X[:, 1]
+        margin = np.where(np.isnan(x0) | (x0 < 0.5), -1.0, 1.0)
+        margin += np.where(~np.isnan(x1) & (x1 < 0.0), 0.5, -0.5)
+        p = 1.0 / (1.0 + np.exp(-margin))
+        return np.stack([1 - p, p], axis=1)
+
+
+def test_numpy_engine_scores_from_shared_mapped_arrays(tmp_path, monkeypatch):
+    models, cache = tmp_path / "models", tmp_path / "cache"
+    models.mkdir()
+    (models / "m.ubj").write_bytes(b"v1")
+    loads = []
+    monkeypatch.setattr(registry_mod, "_load_ubj", lambda path: loads.append(path) or FakeModel())
+
+    first = ModelRegistry(models, "m", engine_name="numpy", tolerance=1e-9, cache_dir=cache).get()
+    assert loads == [models / "m.ubj"]
+    assert first.model is None and first.expected_dim == 2
+    assert first.shared_path == cache / f"{first.version}.trees"
+    assert all(isinstance(getattr(first.engine, name), np.memmap) for name in first.engine.ARRAYS)
+
+    # Another worker: maps the same files, never loads the model.
+    second = ModelRegistry(models, "m", engine_name="numpy", cache_dir=cache).get()
+    assert loads == [models / "m.ubj"] and second.version == first.version
+    X = np.array([[0.0, -1.0], [1.0, 1.0], [np.nan, np.nan], [0.7, -0.2]], dtype=np.float32)
+    _, expected = FakeModel().predict_proba(X).T
+    np.testing.assert_allclose(second.engine.score(X)[1], expected, atol=1e-7)
+
+    # A new model file is a new version, exported next to the old one.
+    (models / "m.ubj").write_bytes(b"v2")
+    third = ModelRegistry(models, "m", engine_name="numpy", cache_dir=cache).get()
+    assert len(loads) == 2 and third.version != first.version
+    assert sorted(p.name for p in cache.iterdir()) == sorted([f"{first.version}.trees", f"{third.version}.trees"])
+
+
+def test_engine_that_disagrees_is_not_exported(tmp_path, monkeypatch):
+    class Wrong(FakeModel):
+        def predict_proba(self, X):
+            return super().predict_proba(X)[:, ::-1]
+
+    models, cache = tmp_path / "models", tmp_path / "cache"
+    models.mkdir()
+    (models / "m.ubj").write_bytes(b"v1")
+    monkeypatch.setattr(registry_mod, "_load_ubj", lambda path: Wrong())
+    with pytest.raises(RuntimeError, match="disagrees"):
+        ModelRegistry(models, "m", engine_name="numpy", cache_dir=cache).get()
+    assert not cache.exists() or not list(cache.iterdir())
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+
+from backend.app.core import config
+from backend.app.services import sanctions
+from backend.app.services.address import TRON_PREFIX, canonical_key, format_address
+
+ETH_TRAILING_NUL = "0x" + "11" * 19 + "00"
+ETH_PLAIN = "0x" + "22" * 20
+TRON = format_address(bytes([TRON_PREFIX]) + bytes(range(1, 21)))
+# 0x41 + 19 bytes, i.e. a TRON key minus its trailing 0x00: equal to the
+# TRON key below once NULs are stripped.
+ETH_LIKE_TRON = "0x41" + "33" * 19
+TRON_TRAILING_NUL = "41" + "33" * 19 + "00"
+
+
+def _build(tmp_path, addresses, name="sanctions"):
+    list_file = tmp_path / f"{name}.txt"
+    list_file.write_text("# feed\n" + "\n".join(addresses) + "\n", encoding="utf-8")
+    prefix = tmp_path / name
+    sanctions.build(list_file, prefix)
+    return sanctions.SanctionsFilter(prefix)
+
+
+@pytest.mark.parametrize("address", ["BADWALLET1", "0xabc", ETH_TRAILING_NUL, ETH_PLAIN, TRON, TRON_TRAILING_NUL])
+def test_build_lookup_round_trip(tmp_path, address):
+    f = _build(tmp_path, ["BADWALLET1", "0xABC", ETH_TRAILING_NUL, ETH_PLAIN, TRON, TRON_TRAILING_NUL])
+    assert f.might_contain(address)
+    assert f.contains(address)
+
+
+def test_other_forms_of_listed_address_hit(tmp_path):
+    f = _build(tmp_path, [ETH_PLAIN.upper().replace("0X", "0x"), TRON])
+    assert f.contains(ETH_PLAIN)
+    assert f.contains("41" + canonical_key(TRON)[1:].hex())
+
+
+def test_unlisted_addresses_miss(tmp_path):
+    f = _build(tmp_path, [TRON_TRAILING_NUL, "BADWALLET1"])
+    # Same bytes up to trailing NULs / padding, but different keys.
+    assert not f.contains(ETH_LIKE_TRON)
+    assert not f.contains("BADWALLET")
+    assert not f.contains("0x" + "44" * 20)
+
+
+def test_empty_list(tmp_path):
+    f = _build(tmp_path, [])
+    assert f.n == 0
+    assert not f.contains(ETH_PLAIN)
+
+
+def test_rebuilt_filter_is_reopened(tmp_path, monkeypatch):
+    prefix = tmp_path / "live"
+    monkeypatch.setattr(config, "SANCTIONS_FILTER_PREFIX", str(prefix))
+    monkeypatch.setattr(config, "SANCTIONS_RELOAD_INTERVAL_S", 0.0)
+    monkeypatch.setattr(sanctions, "_next_check", 0.0)
+    monkeypatch.setattr(sanctions, "_filter_stat", None)
+    monkeypatch.setattr(sanctions, "_filter", None)
+
+    assert sanctions.get_sanctions_filter() is None
+    assert sanctions.sanctions_version() == 0
+
+    _build(tmp_path, [ETH_PLAIN], name="live")
+    first = sanctions.get_sanctions_filter()
+    assert first.contains(ETH_PLAIN) and not first.contains(TRON)
+
+    _build(tmp_path, [TRON], name="live")
+    second = sanctions.get_sanctions_filter()
+    assert second is not first
+    assert second.contains(TRON) and not second.contains(ETH_PLAIN)
+    assert sanctions.sanctions_version() == second.build_id != first.build_id
+
+
+def test_chunked_build_dedupes_and_packs_bits(tmp_path):
+    addresses = [f"0x{i:040x}" for i in range(50)]
+    list_file = tmp_path / "feed.txt"
+    # Duplicates, including other spellings of the same key, across chunk edges.
+    list_file.write_text("\n".join(addresses + [a.upper().replace("0X", "0x") for a in addresses[::3]]) + "\n")
+    n, m, k = sanctions.build(list_file, tmp_path / "s", chunk=7)
+    assert n == 50
+    assert (tmp_path / "s.bloom").stat().st_size == sanctions.BLOOM_HEADER.size + (m + 7) // 8
+    assert (tmp_path / "s.sorted").stat().st_size == sanctions.SORTED_HEADER.size + 50 * 21
+    f = sanctions.SanctionsFilter(tmp_path / "s")
+    assert all(f.contains(a) for a in addresses)
+    assert not f.contains(f"0x{999:040x}")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["feed.txt", "s.bloom", "s.sorted"]
+
+
+def test_concurrent_builds_do_not_share_temp_files(tmp_path, monkeypatch):
+    list_file = tmp_path / "feed.txt"
+    list_file.write_text(ETH_PLAIN + "\n")
+    temps = []
+    make_temp = sanctions._temp_file
+
+    def spy(path):
+        temps.append(make_temp(path))
+        return temps[-1]
+
+    monkeypatch.setattr(sanctions, "_temp_file", spy)
+    threads = [threading.Thread(target=sanctions.build, args=(list_file, tmp_path / "s")) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(temps)) == 8
+    assert sanctions.SanctionsFilter(tmp_path / "s").contains(ETH_PLAIN)
+    assert not list(tmp_path.glob("*.tmp"))
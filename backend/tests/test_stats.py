@@ -0,0 +1,179 @@
+import random
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.app.services.address import canonical_key
+from backend.app.storage.migrations import iso_to_us
+from backend.app.utils import stats as dashboard_stats
+from backend.app.utils.logger import get_by_request_id, log_intercept, log_intercepts
+
+_HOUR_US = 3_600_000_000
+ADDRESSES = ["0x" + format(i * 0x1111111, "040x") for i in range(1, 7)]
+DECISIONS = [("ALLOW", "LOW"), ("WARN", "MEDIUM"), ("BLOCK", "HIGH"), ("REQUIRE_CONFIRM", "MEDIUM")]
+
+
+def _rows(n=400, seed=5):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    rows = []
+    for i in range(n):
+        to = rng.choice(ADDRESSES)
+        decision, level = rng.choice(DECISIONS)
+        rows.append(
+            {
+                "request_id": f"{i:016x}",
+                "ts": (now - timedelta(minutes=rng.randrange(0, 3 * 24 * 60))).isoformat(),
+                "chain": "ETHEREUM",
+                "from_address": rng.choice([None] + ADDRESSES),
+                # Same address in either case: the rollups group on canonical keys.
+                "to_address": to.upper().replace("0X", "0x") if rng.random() < 0.3 else to,
+                "amount_usdt": float(rng.randrange(1, 10_000)),
+                "risk_score": rng.randrange(0, 101),
+                "risk_level": level,
+                "decision": decision,
+                "reason_codes": "",
+                "forced": 0,
+                "tx_hash": None,
+            }
+        )
+    return rows
+
+
+def _raw(conn):
+    return [dict(r) for r in conn.execute("SELECT * FROM intercept_log")]
+
+
+class Direct:
+    def overview(self, hours):
+        return dashboard_stats.overview(self.since(hours))
+
+    def timeline(self, bucket, hours):
+        return dashboard_stats.timeline(self.since(hours), bucket)
+
+    def addresses(self):
+        return dashboard_stats.top_addresses(1000, "tx_count")
+
+    def address(self, address):
+        return dashboard_stats.address_profile(address)
+
+    def histogram(self):
+        return dashboard_stats.risk_histogram()
+
+    def edges(self):
+        return dashboard_stats.top_edges(2000)
+
+    @staticmethod
+    def since(hours):
+        return int((datetime.now(timezone.utc).timestamp() - hours * 3600) * 1_000_000) if hours > 0 else 0
+
+
+class Http:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, path, **params):
+        r = self.client.get(f"/admin/stats/{path}", params=params)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    def overview(self, hours):
+        return self.get("overview", hours=hours)
+
+    def timeline(self, bucket, hours):
+        return self.get("timeline", bucket=bucket, hours=hours)["items"]
+
+    def addresses(self):
+        return self.get("addresses", limit=1000, sort="tx_count")["items"]
+
+    def address(self, address):
+        r = self.client.get("/admin/stats/address", params={"address": address})
+        return None if r.status_code == 404 else r.json()
+
+    def histogram(self):
+        return {int(k): v for k, v in self.get("risk-histogram")["items"].items()}
+
+    def edges(self):
+        return self.get("edges", limit=2000)["items"]
+
+
+@pytest.fixture(params=["direct", "http"])
+def reader(request, fresh_db):
+    if request.param == "direct":
+        return Direct()
+    _, client = request.getfixturevalue("api")
+    return Http(client)
+
+
+def _check(reader, raw, high_water=False):
+    by_key = defaultdict(list)
+    for r in raw:
+        by_key[r["to_address_key"]].append(r)
+
+    addresses = {canonical_key(a["to_address"]): a for a in reader.addresses()}
+    assert set(addresses) == set(by_key)
+    for key, rows in by_key.items():
+        a = addresses[key]
+        scores = [r["risk_score"] for r in rows]
+        assert a["tx_count"] == len(rows)
+        assert a["avg_risk"] == round(sum(scores) / len(rows), 2)
+        assert a["blocked"] == sum(r["decision"] == "BLOCK" for r in rows)
+        assert a["forced"] == sum(r["forced"] == 1 for r in rows)
+        assert a["max_risk"] >= max(scores) if high_water else a["max_risk"] == max(scores)
+
+    profile = reader.address(ADDRESSES[0].upper().replace("0X", "0x"))
+    rows = by_key[canonical_key(ADDRESSES[0])]
+    assert profile["tx_count"] == len(rows)
+    assert {int(k): v for k, v in profile["risk_histogram"].items()} == Counter(r["risk_score"] for r in rows)
+
+    assert reader.histogram() == Counter(r["risk_score"] for r in raw)
+    edges = Counter(
+        (canonical_key(r["from_address"]), r["to_address_key"]) for r in raw if r["from_address"] is not None
+    )
+    assert {(canonical_key(e["from_address"]), canonical_key(e["to_address"])): e["tx_count"] for e in reader.edges()} == edges
+
+    overview = reader.overview(0)
+    assert overview == {
+        "total": len(raw),
+        "high": sum(r["risk_level"] == "HIGH" for r in raw),
+        "blocked": sum(r["decision"] == "BLOCK" for r in raw),
+        "forced": sum(r["forced"] == 1 for r in raw),
+    }
+    for bucket, width in (("hour", _HOUR_US), ("day", 24 * _HOUR_US)):
+        expected = defaultdict(Counter)
+        for r in raw:
+            expected[r["ts"] // width * width][r["decision"]] += 1
+        items = reader.timeline(bucket, 0)
+        assert [iso_to_us(i["bucket"]) for i in items] == sorted(expected)
+        for item in items:
+            counts = expected[iso_to_us(item["bucket"])]
+            assert item["total"] == sum(counts.values())
+            assert {d: item.get(d, 0) for d in counts} == dict(counts)
+
+
+def test_rollups_match_raw_intercepts_after_insert_relog_and_delete(reader, fresh_db):
+    rows = _rows()
+    log_intercepts(rows[:300])
+    for row in rows[300:]:
+        log_intercept(row)
+    _check(reader, _raw(fresh_db))
+
+    # tx_send re-logs a request with forced / tx_hash set: one UPDATE per request.
+    for row in rows[::7]:
+        log_intercept(dict(get_by_request_id(row["request_id"]), forced=1, tx_hash="tx_" + row["request_id"]))
+    _check(reader, _raw(fresh_db))
+
+    with fresh_db:
+        fresh_db.execute("DELETE FROM intercept_log WHERE risk_score > 80 OR rowid % 5 = 0")
+    _check(reader, _raw(fresh_db), high_water=True)  # max_risk is not lowered on delete
+
+
+def test_overview_window_counts_only_recent_hours(reader, fresh_db):
+    now = datetime.now(timezone.utc)
+    old = dict(_rows(1)[0], request_id="00000000000000a1", ts=(now - timedelta(hours=30)).isoformat())
+    new = dict(_rows(1)[0], request_id="00000000000000a2", ts=(now - timedelta(minutes=5)).isoformat())
+    log_intercepts([old, new])
+    assert reader.overview(0)["total"] == 2
+    assert reader.overview(2)["total"] == 1
+    assert sum(item["total"] for item in reader.timeline("hour", 2)) == 1
@@ -0,0 +1,62 @@
+import pytest
+
+from backend.app.services.velocity import FEATURE_NAMES, VelocityStore
+
+A, B, C = "0x" + "01" * 20, "0x" + "02" * 20, "0x" + "03" * 20
+T = 1_700_000_000.0
+
+
+def test_counts_sums_and_windows_expire():
+    store = VelocityStore()
+    for i in range(3):
+        f = store.observe(A, B, 100.0, ts=T + i * 10)
+    assert f["out_1m_count"] == 3 and f["out_1m_amount_sum"] == 300.0
+    assert f["in_1m_count"] == 3 and f["in_24h_count"] == 3
+    assert f["out_1m_gap_mean_s"] == pytest.approx(10.0)
+    assert f["out_1m_gap_std_s"] == pytest.approx(0.0)
+
+    later = store.features(A, B, now=T + 2 * 3600)
+    assert later["out_1m_count"] == 0 and later["out_1h_count"] == 0
+    assert later["out_24h_count"] == 3
+    assert store.features(A, B, now=T + 2 * 86400)["out_24h_count"] == 0
+
+
+def test_distinct_counterparties_and_near_threshold():
+    store = VelocityStore()
+    store.observe(A, C, 9500.0, ts=T)
+    store.observe(B, C, 9999.0, ts=T + 1)
+    f = store.observe(A, C, 50.0, ts=T + 2)
+    assert f["in_1h_distinct_counterparties"] == 2  # A and B into C
+    assert f["out_1h_distinct_counterparties"] == 1  # A only paid C
+    assert f["in_24h_near_threshold"] == 2
+    assert f["out_24h_near_threshold"] == 1
+
+
+def test_reads_do_not_record_and_unknown_addresses_are_zero():
+    store = VelocityStore()
+    f = store.features(A, B, now=T)
+    assert list(f) == list(FEATURE_NAMES) and not any(f.values())
+    assert store.stats()["tracked_in"] == 0
+
+
+def test_tracked_addresses_are_lru_capped():
+    store = VelocityStore(max_addresses=2)
+    for i, to in enumerate((A, B, C)):
+        store.observe(None, to, 1.0, ts=T + i)
+    stats = store.stats()
+    assert stats["tracked_in"] == 2 and stats["evictions"] == 1
+    assert store.features(None, A, now=T + 3)["in_1m_count"] == 0  # oldest evicted
+    assert store.features(None, C, now=T + 3)["in_1m_count"] == 1
+
+
+def test_request_id_is_counted_once():
+    store = VelocityStore(max_seen_requests=2)
+    store.observe(A, B, 100.0, ts=T, request_id="r1")
+    repeat = store.observe(A, B, 100.0, ts=T + 1, request_id="r1")
+    assert repeat["out_1m_count"] == 1 and repeat["in_1m_amount_sum"] == 100.0
+    assert store.stats()["repeats"] == 1
+
+    store.observe(A, B, 100.0, ts=T + 2, request_id="r2")
+    store.observe(A, B, 100.0, ts=T + 3, request_id="r3")  # r1 falls out of the window
+    assert store.observe(A, B, 100.0, ts=T + 4, request_id="r1")["out_1m_count"] == 4
+    assert store.observe(A, B, 100.0, ts=T + 5)["out_1m_count"] == 5  # no id: always counted
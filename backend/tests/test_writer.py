@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from backend.app.storage.writer import GroupCommitWriter
+
+
+class BadRow(Exception):
+    pass
+
+
+def _rows(*ids):
+    return [{"request_id": i} for i in ids]
+
+
+def test_failed_group_falls_back_to_row_commits(caplog):
+    committed, calls = [], []
+    lock = threading.Lock()
+
+    def write(rows):
+        with lock:
+            calls.append(len(rows))
+            if any(r["request_id"] == "bad" for r in rows):
+                raise BadRow("bad row")
+            committed.extend(r["request_id"] for r in rows)
+
+    w = GroupCommitWriter(write, max_batch=16, flush_ms=50)
+    w.start()
+    try:
+        futs = [w.submit(row) for row in _rows("a", "bad", "b", "c")]
+        results = []
+        for f in futs:
+            try:
+                f.result(timeout=5)
+                results.append("ok")
+            except BadRow:
+                results.append("failed")
+    finally:
+        w.stop()
+
+    assert results == ["ok", "failed", "ok", "ok"]
+    assert sorted(committed) == ["a", "b", "c"]
+    assert calls[0] == 4 and calls[1:] == [1, 1, 1, 1]
+    assert (w.rows_committed, w.rows_failed) == (3, 1)
+    assert w.pending("bad") is None
+    assert "retrying row by row" in caplog.text and "intercept bad not logged" in caplog.text
+
+
+def test_durable_write_surfaces_the_commit_error():
+    def write(rows):
+        raise BadRow("disk full")
+
+    w = GroupCommitWriter(write, max_batch=4, flush_ms=1)
+    w.start()
+    try:
+        with pytest.raises(BadRow, match="disk full"):
+            w.write({"request_id": "x"}, durable=True, timeout=5)
+    finally:
+        w.stop()
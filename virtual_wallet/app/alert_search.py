@@ -0,0 +1,127 @@
+# alert_search.py
+"""
+Server-side filtering for /api/alerts: level, keyword, time range, keyset cursor.
+
+Keyword search over message / tx_id goes through `alert_fts`, an FTS5
+external-content table on `alert` kept in sync by triggers. It uses the
+trigram tokenizer, so a keyword matches anywhere inside a word
+(case-insensitive), which is what the dashboard's old substring filter did,
+but as an index lookup instead of a scan. Keywords shorter than three
+characters (below the trigram size), or SQLite builds without FTS5, fall
+back to LIKE.
+
+Pages are newest-first keyset pages on (created_at, id), served by the
+(level, created_at) / created_at indexes, so deep pages cost the same as
+the first.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import or_, text, tuple_
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from .models import Alert
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE alert_fts USING fts5(
+        message, tx_id, content='alert', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS alert_fts_insert AFTER INSERT ON alert BEGIN
+        INSERT INTO alert_fts(rowid, message, tx_id) VALUES (new.id, new.message, new.tx_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS alert_fts_delete AFTER DELETE ON alert BEGIN
+        INSERT INTO alert_fts(alert_fts, rowid, message, tx_id) VALUES ('delete', old.id, old.message, old.tx_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS alert_fts_update AFTER UPDATE ON alert BEGIN
+        INSERT INTO alert_fts(alert_fts, rowid, message, tx_id) VALUES ('delete', old.id, old.message, old.tx_id);
+        INSERT INTO alert_fts(rowid, message, tx_id) VALUES (new.id, new.message, new.tx_id);
+    END
+    """,
+    # Index the alerts that existed before the table did.
+    "INSERT INTO alert_fts(alert_fts) VALUES ('rebuild')",
+]
+_FTS_MIN_CHARS = 3
+
+fts_enabled = False
+
+
+def init_alert_search(engine: Engine) -> None:
+    """Create the Alert indexes and FTS table on databases made before they existed."""
+    global fts_enabled
+    for index in Alert.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'alert_fts'")).first()
+        if exists is None:
+            try:
+                for ddl in _FTS_DDL:
+                    conn.execute(text(ddl))
+            except Exception as e:  # SQLite built without FTS5 / trigram (< 3.34)
+                print("alert search: FTS5 unavailable, keyword search falls back to LIKE:", e)
+                return
+    fts_enabled = True
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    # created_at is stored as naive UTC.
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+
+def encode_cursor(alert: Alert) -> str:
+    return f"{(alert.created_at - _EPOCH) // _US}.{alert.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        us, alert_id = cursor.split(".", 1)
+        return _EPOCH + int(us) * _US, int(alert_id)
+    except ValueError:
+        raise ValueError(f"invalid cursor {cursor!r}") from None
+
+
+def search_alerts(
+    session: Session,
+    limit: int = 50,
+    level: Optional[str] = None,
+    q: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Alert], Optional[str]]:
+    """Newest-first page of alerts matching every given filter, plus the next cursor."""
+    stmt = select(Alert)
+    if level:
+        stmt = stmt.where(Alert.level == level.upper())
+    if since is not None:
+        stmt = stmt.where(Alert.created_at >= _naive_utc(since))
+    if until is not None:
+        stmt = stmt.where(Alert.created_at < _naive_utc(until))
+    if cursor:
+        stmt = stmt.where(tuple_(Alert.created_at, Alert.id) < tuple_(*decode_cursor(cursor)))
+    if q:
+        if fts_enabled and len(q) >= _FTS_MIN_CHARS:
+            phrase = '"' + q.replace('"', '""') + '"'
+            matches = text("SELECT rowid FROM alert_fts WHERE alert_fts MATCH :phrase").bindparams(phrase=phrase)
+            stmt = stmt.where(Alert.id.in_(matches))
+        else:
+            pattern = f"%{q}%"
+            stmt = stmt.where(or_(Alert.message.ilike(pattern), Alert.tx_id.ilike(pattern)))
+    stmt = stmt.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit + 1)
+
+    alerts = list(session.exec(stmt).all())
+    next_cursor = None
+    if len(alerts) > limit:
+        alerts = alerts[:limit]
+        next_cursor = encode_cursor(alerts[-1])
+    return alerts, next_cursor
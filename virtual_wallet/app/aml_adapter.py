@@ -1,8 +1,13 @@
+import asyncio
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-from uuid import uuid4
+from typing import Dict, List, Optional, Sequence
 
-from .aml_client import aml_predict
+import numpy as np
+
+from backend.app.utils.ids import new_request_id
+
+from .aml_client import aml_predict, aml_predict_async, aml_predict_batch
+from .features import FEATURE_DIM, feature_builder
 
 # === Decision rules (only change here) ===
 WARN_THRESHOLD = 0.5  # >= WARN_THRESHOLD => REQUIRE_CONFIRM
@@ -10,11 +15,6 @@ WARN_THRESHOLD = 0.5  # >= WARN_THRESHOLD => REQUIRE_CONFIRM
 # otherwise => ALLOW
 
 
-def make_request_id(chain: str, to_address: str, amount_usdt: float) -> str:
-    # Keep a stable request id format for logging / UI display
-    return f"{chain}-{to_address}-{uuid4().hex[:8]}"
-
-
 @dataclass
 class AMLDecision:
     request_id: str
@@ -25,18 +25,6 @@ class AMLDecision:
     model_votes: Dict
 
 
-def _tx_to_features(chain: str, to_address: str, amount_usdt: float, from_address: Optional[str] = None) -> List[float]:
-    """
-    MVP feature bridge:
-    - Always produce a 165-length vector (matches your Wallet Firewall model).
-    - Put amount into feature[0] for demo.
-    NOTE: Replace this function later with real feature engineering / alignment.
-    """
-    features = [0.0] * 165
-    features[0] = float(amount_usdt or 0.0)
-    return features
-
-
 def _risk_level_from_score(score: float) -> str:
     # Simple mapping for UI; adjust if you want.
     if score >= 0.8:
@@ -46,26 +34,14 @@ def _risk_level_from_score(score: float) -> str:
     return "LOW"
 
 
-def check_tx(chain: str, to_address: str, amount_usdt: float, from_address: Optional[str] = None) -> AMLDecision:
-    """
-    Public entry used by Virtual Wallet before executing a transfer.
-    It calls the AML backend (Wallet Firewall) via HTTP and returns a normalized decision object.
-    """
-    rid = make_request_id(chain, to_address, amount_usdt)
-
-    # 1) build features
-    features = _tx_to_features(chain, to_address, amount_usdt, from_address=from_address)
-
-    # 2) call AML backend: POST /risk/predict
-    result = aml_predict(features)
-
+def _decision_from_result(rid: str, result: dict) -> AMLDecision:
     prediction = (result.get("prediction") or "").lower()
 
     #prediction = "illicit"  # DEMO: force block//
 
     risk_score = float(result.get("risk_score", 0.0))
 
-    # 3) decision rule (single source of truth)
+    # decision rule (single source of truth)
     if prediction == "illicit":
         decision = "BLOCK"
         reason_codes = ["model_illicit"]
@@ -89,3 +65,84 @@ def check_tx(chain: str, to_address: str, amount_usdt: float, from_address: Opti
         reason_codes=reason_codes,
         model_votes=votes,
     )
+
+
+def _parties(chain: str, from_address: Optional[str], to_address: str, request_id: str) -> Dict[str, Optional[str]]:
+    # request_id lets the backend count a retried transfer in its velocity store once.
+    return {"chain": chain, "from_address": from_address, "to_address": to_address, "request_id": request_id}
+
+
+def check_tx(
+    chain: str,
+    to_address: str,
+    amount_usdt: float,
+    from_address: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> AMLDecision:
+    """
+    Public entry used by Virtual Wallet before executing a transfer.
+    It calls the AML backend (Wallet Firewall) over the configured transport
+    (AML_TRANSPORT: http / uds / inprocess) and returns a normalized decision object.
+    `deadline` (time.monotonic()) bounds the HTTP call to the transfer's remaining budget.
+    """
+    rid = new_request_id()
+
+    # 1) build features (features.py layout, cached wallet aggregates)
+    features = feature_builder.build_row(amount_usdt, from_address, to_address)
+
+    # 2) call AML backend: POST /risk/predict (it records the transfer's velocity)
+    result = aml_predict(features, deadline=deadline, parties=_parties(chain, from_address, to_address, rid))
+
+    # 3) normalize into a decision
+    return _decision_from_result(rid, result)
+
+
+async def check_tx_async(
+    chain: str,
+    to_address: str,
+    amount_usdt: float,
+    from_address: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> AMLDecision:
+    """Async variant of check_tx; awaits the AML backend instead of blocking a thread."""
+    rid = new_request_id()
+    # A private row, not the builder's per-thread scratch: this coroutine
+    # suspends while holding it, and the scratch row of a to_thread worker
+    # is overwritten by whatever that worker builds next.
+    row = np.zeros(FEATURE_DIM, dtype=np.float32)
+    if feature_builder.is_cached(from_address, to_address):
+        features = feature_builder.build_row(amount_usdt, from_address, to_address, out=row)
+    else:
+        # Cache miss means a wallet DB query; keep it off the event loop.
+        features = await asyncio.to_thread(feature_builder.build_row, amount_usdt, from_address, to_address, row)
+    result = await aml_predict_async(features, deadline=deadline, parties=_parties(chain, from_address, to_address, rid))
+    return _decision_from_result(rid, result)
+
+
+def check_tx_batch(
+    chain: str,
+    to_addresses: Sequence[str],
+    amounts_usdt: Sequence[float],
+    from_addresses: Optional[Sequence[Optional[str]]] = None,
+    deadline: Optional[float] = None,
+) -> List[AMLDecision]:
+    """
+    Score many transfers with a single /risk/predict/batch call.
+
+    Decisions match calling check_tx per transfer in the same order: the
+    rows are the ones build_row would give, and each carries its parties
+    and request id, so the backend records velocity (and fills it, if
+    enabled) row by row as it does for single calls. The matrix is built
+    in one pass and sent as raw float32.
+    """
+    X = feature_builder.build_matrix(amounts_usdt, from_addresses, to_addresses)
+    if X.shape[0] == 0:
+        return []
+    senders = from_addresses if from_addresses is not None else [None] * len(to_addresses)
+    rids = [new_request_id() for _ in range(X.shape[0])]
+    parties = [_parties(chain, f, t, rid) for f, t, rid in zip(senders, to_addresses, rids)]
+    result = aml_predict_batch(X, deadline=deadline, parties=parties)
+    return [
+        _decision_from_result(rid, {"prediction": prediction, "risk_score": score})
+        for rid, prediction, score in zip(rids, result["predictions"], result["risk_scores"])
+    ]
@@ -1,10 +1,293 @@
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+import httpx
+import numpy as np
 import requests
-from typing import List
+from requests.adapters import HTTPAdapter
+
+AML_BASE = os.getenv("AML_BASE", "http://127.0.0.1:8000")
+
+# Keep-alive pool sized to the wallet's worker concurrency.
+AML_POOL_SIZE = int(os.getenv("AML_POOL_SIZE", 16))
+# The async path is not capped by the threadpool, so it gets its own limit.
+AML_ASYNC_POOL_SIZE = int(os.getenv("AML_ASYNC_POOL_SIZE", 100))
+AML_CONNECT_TIMEOUT_S = float(os.getenv("AML_CONNECT_TIMEOUT_S", 0.5))
+AML_READ_TIMEOUT_S = float(os.getenv("AML_READ_TIMEOUT_S", 5))
+
+# How check_tx reaches the AML backend:
+#   http      - TCP to AML_BASE (default)
+#   uds       - HTTP over a Unix-domain socket (uvicorn --uds AML_UDS_PATH)
+#   inprocess - call backend.app.main.score_features directly (same host,
+#               backend dependencies installed in this interpreter)
+AML_TRANSPORTS = ("http", "uds", "inprocess")
+AML_TRANSPORT = os.getenv("AML_TRANSPORT", "http")
+AML_UDS_PATH = os.getenv("AML_UDS_PATH", "/tmp/wallet-firewall-aml.sock")
+
+# Body of single-row /risk/predict calls:
+#   sparse  - JSON {"indices", "values"}: only the non-zero features (default)
+#   float32 - raw AMLF float32 row (application/octet-stream)
+#   dense   - JSON {"features": [165 floats]} (original format)
+AML_WIRE_FORMATS = ("sparse", "float32", "dense")
+AML_WIRE_FORMAT = os.getenv("AML_WIRE_FORMAT", "sparse")
+
+
+# Binary body for /risk/predict/batch (must match backend services/inference.py):
+# b"AMLF" + uint32 rows + uint32 cols, then little-endian float32 row-major,
+# then optionally a UTF-8 JSON list of per-row parties.
+_FLOAT32_HEADER = struct.Struct("<4sII")
+_FLOAT32_MAGIC = b"AMLF"
+
+
+class AMLDeadlineExceeded(requests.Timeout):
+    """The caller's deadline budget ran out before the AML call could be made."""
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_requests_sent = 0
+_async_client: Optional[httpx.AsyncClient] = None
+_uds_client: Optional[httpx.Client] = None
+_inprocess_score = None
+_inprocess_score_rows = None
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=AML_POOL_SIZE, pool_block=False, max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _session = s
+    return _session
+
+
+def _timeout(deadline: Optional[float]):
+    """(connect, read) timeouts, clipped to the remaining deadline budget."""
+    if deadline is None:
+        return (AML_CONNECT_TIMEOUT_S, AML_READ_TIMEOUT_S)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise AMLDeadlineExceeded("AML deadline budget exhausted before request")
+    return (min(AML_CONNECT_TIMEOUT_S, remaining), min(AML_READ_TIMEOUT_S, remaining))
+
+
+Features = Union[Sequence[float], np.ndarray]
+# chain / from_address / to_address / request_id of the transfer being
+# scored; the backend records it in its velocity store.
+Parties = Dict[str, Optional[str]]
+
+
+def _predict_body(features: Features, parties: Optional[Parties] = None) -> Dict[str, object]:
+    """Request kwargs (json= or content= + headers [+ params]) for one row in AML_WIRE_FORMAT."""
+    parties = _compact(parties or {})
+    if AML_WIRE_FORMAT == "float32":
+        row = np.asarray(features, dtype="<f4").reshape(1, -1)
+        return {"content": _encode_matrix(row), "headers": {"Content-Type": "application/octet-stream"}, "params": parties}
+    if AML_WIRE_FORMAT == "sparse":
+        row = np.asarray(features, dtype=np.float32)
+        idx = np.flatnonzero(row)
+        return {"json": {"dim": int(row.size), "indices": idx.tolist(), "values": row[idx].astype(np.float64).tolist(), **parties}}
+    if AML_WIRE_FORMAT == "dense":
+        return {"json": {"features": np.asarray(features, dtype=np.float64).tolist(), **parties}}
+    raise ValueError(f"unknown AML wire format {AML_WIRE_FORMAT!r} (expected one of {', '.join(AML_WIRE_FORMATS)})")
+
+
+def _http_predict(features: Features, deadline: Optional[float], parties: Optional[Parties] = None) -> dict:
+    global _requests_sent
+    body = _predict_body(features, parties)
+    if "content" in body:
+        body["data"] = body.pop("content")  # requests spells it data=
+    timeout = _timeout(deadline)
+    r = _get_session().post(f"{AML_BASE}/risk/predict", timeout=timeout, **body)
+    with _stats_lock:
+        _requests_sent += 1
+    r.raise_for_status()
+    return r.json()
+
+
+def _get_uds_client() -> httpx.Client:
+    global _uds_client
+    if _uds_client is None:
+        with _session_lock:
+            if _uds_client is None:
+                _uds_client = httpx.Client(
+                    base_url="http://aml",
+                    transport=httpx.HTTPTransport(uds=AML_UDS_PATH),
+                    limits=httpx.Limits(max_connections=AML_POOL_SIZE, max_keepalive_connections=AML_POOL_SIZE),
+                )
+    return _uds_client
+
+
+def _uds_predict(features: Features, deadline: Optional[float], parties: Optional[Parties] = None) -> dict:
+    connect, read = _timeout(deadline)
+    r = _get_uds_client().post("/risk/predict", timeout=httpx.Timeout(read, connect=connect), **_predict_body(features, parties))
+    r.raise_for_status()
+    return r.json()
 
-AML_BASE = "http://127.0.0.1:8000"
 
-def aml_predict(features: List[float]) -> dict:
-    payload = {"features": features}
-    r = requests.post(f"{AML_BASE}/risk/predict", json=payload, timeout=5)
+def _inprocess_predict(features: Features, deadline: Optional[float], parties: Optional[Parties] = None) -> dict:
+    global _inprocess_score
+    _timeout(deadline)  # only enforces an already-exhausted budget
+    if _inprocess_score is None:
+        with _session_lock:
+            if _inprocess_score is None:
+                # Imported lazily: pulls in the model registry and xgboost.
+                from backend.app.main import score_features
+
+                _inprocess_score = score_features
+    return _inprocess_score(features, **(parties or {})).model_dump()
+
+
+_TRANSPORT_FNS = {
+    "http": _http_predict,
+    "uds": _uds_predict,
+    "inprocess": _inprocess_predict,
+}
+
+
+def _transport_fn(transport: Optional[str]):
+    name = transport or AML_TRANSPORT
+    try:
+        return _TRANSPORT_FNS[name]
+    except KeyError:
+        raise ValueError(f"unknown AML transport {name!r} (expected one of {', '.join(AML_TRANSPORTS)})") from None
+
+
+def aml_predict(
+    features: Features,
+    deadline: Optional[float] = None,
+    transport: Optional[str] = None,
+    parties: Optional[Parties] = None,
+) -> dict:
+    """
+    Score one feature vector via the configured transport (AML_TRANSPORT).
+
+    `deadline` is an absolute time.monotonic() value for the whole transfer;
+    the connect/read timeouts are clipped so the call never outlives it.
+    """
+    return _transport_fn(transport)(features, deadline, parties)
+
+
+def _compact(parties: Parties) -> Parties:
+    return {k: v for k, v in parties.items() if v}
+
+
+def _encode_matrix(X: np.ndarray, parties: Optional[List[Parties]] = None) -> bytes:
+    X = np.ascontiguousarray(X, dtype="<f4")
+    rows, cols = X.shape
+    body = _FLOAT32_HEADER.pack(_FLOAT32_MAGIC, rows, cols) + X.tobytes()
+    if parties is not None:
+        body += json.dumps([_compact(p) for p in parties], separators=(",", ":")).encode("utf-8")
+    return body
+
+
+def aml_predict_batch(
+    X: np.ndarray,
+    deadline: Optional[float] = None,
+    transport: Optional[str] = None,
+    parties: Optional[List[Parties]] = None,
+) -> dict:
+    """
+    Score an (N, 165) matrix with one /risk/predict/batch call.
+
+    `parties` (one per row) are sent along so the backend records each
+    transfer's velocity as it does for aml_predict.
+    Returns {"count", "predictions", "risk_scores"} like the backend.
+    """
+    global _requests_sent, _inprocess_score_rows
+    name = transport or AML_TRANSPORT
+    _transport_fn(name)
+
+    if name == "inprocess":
+        _timeout(deadline)
+        if _inprocess_score_rows is None:
+            from backend.app.main import score_rows
+
+            _inprocess_score_rows = score_rows
+        from backend.app.models.schemas import AMLParties
+
+        rows = [AMLParties(**p) for p in parties] if parties is not None else None
+        return _inprocess_score_rows(np.asarray(X, dtype=np.float32), parties=rows).model_dump()
+
+    body = _encode_matrix(X, parties)
+    headers = {"Content-Type": "application/octet-stream"}
+    connect, read = _timeout(deadline)
+    if name == "uds":
+        r = _get_uds_client().post("/risk/predict/batch", content=body, headers=headers, timeout=httpx.Timeout(read, connect=connect))
+    else:
+        r = _get_session().post(f"{AML_BASE}/risk/predict/batch", data=body, headers=headers, timeout=(connect, read))
+        with _stats_lock:
+            _requests_sent += 1
+    r.raise_for_status()
+    return r.json()
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        uds = AML_TRANSPORT == "uds"
+        _async_client = httpx.AsyncClient(
+            base_url="http://aml" if uds else AML_BASE,
+            transport=httpx.AsyncHTTPTransport(uds=AML_UDS_PATH) if uds else None,
+            limits=httpx.Limits(max_connections=AML_ASYNC_POOL_SIZE, max_keepalive_connections=AML_ASYNC_POOL_SIZE),
+            timeout=httpx.Timeout(AML_READ_TIMEOUT_S, connect=AML_CONNECT_TIMEOUT_S),
+        )
+    return _async_client
+
+
+async def aml_predict_async(features: Features, deadline: Optional[float] = None, parties: Optional[Parties] = None) -> dict:
+    """Async twin of aml_predict on a shared httpx keep-alive pool."""
+    if AML_TRANSPORT == "inprocess":
+        _timeout(deadline)
+        # Copy on the loop thread, before the first await: the caller's row
+        # may be a scratch buffer that is reused once this coroutine yields.
+        row = np.array(features, dtype=np.float32)
+        return await asyncio.to_thread(_inprocess_predict, row, None, parties)
+    connect, read = _timeout(deadline)
+    # Pool wait counts against the budget too, otherwise a saturated pool
+    # could hold the transfer past its deadline.
+    timeout = httpx.Timeout(read, connect=connect, pool=read)
+    r = await _get_async_client().post("/risk/predict", timeout=timeout, **_predict_body(features, parties))
     r.raise_for_status()
     return r.json()
+
+
+async def close_async_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def client_stats() -> Dict[str, object]:
+    """Connection-reuse counters for the AML pool (new vs reused connections)."""
+    with _stats_lock:
+        sent = _requests_sent
+    opened = 0
+    if _session is not None:
+        # Sum over the pools the session made: connection_from_url() would key a
+        # new, empty pool (requests adds TLS settings to the key, even for http).
+        manager = _session.get_adapter(AML_BASE).poolmanager
+        opened = sum(manager.pools[key].num_connections for key in manager.pools.keys())
+    return {
+        "transport": AML_TRANSPORT,
+        "wire_format": AML_WIRE_FORMAT,
+        "base": AML_UDS_PATH if AML_TRANSPORT == "uds" else AML_BASE,
+        "pool_size": AML_POOL_SIZE,
+        "connect_timeout_s": AML_CONNECT_TIMEOUT_S,
+        "read_timeout_s": AML_READ_TIMEOUT_S,
+        "requests": sent,
+        "connections_opened": opened,
+        "connections_reused": max(0, sent - opened),
+        "reuse_ratio": round((sent - opened) / sent, 4) if sent else None,
+    }
@@ -0,0 +1,46 @@
+# bench_aml_transport.py
+"""
+Per-transfer AML latency for each check_tx transport (http / uds / inprocess).
+
+http needs the backend on AML_BASE, uds needs it started with
+`uvicorn backend.app.main:app --uds $AML_UDS_PATH`, inprocess needs the
+backend dependencies importable from this interpreter:
+
+    python -m virtual_wallet.app.bench_aml_transport --n 2000
+"""
+import argparse
+import statistics
+import time
+
+from .aml_client import AML_TRANSPORTS, aml_predict
+from .features import feature_builder
+
+
+def bench(transport: str, n: int) -> dict:
+    features = feature_builder.build_row(1000.0, None, "0xbench").copy()
+    aml_predict(features, transport=transport)  # warm-up: connect / load model
+    latencies = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        aml_predict(features, transport=transport)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    latencies.sort()
+    return {
+        "transport": transport,
+        "n": n,
+        "p50_ms": round(latencies[n // 2], 3),
+        "p99_ms": round(latencies[min(n - 1, int(n * 0.99))], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--transports", default=",".join(AML_TRANSPORTS))
+    args = parser.parse_args()
+    for name in args.transports.split(","):
+        try:
+            print(bench(name, args.n))
+        except Exception as e:
+            print({"transport": name, "error": str(e)})
@@ -0,0 +1,85 @@
+# bench_transfer.py
+"""
+Load-test /api/transfer (sync, threadpool) against /api/transfer/async.
+
+Requires the wallet service (8002) and the AML backend (8000) to be running:
+
+    python -m virtual_wallet.app.bench_transfer --concurrency 500 --total 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+WALLET_BASE = "http://127.0.0.1:8002"
+
+
+async def _seed(client: httpx.AsyncClient) -> List[str]:
+    sender = f"0xbench{int(time.time())}"
+    receiver = sender + "r"
+    for wallet_id in (sender, receiver):
+        r = await client.post("/api/wallets", json={"wallet_id": wallet_id, "balance": 1e12, "tag": "BENCH"})
+        if r.status_code not in (200, 409):
+            r.raise_for_status()
+    return [sender, receiver]
+
+
+async def _run(client: httpx.AsyncClient, path: str, wallets: List[str], total: int, concurrency: int) -> Dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                r = await client.post(
+                    path,
+                    json={"from_wallet": wallets[0], "to_wallet": wallets[1], "amount": 1.0, "tx_id": f"bench_{path[-5:]}_{i}"},
+                )
+                r.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else float("nan")
+
+    return {
+        "path": path,
+        "ok": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(pct(0.50), 1),
+        "p95_ms": round(pct(0.95), 1),
+        "p99_ms": round(pct(0.99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else float("nan"),
+    }
+
+
+async def main(concurrency: int, total: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=WALLET_BASE, limits=limits, timeout=60) as client:
+        wallets = await _seed(client)
+        print(f"concurrency={concurrency} total={total}")
+        for path in ("/api/transfer", "/api/transfer/async"):
+            print(await _run(client, path, wallets, total, concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--total", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.total))
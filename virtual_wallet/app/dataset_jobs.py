@@ -0,0 +1,190 @@
+import csv
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from .aml_adapter import check_tx_batch
+from .db import DATA_DIR
+from .generator import chunked, iter_transactions
+
+COLUMNS = [
+    "tx_id",
+    "from_wallet",
+    "to_wallet",
+    "amount",
+    "timestamp",
+    "label_hint",
+    "risk_score",
+    "risk_label",
+    "reason",
+]
+FORMATS = ("csv", "parquet")
+
+
+@dataclass
+class DatasetJob:
+    job_id: str
+    mix: Dict[str, int]
+    fmt: str
+    file: str
+    status: str = "queued"  # queued -> running -> done | failed
+    rows_total: int = 0
+    rows_written: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+_jobs: Dict[str, DatasetJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def get_job(job_id: str) -> Optional[DatasetJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def list_jobs() -> List[DatasetJob]:
+    with _jobs_lock:
+        return sorted(_jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+
+def start_dataset_job(
+    wallet_ids: List[str],
+    mix: Dict[str, int],
+    fmt: str = "csv",
+    chunk_rows: int = 50000,
+    score: bool = True,
+    seed: Optional[int] = None,
+) -> DatasetJob:
+    """
+    Stream a (possibly multi-million row) dataset to DATA_DIR in a background thread.
+
+    Rows are generated in timestamp order, scored chunk by chunk with one
+    batch AML call each, and appended to the output, so memory is bounded
+    by `chunk_rows`. The file is written under a .part name and renamed on
+    success, so /api/dataset/download never serves a partial file.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("parquet output requires pyarrow") from None
+
+    name = "_".join(mix) if len(mix) <= 3 else "mixed"
+    job = DatasetJob(
+        job_id=uuid4().hex[:12],
+        mix=dict(mix),
+        fmt=fmt,
+        file=f"synthetic_{name}_{int(datetime.utcnow().timestamp())}_{uuid4().hex[:6]}.{fmt}",
+        rows_total=sum(mix.values()),
+    )
+    with _jobs_lock:
+        _jobs[job.job_id] = job
+
+    thread = threading.Thread(
+        target=_run_job,
+        args=(job, wallet_ids, chunk_rows, score, seed),
+        name=f"dataset-job-{job.job_id}",
+        daemon=True,
+    )
+    thread.start()
+    return job
+
+
+def _records(chunk: List[Dict], score: bool) -> List[List[object]]:
+    if score:
+        decisions = check_tx_batch(
+            chain="wallet",
+            to_addresses=[row["to_wallet"] for row in chunk],
+            amounts_usdt=[row["amount"] for row in chunk],
+            from_addresses=[row["from_wallet"] for row in chunk],
+        )
+    else:
+        decisions = [None] * len(chunk)
+
+    out = []
+    for row, aml in zip(chunk, decisions):
+        reason = None
+        if aml:
+            reason = ";".join(aml.reason_codes) if aml.reason_codes else "normal_pattern"
+        out.append(
+            [
+                row["tx_id"],
+                row["from_wallet"],
+                row["to_wallet"],
+                row["amount"],
+                row["timestamp"].isoformat(),
+                row["label_hint"],
+                aml.risk_score if aml else None,
+                aml.risk_level if aml else None,
+                reason,
+            ]
+        )
+    return out
+
+
+def _run_job(job: DatasetJob, wallet_ids: List[str], chunk_rows: int, score: bool, seed: Optional[int]) -> None:
+    out_path = DATA_DIR / job.file
+    tmp_path = out_path.with_name(out_path.name + ".part")
+    job.status = "running"
+    try:
+        rows = iter_transactions(wallet_ids, job.mix, seed=seed)
+        chunks = (_records(chunk, score) for chunk in chunked(rows, chunk_rows))
+        if job.fmt == "parquet":
+            _write_parquet(tmp_path, chunks, job)
+        else:
+            _write_csv(tmp_path, chunks, job)
+        os.replace(tmp_path, out_path)
+        job.status = "done"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        if tmp_path.exists():
+            tmp_path.unlink()
+    finally:
+        job.finished_at = time.time()
+
+
+def _write_csv(path: Path, chunks, job: DatasetJob) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(COLUMNS)
+        for records in chunks:
+            writer.writerows(records)
+            job.rows_written += len(records)
+
+
+def _write_parquet(path: Path, chunks, job: DatasetJob) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("tx_id", pa.string()),
+            ("from_wallet", pa.string()),
+            ("to_wallet", pa.string()),
+            ("amount", pa.float64()),
+            ("timestamp", pa.string()),
+            ("label_hint", pa.string()),
+            ("risk_score", pa.float64()),
+            ("risk_label", pa.string()),
+            ("reason", pa.string()),
+        ]
+    )
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for records in chunks:
+            columns = list(zip(*records))
+            # One row group per chunk keeps memory bounded by chunk_rows.
+            writer.write_table(pa.Table.from_arrays([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+            job.rows_written += len(records)
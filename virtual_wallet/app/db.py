@@ -1,6 +1,10 @@
 from pathlib import Path
 
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .alert_search import init_alert_search
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -12,11 +16,24 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
 )
 
+# Same database through aiosqlite for the async transfer path.
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{DB_PATH}",
+    echo=False,
+    connect_args={"timeout": 30},
+)
+
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    init_alert_search(engine)
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,250 @@
+"""
+Feature bridge: wallet transfers -> 165-dim float32 rows for the AML model.
+
+The layout is declared once below and follows the Elliptic split: slots
+0..93 are per-transaction features, 94..164 aggregated features. Slots
+1..36 are reserved for the AML backend's velocity block
+(backend/app/services/feature_extract.py): they are left at 0 here. The
+backend records velocity from the addresses sent alongside the row and
+only writes these slots with PREDICT_FILL_VELOCITY.
+
+Per-wallet aggregates (balance, in/out counts and sums, distinct
+counterparties, tag) come from the wallet DB. They change slowly, so they
+are cached per wallet for WALLET_FEATURE_TTL_S and dropped explicitly
+when a transfer touching the wallet settles. Cache misses for a whole
+batch are loaded with one grouped query per direction.
+
+Rows are built straight into float32 buffers: a per-thread scratch row
+for single transfers, one contiguous (N, 165) matrix for batches.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import distinct, func
+from sqlmodel import Session, select
+
+from .db import engine
+from .models import Transaction, Wallet
+
+FEATURE_DIM = 165
+WALLET_FEATURE_TTL_S = float(os.getenv("WALLET_FEATURE_TTL_S", 30))
+WALLET_FEATURE_CACHE_MAX = int(os.getenv("WALLET_FEATURE_CACHE_MAX", 100000))
+RISKY_TAGS = frozenset({"HIGH_RISK", "SCAM", "MIXER", "MULE", "BLACKLIST"})
+
+
+@dataclass(frozen=True)
+class TxFeature:
+    name: str
+    slot: int
+    # Takes the amount column (float64 array) and returns one value per row.
+    fn: Callable[[np.ndarray], np.ndarray]
+
+
+# Per-transaction features.
+TX_FEATURES: Tuple[TxFeature, ...] = (
+    TxFeature("amount", 0, lambda a: a),
+    TxFeature("log_amount", 37, np.log1p),
+    TxFeature("round_amount", 38, lambda a: (np.mod(a, 100.0) == 0).astype(np.float64)),
+)
+
+# Per-wallet aggregates, in the order stored in the cache.
+WALLET_AGGREGATES: Tuple[str, ...] = (
+    "balance",
+    "out_count",
+    "out_sum",
+    "out_distinct",
+    "in_count",
+    "in_sum",
+    "in_distinct",
+    "risky_tag",
+)
+# First slot of each party's aggregate block.
+WALLET_BLOCKS: Dict[str, int] = {"sender": 94, "receiver": 94 + len(WALLET_AGGREGATES)}
+
+_N_AGG = len(WALLET_AGGREGATES)
+_EMPTY_AGG = np.zeros(_N_AGG, dtype=np.float32)
+_EMPTY_AGG.flags.writeable = False
+
+
+def _check_layout() -> None:
+    slots = [f.slot for f in TX_FEATURES]
+    for start in WALLET_BLOCKS.values():
+        slots.extend(range(start, start + _N_AGG))
+    if len(slots) != len(set(slots)) or max(slots) >= FEATURE_DIM or any(1 <= s <= 36 for s in slots):
+        raise ValueError("feature layout has overlapping or out-of-range slots")
+
+
+_check_layout()
+
+
+def load_wallet_aggregates(wallet_ids: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Aggregates for the given wallets: three grouped queries in total."""
+    ids = list(set(wallet_ids))
+    out = {w: np.zeros(_N_AGG, dtype=np.float32) for w in ids}
+    if not ids:
+        return out
+    with Session(engine) as session:
+        for wallet_id, balance, tag in session.exec(
+            select(Wallet.wallet_id, Wallet.balance, Wallet.tag).where(Wallet.wallet_id.in_(ids))
+        ):
+            out[wallet_id][0] = balance
+            out[wallet_id][7] = 1.0 if (tag or "").upper() in RISKY_TAGS else 0.0
+        for wallet_id, n, total, peers in session.exec(
+            select(
+                Transaction.from_wallet,
+                func.count(),
+                func.sum(Transaction.amount),
+                func.count(distinct(Transaction.to_wallet)),
+            )
+            .where(Transaction.from_wallet.in_(ids))
+            .group_by(Transaction.from_wallet)
+        ):
+            out[wallet_id][1:4] = (n, total or 0.0, peers)
+        for wallet_id, n, total, peers in session.exec(
+            select(
+                Transaction.to_wallet,
+                func.count(),
+                func.sum(Transaction.amount),
+                func.count(distinct(Transaction.from_wallet)),
+            )
+            .where(Transaction.to_wallet.in_(ids))
+            .group_by(Transaction.to_wallet)
+        ):
+            out[wallet_id][4:7] = (n, total or 0.0, peers)
+    for agg in out.values():
+        agg.flags.writeable = False  # shared by every row built from the cache
+    return out
+
+
+class FeatureBuilder:
+    def __init__(
+        self,
+        ttl_s: float = WALLET_FEATURE_TTL_S,
+        max_wallets: int = WALLET_FEATURE_CACHE_MAX,
+        loader: Callable[[Sequence[str]], Dict[str, np.ndarray]] = load_wallet_aggregates,
+    ):
+        self.ttl_s = ttl_s
+        self.max_wallets = max_wallets
+        self._loader = loader
+        self._cache: Dict[str, Tuple[float, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------
+    # Wallet aggregate cache
+    # ------------------------------------------------------------
+
+    def wallet_aggregates(self, wallet_ids: Iterable[Optional[str]]) -> Dict[str, np.ndarray]:
+        now = time.monotonic()
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        with self._lock:
+            for w in wallet_ids:
+                if not w or w in found:
+                    continue
+                entry = self._cache.get(w)
+                if entry is not None and entry[0] > now:
+                    found[w] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(w)
+            self.misses += len(missing)
+        if missing:
+            loaded = self._loader(missing)
+            expires = time.monotonic() + self.ttl_s
+            with self._lock:
+                if len(self._cache) + len(loaded) > self.max_wallets:
+                    self._cache.clear()  # bounded; everything reloads within one TTL anyway
+                for w, agg in loaded.items():
+                    self._cache[w] = (expires, agg)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, *wallet_ids: Optional[str]) -> None:
+        with self._lock:
+            for w in wallet_ids:
+                self._cache.pop(w, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def is_cached(self, *wallet_ids: Optional[str]) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            return all(not w or (w in self._cache and self._cache[w][0] > now) for w in wallet_ids)
+
+    # ------------------------------------------------------------
+    # Row / matrix builders
+    # ------------------------------------------------------------
+
+    def build_row(self, amount: float, from_wallet: Optional[str], to_wallet: str, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        One (165,) float32 row.
+
+        Without `out` the row is the calling thread's scratch buffer: valid
+        until this thread builds its next row, so encode or copy it first.
+        """
+        if out is None:
+            out = getattr(self._local, "row", None)
+            if out is None:
+                out = self._local.row = np.zeros(FEATURE_DIM, dtype=np.float32)
+            else:
+                out.fill(0.0)
+        a = np.float64(amount or 0.0)
+        for f in TX_FEATURES:
+            out[f.slot] = f.fn(a)
+        aggs = self.wallet_aggregates((from_wallet, to_wallet))
+        for party, wallet in (("sender", from_wallet), ("receiver", to_wallet)):
+            start = WALLET_BLOCKS[party]
+            out[start : start + _N_AGG] = aggs.get(wallet, _EMPTY_AGG) if wallet else _EMPTY_AGG
+        return out
+
+    def build_matrix(
+        self,
+        amounts: Sequence[float],
+        from_wallets: Optional[Sequence[Optional[str]]],
+        to_wallets: Sequence[str],
+    ) -> np.ndarray:
+        """Contiguous (N, 165) float32 matrix, filled column-block by column-block."""
+        n = len(amounts)
+        X = np.zeros((n, FEATURE_DIM), dtype=np.float32)
+        if n == 0:
+            return X
+        a = np.asarray(amounts, dtype=np.float64)
+        for f in TX_FEATURES:
+            X[:, f.slot] = f.fn(a)
+
+        parties = [("receiver", to_wallets)]
+        if from_wallets is not None:
+            parties.append(("sender", from_wallets))
+        aggs = self.wallet_aggregates(w for _, wallets in parties for w in wallets)
+        for party, wallets in parties:
+            # Unique wallets -> one small table, then a single fancy-index gather.
+            names, inverse = np.unique(np.asarray(wallets, dtype=object).astype(str), return_inverse=True)
+            table = np.stack([aggs.get(w, _EMPTY_AGG) for w in names])
+            start = WALLET_BLOCKS[party]
+            X[:, start : start + _N_AGG] = table[inverse]
+        return X
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            size = len(self._cache)
+        total = self.hits + self.misses
+        return {
+            "cached_wallets": size,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+# Process-wide builder used by aml_adapter.
+feature_builder = FeatureBuilder()
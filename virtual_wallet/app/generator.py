@@ -1,7 +1,12 @@
+import heapq
+import itertools
 import random
 import string
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
 
 
 def _rand_wallet(prefix: str = "0x") -> str:
@@ -21,97 +26,293 @@ def generate_wallets(n: int = 20) -> List[Dict]:
     return wallets
 
 
-def generate_transactions(wallet_ids: List[str], scenario: str, n: int = 200) -> List[Dict]:
-    now = datetime.utcnow()
-    rows: List[Dict] = []
+MIXER_ADDR = "0xMIXER0001"
+HIGH_RISK_ADDR = "0xSCAM00001"
+MULE_ADDR = "0xMULE000001"
+SPECIAL_ADDRS = (MIXER_ADDR, HIGH_RISK_ADDR, MULE_ADDR)
 
-    mixer_addr = "0xMIXER0001"
-    high_risk_addr = "0xSCAM00001"
-    mule_addr = "0xMULE000001"
+# Party of a leg: None is any wallet, an int k is one of k wallets drawn once
+# per scenario, a str is that fixed address, and NEXT (receiver only) is the
+# wallet after the sender in the sender's pool. A leg with two None parties
+# uses two distinct wallets.
+Party = Union[None, int, str]
+NEXT = -1
+
+
+@dataclass(frozen=True)
+class _Leg:
+    label: str
+    sender: Party
+    receiver: Party
+    amount: Tuple[float, float]
+    # Timestamps fall on `slots` steps of `step_s` seconds starting `start` before now:
+    # uniformly at random, or round-robin (row i on slot i % slots) when spread.
+    start: timedelta
+    step_s: int
+    slots: int
+    spread: bool = False
+
+
+# One spec drives both the vectorized and the streaming generator. A
+# scenario's rows are split evenly across its legs, the last leg taking the
+# remainder.
+SCENARIO_SPECS: Dict[str, Tuple[_Leg, ...]] = {
+    "normal": (_Leg("BENIGN", None, None, (5, 800), timedelta(hours=24), 60, 24 * 60 + 1),),
+    "structuring": (_Leg("SUSPICIOUS_STRUCTURING", 1, 10, (90, 199), timedelta(minutes=60), 60, 61),),
+    "burst": (_Leg("SUSPICIOUS_BURST", 1, 8, (50, 1200), timedelta(minutes=10), 1, 601),),
+    "layering": (_Leg("SUSPICIOUS_LAYERING", 6, NEXT, (300, 3000), timedelta(hours=6), 60, 240, spread=True),),
+    "mixer": (_Leg("SUSPICIOUS_MIXER", None, MIXER_ADDR, (200, 5000), timedelta(hours=2), 60, 121),),
+    "mule": (
+        _Leg("SUSPICIOUS_MULE_IN", 12, MULE_ADDR, (100, 2500), timedelta(hours=3), 60, 91),
+        _Leg("SUSPICIOUS_MULE_OUT", MULE_ADDR, 12, (100, 2500), timedelta(minutes=90), 60, 91),
+    ),
+    "highrisk": (_Leg("SUSPICIOUS_HIGH_RISK", None, HIGH_RISK_ADDR, (1500, 7000), timedelta(hours=2), 60, 121),),
+}
+SCENARIOS = tuple(SCENARIO_SPECS)
+LABELS = np.array([leg.label for legs in SCENARIO_SPECS.values() for leg in legs], dtype=object)
+_LABEL_INDEX = {label: i for i, label in enumerate(LABELS.tolist())}
+
+
+def _leg_sizes(n: int, k: int) -> List[int]:
+    return [n // k] * (k - 1) + [n - n // k * (k - 1)]
+
+
+def generate_transactions(
+    wallet_ids: List[str],
+    scenario: str,
+    n: int = 200,
+    seed: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict]:
+    """Row-dict view of generate_columns (tx_id in generation order)."""
+    cols = generate_columns(wallet_ids, {scenario: n}, seed=seed, now=now, sort=False)
+    return columns_to_rows(cols)
+
+
+# ============================================================
+# Vectorized mode (NumPy Generator, columnar, seeded)
+# ============================================================
+
+
+def _amounts(rng: np.random.Generator, n: int, lo: float, hi: float) -> np.ndarray:
+    return np.round(rng.uniform(lo, hi, size=n), 2)
+
+
+def _pick(rng: np.random.Generator, pool: np.ndarray, n: int) -> np.ndarray:
+    return pool[rng.integers(0, pool.size, size=n)]
+
+
+def _leg_parties(
+    rng: np.random.Generator, n_wallets: int, leg: _Leg, n: int, special: Dict[str, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    if leg.sender is None and leg.receiver is None:
+        frm = rng.integers(0, n_wallets, size=n)
+        to = rng.integers(0, n_wallets - 1, size=n)
+        return frm, to + (to >= frm)  # distinct pair, like random.sample(wallet_ids, 2)
+    if leg.receiver == NEXT:
+        chain = rng.choice(n_wallets, size=min(leg.sender, n_wallets), replace=False)
+        pos = rng.integers(0, chain.size - 1, size=n)
+        return chain[pos], chain[pos + 1]
+
+    def party(spec: Party) -> np.ndarray:
+        if isinstance(spec, str):
+            return np.full(n, special[spec])
+        if spec is None:
+            return rng.integers(0, n_wallets, size=n)
+        return _pick(rng, rng.choice(n_wallets, size=min(spec, n_wallets), replace=False), n)
+
+    frm = party(leg.sender)
+    return frm, party(leg.receiver)
+
+
+def _scenario_columns(
+    rng: np.random.Generator, n_wallets: int, scenario: str, n: int, now: np.datetime64, special: Dict[str, int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(from_idx, to_idx, amount, timestamp, label_idx) for one scenario; indices into the address vocabulary."""
+    if scenario not in SCENARIO_SPECS:
+        raise ValueError("Unknown scenario")
+    legs = SCENARIO_SPECS[scenario]
+    parts = []
+    for leg, size in zip(legs, _leg_sizes(n, len(legs))):
+        frm, to = _leg_parties(rng, n_wallets, leg, size, special)
+        slot = np.arange(size) % leg.slots if leg.spread else rng.integers(0, leg.slots, size=size)
+        start = now - np.timedelta64(int(leg.start.total_seconds()), "s")
+        t = start + (slot * leg.step_s).astype("timedelta64[s]")
+        parts.append((frm, to, _amounts(rng, size, *leg.amount), t, np.full(size, _LABEL_INDEX[leg.label])))
+    return tuple(np.concatenate(col) for col in zip(*parts))
+
+
+def mix_counts(n: int, proportions: Dict[str, float]) -> Dict[str, int]:
+    """Split n rows across scenarios by proportion (largest remainder, sums to n)."""
+    total = float(sum(proportions.values()))
+    if total <= 0:
+        raise ValueError("proportions must sum to a positive value")
+    exact = {k: n * v / total for k, v in proportions.items()}
+    counts = {k: int(v) for k, v in exact.items()}
+    for k in sorted(exact, key=lambda k: exact[k] - counts[k], reverse=True)[: n - sum(counts.values())]:
+        counts[k] += 1
+    return counts
 
-    def add_row(frm: str, to: str, amount: float, t: datetime, label_hint: str) -> None:
-        rows.append(
-            {
-                "tx_id": f"tx_{len(rows) + 1}",
-                "from_wallet": frm,
-                "to_wallet": to,
-                "amount": amount,
-                "timestamp": t,
-                "label_hint": label_hint,
-            }
-        )
 
-    if scenario == "normal":
-        for _ in range(n):
-            frm, to = random.sample(wallet_ids, 2)
-            amt = round(random.uniform(5, 800), 2)
-            t = now - timedelta(minutes=random.randint(0, 24 * 60))
-            add_row(frm, to, amt, t, "BENIGN")
-
-    elif scenario == "structuring":
-        sender = random.choice(wallet_ids)
-        receivers = random.sample(wallet_ids, min(10, len(wallet_ids)))
-        base_t = now - timedelta(minutes=60)
-        for _ in range(n):
-            to = random.choice(receivers)
-            amt = round(random.uniform(90, 199), 2)
-            t = base_t + timedelta(minutes=random.randint(0, 60))
-            add_row(sender, to, amt, t, "SUSPICIOUS_STRUCTURING")
-
-    elif scenario == "burst":
-        sender = random.choice(wallet_ids)
-        receivers = random.sample(wallet_ids, min(8, len(wallet_ids)))
-        base_t = now - timedelta(minutes=10)
-        for _ in range(n):
-            to = random.choice(receivers)
-            amt = round(random.uniform(50, 1200), 2)
-            t = base_t + timedelta(seconds=random.randint(0, 600))
-            add_row(sender, to, amt, t, "SUSPICIOUS_BURST")
-
-    elif scenario == "layering":
-        chain = random.sample(wallet_ids, min(6, len(wallet_ids)))
-        base_t = now - timedelta(hours=6)
-        for i in range(n):
-            a = random.choice(chain[:-1])
-            b = chain[chain.index(a) + 1]
-            amt = round(random.uniform(300, 3000), 2)
-            t = base_t + timedelta(minutes=i % 240)
-            add_row(a, b, amt, t, "SUSPICIOUS_LAYERING")
-
-    elif scenario == "mixer":
-        base_t = now - timedelta(hours=2)
-        for _ in range(n):
-            frm = random.choice(wallet_ids)
-            amt = round(random.uniform(200, 5000), 2)
-            t = base_t + timedelta(minutes=random.randint(0, 120))
-            add_row(frm, mixer_addr, amt, t, "SUSPICIOUS_MIXER")
-
-    elif scenario == "mule":
-        sources = random.sample(wallet_ids, min(12, len(wallet_ids)))
-        sinks = random.sample(wallet_ids, min(12, len(wallet_ids)))
-        base_t = now - timedelta(hours=3)
-
-        for _ in range(n // 2):
-            frm = random.choice(sources)
-            amt = round(random.uniform(100, 2500), 2)
-            t = base_t + timedelta(minutes=random.randint(0, 90))
-            add_row(frm, mule_addr, amt, t, "SUSPICIOUS_MULE_IN")
-
-        for _ in range(n - n // 2):
-            to = random.choice(sinks)
-            amt = round(random.uniform(100, 2500), 2)
-            t = base_t + timedelta(minutes=90 + random.randint(0, 90))
-            add_row(mule_addr, to, amt, t, "SUSPICIOUS_MULE_OUT")
-
-    elif scenario == "highrisk":
-        base_t = now - timedelta(hours=2)
-        for _ in range(n):
-            frm = random.choice(wallet_ids)
-            amt = round(random.uniform(1500, 7000), 2)
-            t = base_t + timedelta(minutes=random.randint(0, 120))
-            add_row(frm, high_risk_addr, amt, t, "SUSPICIOUS_HIGH_RISK")
+def generate_columns(
+    wallet_ids: List[str],
+    mix: Dict[str, int],
+    seed: Optional[int] = None,
+    now: Optional[datetime] = None,
+    sort: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Generate one or more scenarios ({scenario: n}) as columnar NumPy arrays.
 
+    All draws come from one np.random.Generator(seed), so a fixed seed and
+    `now` give identical output. With sort=True the scenarios are merged in
+    timestamp order (stable, so ties keep scenario order); tx_seq follows the
+    output order. Use mix_counts() to turn proportions into row counts.
+    """
+    if len(wallet_ids) < 2:
+        raise ValueError("need at least 2 wallets")
+    rng = np.random.default_rng(seed)
+    now64 = np.datetime64(now or datetime.utcnow(), "us")
+
+    vocab = np.array(list(wallet_ids) + list(SPECIAL_ADDRS), dtype=object)
+    special = {addr: len(wallet_ids) + i for i, addr in enumerate(SPECIAL_ADDRS)}
+
+    parts = [_scenario_columns(rng, len(wallet_ids), scenario, n, now64, special) for scenario, n in mix.items() if n > 0]
+    if not parts:
+        parts = [(np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0), np.empty(0, "datetime64[us]"), np.empty(0, np.int64))]
+    frm, to, amount, timestamp, label = (np.concatenate(col) for col in zip(*parts))
+    timestamp = timestamp.astype("datetime64[us]")
+
+    if sort:
+        # Stable order via a unique (seconds, position) key: a quicksort on it is
+        # several times faster than kind="stable" on heavily tied timestamps.
+        # All offsets are whole seconds from the same `now`.
+        rel = (timestamp - timestamp.min()) // np.timedelta64(1, "s") if timestamp.size else timestamp.view("i8")
+        order = np.argsort(rel * timestamp.size + np.arange(timestamp.size))
+        frm, to, amount, timestamp, label = frm[order], to[order], amount[order], timestamp[order], label[order]
+
+    return {
+        # tx_id is f"tx_{tx_seq}"; formatting 1M strings would dominate generation time.
+        "tx_seq": np.arange(1, frm.size + 1),
+        "from_wallet": vocab[frm],
+        "to_wallet": vocab[to],
+        "amount": amount,
+        "timestamp": timestamp,
+        "label_hint": LABELS[label],
+    }
+
+
+def columns_to_rows(cols: Dict[str, np.ndarray]) -> List[Dict]:
+    """Columns -> generate_transactions-style row dicts (tx_seq becomes tx_id)."""
+    keys = ["tx_id"] + [k for k in cols if k != "tx_seq"]
+    values = [[f"tx_{i}" for i in cols["tx_seq"].tolist()]] + [cols[k].tolist() for k in keys[1:]]  # datetime64[us] -> datetime
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+# ============================================================
+# Streaming mode (time-ordered, bounded memory)
+# ============================================================
+
+
+def _sorted_offsets(n: int, span: float, rng: random.Random) -> Iterator[float]:
+    """
+    Yield n uniform draws from [0, span) in ascending order without storing them.
+
+    Uses the sequential order-statistics trick: the next smallest of the
+    k remaining uniforms above `cur` is cur + (1 - cur) * (1 - U ** (1 / k)).
+    """
+    cur = 0.0
+    for k in range(n, 0, -1):
+        cur += (1.0 - cur) * (1.0 - rng.random() ** (1.0 / k))
+        yield cur * span
+
+
+def _leg_times(rng: random.Random, leg: _Leg, n: int, now: datetime) -> Iterator[datetime]:
+    """The leg's n timestamps in ascending order, drawn like _scenario_columns draws them."""
+    start = now - leg.start
+    if leg.spread:
+        per_slot, extra = divmod(n, leg.slots)
+        for slot in range(leg.slots):
+            t = start + timedelta(seconds=slot * leg.step_s)
+            for _ in range(per_slot + (1 if slot < extra else 0)):
+                yield t
     else:
+        for off in _sorted_offsets(n, leg.slots, rng):
+            yield start + timedelta(seconds=int(off) * leg.step_s)
+
+
+def _leg_parties_picker(wallet_ids: List[str], leg: _Leg, rng: random.Random) -> Callable[[], Tuple[str, str]]:
+    if leg.sender is None and leg.receiver is None:
+        return lambda: tuple(rng.sample(wallet_ids, 2))
+    if leg.receiver == NEXT:
+        chain = rng.sample(wallet_ids, min(leg.sender, len(wallet_ids)))
+
+        def step() -> Tuple[str, str]:
+            i = rng.randrange(len(chain) - 1)
+            return chain[i], chain[i + 1]
+        return step
+
+    def party(spec: Party) -> Callable[[], str]:
+        if isinstance(spec, str):
+            return lambda: spec
+        pool = wallet_ids if spec is None else rng.sample(wallet_ids, min(spec, len(wallet_ids)))
+        return lambda: rng.choice(pool)
+
+    sender, receiver = party(leg.sender), party(leg.receiver)
+    return lambda: (sender(), receiver())
+
+
+def _leg_stream(
+    wallet_ids: List[str], leg: _Leg, n: int, now: datetime, rng: random.Random
+) -> Iterator[Tuple[datetime, Dict]]:
+    pick = _leg_parties_picker(wallet_ids, leg, rng)
+    lo, hi = leg.amount
+    for t in _leg_times(rng, leg, n, now):
+        frm, to = pick()
+        yield t, {"from_wallet": frm, "to_wallet": to, "amount": round(rng.uniform(lo, hi), 2), "label_hint": leg.label}
+
+
+def _scenario_streams(
+    wallet_ids: List[str], scenario: str, n: int, now: datetime, rng: random.Random
+) -> List[Iterator[Tuple[datetime, Dict]]]:
+    """Per-leg row streams, each already in timestamp order (same spec as _scenario_columns)."""
+    if scenario not in SCENARIO_SPECS:
         raise ValueError("Unknown scenario")
+    legs = SCENARIO_SPECS[scenario]
+    return [_leg_stream(wallet_ids, leg, size, now, rng) for leg, size in zip(legs, _leg_sizes(n, len(legs)))]
+
+
+def iter_transactions(
+    wallet_ids: List[str],
+    mix: Dict[str, int],
+    seed: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Iterator[Dict]:
+    """
+    Stream rows for one or more scenarios ({scenario: n}) in timestamp order.
+
+    Every scenario produces its rows already sorted by time and the streams
+    are k-way merged, so memory stays O(number of streams) regardless of n.
+    Rows carry the same keys as generate_transactions (tx_id is assigned in
+    output order). A fixed seed and `now` give identical output.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    streams: List[Iterator[Tuple[datetime, Dict]]] = []
+    for scenario, n in mix.items():
+        streams.extend(_scenario_streams(wallet_ids, scenario, n, now, rng))
+
+    merged = heapq.merge(*streams, key=lambda item: item[0])
+    for i, (t, item) in enumerate(merged, start=1):
+        item["tx_id"] = f"tx_{i}"
+        item["timestamp"] = t
+        yield item
+
 
-    return rows
+def chunked(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
@@ -1,20 +1,37 @@
 from __future__ import annotations
 
 import csv
+import os
+import time
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from fastapi import Depends, FastAPI, HTTPException, Query
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from sqlmodel import Session, select
-
-from .aml_adapter import AMLDecision, check_tx
-from .db import DATA_DIR, get_session, init_db
-from .generator import generate_transactions, generate_wallets
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.utils.events import EVENTS_REPLAY_MAX, SSE_HEADERS, EventBus, parse_cursor
+
+from .aml_adapter import AMLDecision, check_tx, check_tx_async, check_tx_batch
+from .alert_search import search_alerts
+from .aml_client import client_stats, close_async_client
+from .dataset_jobs import get_job, list_jobs, start_dataset_job
+from .features import feature_builder
+from .db import DATA_DIR, get_async_session, get_session, init_db
+from .generator import (
+    SCENARIOS,
+    columns_to_rows,
+    generate_columns,
+    generate_transactions,
+    generate_wallets,
+    mix_counts,
+)
 from .models import Alert, Transaction, Wallet
 
 app = FastAPI(
@@ -23,8 +40,20 @@ app = FastAPI(
     version="0.2.0",
 )
 
+# Committed alerts, followed live by the dashboard via /api/alerts/stream.
+alert_bus = EventBus(EVENTS_REPLAY_MAX)
+
+
+def _alert_events(rows) -> List[Dict[str, object]]:
+    # Dumped before commit: expired ORM objects cannot be read back on the async session.
+    return [row.model_dump(mode="json") for row in rows if isinstance(row, Alert)]
+
 
 BASE_DIR = Path(__file__).resolve().parent
+# Total time a transfer may spend waiting on the AML backend.
+TRANSFER_AML_BUDGET_S = float(os.getenv("TRANSFER_AML_BUDGET_S", 3))
+# Upper bound for one streamed dataset job (rows across all scenarios).
+STREAM_DATASET_MAX_ROWS = int(os.getenv("STREAM_DATASET_MAX_ROWS", 50_000_000))
 app.mount("/ui", StaticFiles(directory=str(BASE_DIR / "ui")), name="ui")
 
 
@@ -44,8 +73,20 @@ class TransferRequest(BaseModel):
 
 class DatasetRequest(BaseModel):
     scenario: str = Field("normal", min_length=3, max_length=24)
-    n: int = Field(200, ge=10, le=2000)
+    n: int = Field(200, ge=10, le=50000)
     persist: bool = True
+    # Optional {scenario: proportion}; overrides `scenario` and mixes into one dataset.
+    mix: Optional[Dict[str, float]] = None
+    seed: Optional[int] = None
+
+
+class StreamDatasetRequest(BaseModel):
+    # {scenario: rows}, k-way merged into one time-ordered file
+    scenarios: Dict[str, int] = Field(default_factory=lambda: {"normal": 100000})
+    format: str = Field("csv", pattern="^(csv|parquet)$")
+    chunk_rows: int = Field(50000, ge=1000, le=100000)
+    score: bool = True
+    seed: Optional[int] = None
 
 
 class SeedRequest(BaseModel):
@@ -57,6 +98,11 @@ def on_startup() -> None:
     init_db()
 
 
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await close_async_client()
+
+
 @app.get("/", response_class=HTMLResponse)
 def index() -> HTMLResponse:
     with open(BASE_DIR / "ui" / "index.html", "r", encoding="utf-8") as handle:
@@ -68,6 +114,11 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/api/aml/client-stats")
+def aml_client_stats() -> Dict[str, object]:
+    return {**client_stats(), "features": feature_builder.stats()}
+
+
 @app.get("/stats")
 def stats(session: Session = Depends(get_session)) -> Dict[str, int]:
     return {
@@ -125,27 +176,21 @@ def list_wallets(session: Session = Depends(get_session)) -> Dict[str, List[Wall
     return {"wallets": wallets}
 
 
-@app.post("/api/transfer")
-def transfer(payload: TransferRequest, session: Session = Depends(get_session)) -> Dict[str, object]:
-    sender = session.get(Wallet, payload.from_wallet)
-    receiver = session.get(Wallet, payload.to_wallet)
-
-    if not sender:
-        raise HTTPException(status_code=404, detail="sender wallet not found")
-    if sender.balance < payload.amount:
-        raise HTTPException(status_code=400, detail="insufficient balance")
-
-    now = datetime.utcnow()
-    tx_id = payload.tx_id or f"tx_{int(datetime.utcnow().timestamp())}"
-
-    # === AML check via Wallet Firewall backend (adapter) ===
-    aml = check_tx(
-        chain="wallet",
-        to_address=payload.to_wallet,
-        amount_usdt=payload.amount,
-        from_address=payload.from_wallet,  # optional
-    )
-
+def _settle_transfer(
+    payload: TransferRequest,
+    tx_id: str,
+    aml: AMLDecision,
+    sender: Wallet,
+    receiver: Optional[Wallet],
+    now: datetime,
+) -> Tuple[List[object], Dict[str, object], Optional[Transaction]]:
+    """
+    Apply the AML decision to a transfer.
+
+    Shared by the sync and async handlers: returns the rows to add, the
+    response body and (for approved transfers) the Transaction to refresh.
+    Balances are mutated in place on the loaded wallets.
+    """
     aml_dict = _aml_to_dict(aml)
     decision = aml.decision
     risk_level = aml.risk_level
@@ -154,29 +199,23 @@ def transfer(payload: TransferRequest, session: Session = Depends(get_session))
 
     # --- BLOCK ---
     if decision == "BLOCK":
-        session.add(
-            Alert(
-                tx_id=tx_id,
-                level="CRITICAL",
-                message=f"BLOCKED by AML: {','.join(reasons)}" if reasons else "BLOCKED by AML",
-                risk_score=risk_score,
-            )
+        alert = Alert(
+            tx_id=tx_id,
+            level="CRITICAL",
+            message=f"BLOCKED by AML: {','.join(reasons)}" if reasons else "BLOCKED by AML",
+            risk_score=risk_score,
         )
-        session.commit()
-        return {"status": "blocked", "aml": aml_dict}
+        return [alert], {"status": "blocked", "aml": aml_dict}, None
 
     # --- REQUIRE_CONFIRM ---
     if decision == "REQUIRE_CONFIRM":
-        session.add(
-            Alert(
-                tx_id=tx_id,
-                level="WARN",
-                message=f"REQUIRE_CONFIRM: {','.join(reasons)}" if reasons else "REQUIRE_CONFIRM",
-                risk_score=risk_score,
-            )
+        alert = Alert(
+            tx_id=tx_id,
+            level="WARN",
+            message=f"REQUIRE_CONFIRM: {','.join(reasons)}" if reasons else "REQUIRE_CONFIRM",
+            risk_score=risk_score,
         )
-        session.commit()
-        return {"status": "require_confirm", "aml": aml_dict, "confirm_token": tx_id}
+        return [alert], {"status": "require_confirm", "aml": aml_dict, "confirm_token": tx_id}, None
 
     # --- ALLOW => execute transaction ---
     tx = Transaction(
@@ -189,7 +228,7 @@ def transfer(payload: TransferRequest, session: Session = Depends(get_session))
         reason=";".join(reasons) if reasons else "normal_pattern",
         created_at=now,
     )
-    session.add(tx)
+    rows: List[object] = [tx]
 
     sender.balance -= payload.amount
     if receiver:
@@ -199,11 +238,83 @@ def transfer(payload: TransferRequest, session: Session = Depends(get_session))
     if risk_level in {"HIGH", "MEDIUM"}:
         level = "CRITICAL" if risk_level == "HIGH" else "WARN"
         msg = f"Suspicious transaction detected ({risk_level}): {tx.reason}"
-        session.add(Alert(tx_id=tx.tx_id, level=level, message=msg, risk_score=risk_score))
+        rows.append(Alert(tx_id=tx.tx_id, level=level, message=msg, risk_score=risk_score))
+
+    return rows, {"status": "approved", "tx": tx, "aml": aml_dict}, tx
+
+
+@app.post("/api/transfer")
+def transfer(payload: TransferRequest, session: Session = Depends(get_session)) -> Dict[str, object]:
+    deadline = time.monotonic() + TRANSFER_AML_BUDGET_S
+    sender = session.get(Wallet, payload.from_wallet)
+    receiver = session.get(Wallet, payload.to_wallet)
+
+    if not sender:
+        raise HTTPException(status_code=404, detail="sender wallet not found")
+    if sender.balance < payload.amount:
+        raise HTTPException(status_code=400, detail="insufficient balance")
+
+    now = datetime.utcnow()
+    tx_id = payload.tx_id or f"tx_{int(datetime.utcnow().timestamp())}"
+
+    # === AML check via Wallet Firewall backend (adapter) ===
+    aml = check_tx(
+        chain="wallet",
+        to_address=payload.to_wallet,
+        amount_usdt=payload.amount,
+        from_address=payload.from_wallet,  # optional
+        deadline=deadline,
+    )
 
+    rows, result, tx = _settle_transfer(payload, tx_id, aml, sender, receiver, now)
+    events = _alert_events(rows)
+    session.add_all(rows)
     session.commit()
-    session.refresh(tx)
-    return {"status": "approved", "tx": tx, "aml": aml_dict}
+    alert_bus.publish_many(events)
+    if tx is not None:
+        feature_builder.invalidate(payload.from_wallet, payload.to_wallet)
+        session.refresh(tx)
+    return result
+
+
+@app.post("/api/transfer/async")
+async def transfer_async(
+    payload: TransferRequest,
+    session: AsyncSession = Depends(get_async_session),
+) -> Dict[str, object]:
+    """
+    Same pipeline as /api/transfer, but the AML call and the SQLite I/O are
+    awaited on the event loop, so concurrency is not capped by the threadpool.
+    """
+    deadline = time.monotonic() + TRANSFER_AML_BUDGET_S
+    sender = await session.get(Wallet, payload.from_wallet)
+    receiver = await session.get(Wallet, payload.to_wallet)
+
+    if not sender:
+        raise HTTPException(status_code=404, detail="sender wallet not found")
+    if sender.balance < payload.amount:
+        raise HTTPException(status_code=400, detail="insufficient balance")
+
+    now = datetime.utcnow()
+    tx_id = payload.tx_id or f"tx_{int(datetime.utcnow().timestamp())}"
+
+    aml = await check_tx_async(
+        chain="wallet",
+        to_address=payload.to_wallet,
+        amount_usdt=payload.amount,
+        from_address=payload.from_wallet,
+        deadline=deadline,
+    )
+
+    rows, result, tx = _settle_transfer(payload, tx_id, aml, sender, receiver, now)
+    events = _alert_events(rows)
+    session.add_all(rows)
+    await session.commit()
+    alert_bus.publish_many(events)
+    if tx is not None:
+        feature_builder.invalidate(payload.from_wallet, payload.to_wallet)
+        await session.refresh(tx)
+    return result
 
 
 @app.get("/api/transactions")
@@ -226,11 +337,33 @@ def get_transaction(tx_id: str, session: Session = Depends(get_session)) -> Dict
 
 @app.get("/api/alerts")
 def list_alerts(
-    limit: int = Query(50, ge=1, le=200),
+    limit: int = Query(50, ge=1, le=1000),
+    level: Optional[str] = None,
+    q: Optional[str] = Query(None, description="keyword in message / tx_id"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
     session: Session = Depends(get_session),
-) -> Dict[str, List[Alert]]:
-    alerts = session.exec(select(Alert).order_by(Alert.created_at.desc()).limit(limit)).all()
-    return {"alerts": alerts}
+) -> Dict[str, object]:
+    """Newest-first alerts, filtered server-side; pass back `next_cursor` for the next page."""
+    try:
+        alerts, next_cursor = search_alerts(
+            session, limit, level=level, q=(q or "").strip() or None, since=since, until=until, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"alerts": alerts, "next_cursor": next_cursor}
+
+
+@app.get("/api/alerts/stream")
+async def stream_alerts(cursor: Optional[str] = None, last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events: one `alert` event per committed alert, resumable by event id."""
+    try:
+        start = parse_cursor(cursor, last_event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    start = alert_bus.cursor if start is None else start
+    return StreamingResponse(alert_bus.stream(start, "alert"), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @app.get("/api/transactions/{tx_id}")
@@ -261,15 +394,77 @@ def get_alerts_by_tx(tx_id: str, session: Session = Depends(get_session)) -> Dic
 
 @app.post("/api/dataset/generate")
 def generate_dataset(payload: DatasetRequest, session: Session = Depends(get_session)) -> JSONResponse:
-    wallets = session.exec(select(Wallet)).all()
-    wallet_ids = [wallet.wallet_id for wallet in wallets]
+    wallet_ids = list(session.exec(select(Wallet.wallet_id)).all())
     if len(wallet_ids) < 2:
         raise HTTPException(status_code=400, detail="create at least 2 wallets first")
 
-    rows = generate_transactions(wallet_ids, scenario=payload.scenario, n=payload.n)
-    rows.sort(key=lambda item: item["timestamp"])
+    if payload.mix:
+        if any(name not in SCENARIOS for name in payload.mix):
+            raise HTTPException(status_code=400, detail=f"mix keys must be in {', '.join(SCENARIOS)}")
+        try:
+            counts = mix_counts(payload.n, payload.mix)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rows = columns_to_rows(generate_columns(wallet_ids, counts, seed=payload.seed))
+    else:
+        rows = generate_transactions(wallet_ids, scenario=payload.scenario, n=payload.n, seed=payload.seed)
+        rows.sort(key=lambda item: item["timestamp"])
+    dataset_name = "mixed" if payload.mix else payload.scenario
+
+    # One batch AML call for the whole dataset instead of one HTTP hop per row.
+    decisions = check_tx_batch(
+        chain="wallet",
+        to_addresses=[row["to_wallet"] for row in rows],
+        amounts_usdt=[row["amount"] for row in rows],
+        from_addresses=[row["from_wallet"] for row in rows],
+    )
+    reasons = [";".join(aml.reason_codes) if aml.reason_codes else "normal_pattern" for aml in decisions]
+
+    if payload.persist:
+        # Net balance change per wallet, applied once to wallets loaded with a single IN query.
+        deltas: Dict[str, float] = defaultdict(float)
+        for row in rows:
+            deltas[row["from_wallet"]] -= row["amount"]
+            deltas[row["to_wallet"]] += row["amount"]
+        for wallet in session.exec(select(Wallet).where(Wallet.wallet_id.in_(list(deltas)))).all():
+            wallet.balance += deltas[wallet.wallet_id]
+
+        flagged_at = datetime.utcnow()
+        tx_rows = []
+        alert_rows = []
+        for row, aml, reason in zip(rows, decisions, reasons):
+            tx_rows.append(
+                {
+                    "tx_id": row["tx_id"],
+                    "from_wallet": row["from_wallet"],
+                    "to_wallet": row["to_wallet"],
+                    "amount": row["amount"],
+                    "created_at": row["timestamp"],
+                    "risk_score": aml.risk_score,
+                    "risk_label": aml.risk_level,
+                    "reason": reason,
+                }
+            )
+            if aml.risk_level in {"HIGH", "MEDIUM"}:
+                alert_rows.append(
+                    {
+                        "created_at": flagged_at,
+                        "tx_id": row["tx_id"],
+                        "level": "CRITICAL" if aml.risk_level == "HIGH" else "WARN",
+                        "message": f"Dataset transaction flagged ({aml.risk_level}): {reason}",
+                        "risk_score": aml.risk_score,
+                    }
+                )
+
+        session.bulk_insert_mappings(Transaction, tx_rows)
+        if alert_rows:
+            # return_defaults writes the new ids back, so events match the transfer paths.
+            session.bulk_insert_mappings(Alert, alert_rows, return_defaults=True)
+        session.commit()
+        alert_bus.publish_many(_alert_events(Alert(**row) for row in alert_rows))
+        feature_builder.clear()  # every touched wallet's aggregates changed
 
-    out_path = DATA_DIR / f"synthetic_{payload.scenario}_{int(datetime.utcnow().timestamp())}.csv"
+    out_path = DATA_DIR / f"synthetic_{dataset_name}_{int(datetime.utcnow().timestamp())}.csv"
     with open(out_path, "w", newline="", encoding="utf-8") as handle:
         writer = csv.writer(handle)
         writer.writerow(
@@ -285,76 +480,78 @@ def generate_dataset(payload: DatasetRequest, session: Session = Depends(get_ses
                 "reason",
             ]
         )
-
-        for row in rows:
-            sender = session.get(Wallet, row["from_wallet"])
-            receiver = session.get(Wallet, row["to_wallet"])
-
-            aml = check_tx(
-                chain="wallet",
-                to_address=row["to_wallet"],
-                amount_usdt=row["amount"],
-                from_address=row.get("from_wallet"),
-            )
-
-            # persist to DB if requested
-            if payload.persist:
-                tx = Transaction(
-                    tx_id=row["tx_id"],
-                    from_wallet=row["from_wallet"],
-                    to_wallet=row["to_wallet"],
-                    amount=row["amount"],
-                    created_at=row["timestamp"],
-                    risk_score=aml.risk_score,
-                    risk_label=aml.risk_level,
-                    reason=";".join(aml.reason_codes) if aml.reason_codes else "normal_pattern",
-                )
-                session.add(tx)
-
-                if sender:
-                    sender.balance -= row["amount"]
-                if receiver:
-                    receiver.balance += row["amount"]
-
-                if aml.risk_level in {"HIGH", "MEDIUM"}:
-                    level = "CRITICAL" if aml.risk_level == "HIGH" else "WARN"
-                    msg = f"Dataset transaction flagged ({aml.risk_level}): {tx.reason}"
-                    session.add(Alert(tx_id=row["tx_id"], level=level, message=msg, risk_score=aml.risk_score))
-
-            writer.writerow(
-                [
-                    row["tx_id"],
-                    row["from_wallet"],
-                    row["to_wallet"],
-                    row["amount"],
-                    row["timestamp"].isoformat(),
-                    row["label_hint"],
-                    aml.risk_score,
-                    aml.risk_level,
-                    ";".join(aml.reason_codes) if aml.reason_codes else "normal_pattern",
-                ]
-            )
-
-    if payload.persist:
-        session.commit()
+        writer.writerows(
+            [
+                row["tx_id"],
+                row["from_wallet"],
+                row["to_wallet"],
+                row["amount"],
+                row["timestamp"].isoformat(),
+                row["label_hint"],
+                aml.risk_score,
+                aml.risk_level,
+                reason,
+            ]
+            for row, aml, reason in zip(rows, decisions, reasons)
+        )
 
     return JSONResponse(
         {
             "ok": True,
             "file": out_path.name,
             "rows": len(rows),
-            "scenario": payload.scenario,
+            "scenario": dataset_name,
             "persisted": payload.persist,
         }
     )
 
 
+@app.post("/api/dataset/stream")
+def stream_dataset(payload: StreamDatasetRequest, session: Session = Depends(get_session)) -> Dict[str, object]:
+    wallet_ids = list(session.exec(select(Wallet.wallet_id)).all())
+    if len(wallet_ids) < 2:
+        raise HTTPException(status_code=400, detail="create at least 2 wallets first")
+
+    unknown = [name for name in payload.scenarios if name not in SCENARIOS]
+    if unknown or not payload.scenarios:
+        raise HTTPException(status_code=400, detail=f"scenarios must be a non-empty subset of {', '.join(SCENARIOS)}")
+    if any(n < 1 for n in payload.scenarios.values()) or sum(payload.scenarios.values()) > STREAM_DATASET_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"rows per scenario must be >= 1 and total <= {STREAM_DATASET_MAX_ROWS}")
+
+    try:
+        job = start_dataset_job(
+            wallet_ids,
+            payload.scenarios,
+            fmt=payload.format,
+            chunk_rows=payload.chunk_rows,
+            score=payload.score,
+            seed=payload.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job": job.to_dict()}
+
+
+@app.get("/api/dataset/jobs")
+def dataset_jobs() -> Dict[str, List[Dict[str, object]]]:
+    return {"jobs": [job.to_dict() for job in list_jobs()]}
+
+
+@app.get("/api/dataset/jobs/{job_id}")
+def dataset_job(job_id: str) -> Dict[str, object]:
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    return {"job": job.to_dict()}
+
+
 @app.get("/api/dataset/download/{filename}")
 def download_dataset(filename: str) -> FileResponse:
-    file_path = DATA_DIR / filename
+    file_path = DATA_DIR / Path(filename).name
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="file not found")
-    return FileResponse(str(file_path), media_type="text/csv", filename=filename)
+    media_type = "application/vnd.apache.parquet" if file_path.suffix == ".parquet" else "text/csv"
+    return FileResponse(str(file_path), media_type=media_type, filename=file_path.name)
 
 
 @app.post("/api/transfer/confirm")
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
@@ -24,6 +25,9 @@ class Transaction(SQLModel, table=True):
 
 
 class Alert(SQLModel, table=True):
+    # Level filter + newest-first order in one index (see alert_search.py).
+    __table_args__ = (Index("ix_alert_level_created_at", "level", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     tx_id: str = Field(index=True)
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def fake_decision(amount, request_id="r"):
+    """Deterministic stand-in for the AML backend: the amount alone picks the outcome."""
+    from virtual_wallet.app.aml_adapter import AMLDecision
+
+    if amount >= 900:
+        return AMLDecision(request_id, 0.95, "HIGH", "BLOCK", ["large_amount"], {})
+    if amount >= 500:
+        return AMLDecision(request_id, 0.6, "MEDIUM", "ALLOW", ["elevated"], {})
+    return AMLDecision(request_id, 0.1, "LOW", "ALLOW", [], {})
+
+
+@pytest.fixture
+def fake_aml():
+    return fake_decision
+
+
+@pytest.fixture
+def wallet_api(tmp_path, monkeypatch):
+    """(main, TestClient) on a fresh database, with the AML calls answered by fake_decision."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    pytest.importorskip("sqlmodel")
+    pytest.importorskip("aiosqlite")
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import create_engine
+
+    from backend.app.utils.events import EventBus
+    from virtual_wallet.app import dataset_jobs, db, features, main
+
+    path = tmp_path / "wallet.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "async_engine", create_async_engine(f"sqlite+aiosqlite:///{path}"))
+    monkeypatch.setattr(features, "engine", engine)
+    monkeypatch.setattr(main, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(dataset_jobs, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(main, "alert_bus", EventBus(1000))
+    features.feature_builder.clear()
+
+    async def check_tx_async(chain, to_address, amount_usdt, from_address=None, deadline=None):
+        return fake_decision(amount_usdt)
+
+    monkeypatch.setattr(main, "check_tx", lambda chain, to_address, amount_usdt, **kw: fake_decision(amount_usdt))
+    monkeypatch.setattr(main, "check_tx_async", check_tx_async)
+
+    def check_tx_batch(chain, to_addresses, amounts_usdt, from_addresses=None):
+        return [fake_decision(a, f"r{i}") for i, a in enumerate(amounts_usdt)]
+
+    monkeypatch.setattr(main, "check_tx_batch", check_tx_batch)
+    monkeypatch.setattr(dataset_jobs, "check_tx_batch", check_tx_batch)
+    with TestClient(main.app) as client:
+        yield main, client
@@ -0,0 +1,124 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("sqlmodel")
+
+from sqlmodel import Session, SQLModel, create_engine, select  # noqa: E402
+
+from virtual_wallet.app import alert_search  # noqa: E402
+from virtual_wallet.app.alert_search import decode_cursor, init_alert_search, search_alerts  # noqa: E402
+from virtual_wallet.app.models import Alert  # noqa: E402
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+HAS_TRIGRAM = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def _alerts():
+    out = []
+    for i in range(30):
+        out.append(
+            Alert(
+                # Pairs share a timestamp, so pages must break ties on id.
+                created_at=T0 + timedelta(seconds=i // 2),
+                tx_id=f"tx_{i:03d}",
+                level="BLOCK" if i % 3 == 0 else "WARN",
+                message="Mixer deposit flagged" if i % 5 == 0 else "large transfer",
+            )
+        )
+    return out
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(alert_search, "fts_enabled", False)
+    engine = create_engine(f"sqlite:///{tmp_path / 'wallet.db'}")
+    SQLModel.metadata.create_all(engine)
+    # Rows written before the FTS table existed are indexed by the rebuild.
+    with Session(engine) as session:
+        session.add_all(_alerts()[:10])
+        session.commit()
+    init_alert_search(engine)
+    with Session(engine) as session:
+        session.add_all(_alerts()[10:])
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+def _newest_first(session, **filters):
+    alerts, _ = search_alerts(session, limit=1000, **filters)
+    return [a.id for a in alerts]
+
+
+def _all_pages(session, limit, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        alerts, cursor = search_alerts(session, limit=limit, cursor=cursor, **filters)
+        ids.extend(a.id for a in alerts)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+def test_fts_is_used_when_available(engine):
+    assert alert_search.fts_enabled == HAS_TRIGRAM
+
+
+def test_cursor_pages_cover_everything_once_in_order(engine):
+    with Session(engine) as session:
+        full = _newest_first(session)
+        assert len(full) == 30
+        rows = {a.id: a for a in session.exec(select(Alert)).all()}
+        keys = [(rows[i].created_at, i) for i in full]
+        assert keys == sorted(keys, reverse=True)
+
+        paged, pages = _all_pages(session, limit=7)
+        assert paged == full and pages == 5
+
+
+def test_filters_combine_with_cursor(engine):
+    with Session(engine) as session:
+        blocks = _newest_first(session, level="block")
+        assert len(blocks) == 10
+        assert _all_pages(session, limit=3, level="BLOCK")[0] == blocks
+
+        since = T0 + timedelta(seconds=5)
+        until = T0 + timedelta(seconds=10)
+        window = _newest_first(session, since=since, until=until)
+        assert len(window) == 10  # seconds 5..9, two alerts each
+        # Aware datetimes are compared in UTC against the naive stored values.
+        aware = _newest_first(session, since=since.replace(tzinfo=timezone.utc), until=until.replace(tzinfo=timezone.utc))
+        assert aware == window
+
+
+def test_keyword_search_matches_inside_words_case_insensitively(engine):
+    with Session(engine) as session:
+        mixer = _newest_first(session, q="IXER")
+        assert len(mixer) == 6
+        assert all("Mixer" in session.get(Alert, i).message for i in mixer)
+        assert _all_pages(session, limit=4, q="ixer")[0] == mixer
+        assert len(_newest_first(session, q="tx_00")) == 10
+        # Below trigram length: LIKE fallback, same semantics.
+        assert len(_newest_first(session, q="x_")) == 30
+        assert _newest_first(session, q='"quoted"') == []
+
+
+def test_fts_follows_updates_and_deletes(engine):
+    with Session(engine) as session:
+        assert len(_newest_first(session, q="transfer")) == 24
+        first = session.get(Alert, 1)
+        first.message = "sanctioned counterparty"
+        session.add(first)
+        session.delete(session.get(Alert, 12))  # a "large transfer" alert
+        session.commit()
+        assert _newest_first(session, q="counterparty") == [1]
+        assert 1 not in _newest_first(session, q="mixer")
+        transfers = _newest_first(session, q="transfer")
+        assert len(transfers) == 23 and 12 not in transfers
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
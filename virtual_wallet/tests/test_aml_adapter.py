@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("requests")
+pytest.importorskip("sqlmodel")
+pytest.importorskip("aiosqlite")
+
+from backend.app.services.inference import decode_float32_body  # noqa: E402
+from virtual_wallet.app import aml_adapter  # noqa: E402
+from virtual_wallet.app.aml_adapter import check_tx, check_tx_batch  # noqa: E402
+from virtual_wallet.app.aml_client import _encode_matrix  # noqa: E402
+from virtual_wallet.app.features import FeatureBuilder  # noqa: E402
+
+
+def _without_ids(parties):
+    return [{k: v for k, v in p.items() if k != "request_id"} for p in parties]
+
+
+def _loader(wallet_ids):
+    return {w: np.full(8, float(len(w)), dtype=np.float32) for w in wallet_ids}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = {"single": [], "batch": []}
+
+    def predict(features, deadline=None, parties=None):
+        calls["single"].append((np.array(features, dtype=np.float32), parties))
+        return {"prediction": "licit", "risk_score": float(features[0]) / 1000}
+
+    def predict_batch(X, deadline=None, parties=None):
+        calls["batch"].append((X.copy(), parties))
+        return {
+            "count": len(X),
+            "predictions": ["licit"] * len(X),
+            "risk_scores": (X[:, 0].astype(np.float64) / 1000).tolist(),
+        }
+
+    monkeypatch.setattr(aml_adapter, "feature_builder", FeatureBuilder(loader=_loader))
+    monkeypatch.setattr(aml_adapter, "aml_predict", predict)
+    monkeypatch.setattr(aml_adapter, "aml_predict_batch", predict_batch)
+    return calls
+
+
+def test_batch_sends_what_check_tx_sends_per_transfer(calls):
+    to, amounts, senders = ["w2", "w333", "w2"], [100.0, 900.0, 450.0], ["w1", None, "w333"]
+    decisions = check_tx_batch("wallet", to, amounts, senders)
+    singles = [check_tx("wallet", t, a, f) for t, a, f in zip(to, amounts, senders)]
+
+    (X, batch_parties), = calls["batch"]
+    np.testing.assert_array_equal(X, np.stack([row for row, _ in calls["single"]]))
+    single_parties = [p for _, p in calls["single"]]
+    assert _without_ids(batch_parties) == _without_ids(single_parties)
+    assert [p["request_id"] for p in batch_parties] == [d.request_id for d in decisions]
+    assert len({d.request_id for d in decisions + singles}) == 6
+
+    assert [(d.decision, d.risk_score) for d in decisions] == [(d.decision, d.risk_score) for d in singles]
+
+
+def test_batch_body_carries_parties_after_the_matrix():
+    X = np.arange(6, dtype=np.float32).reshape(2, 3)
+    parties = [{"chain": "wallet", "to_address": "b", "from_address": None, "request_id": "r1"}, {"to_address": "c"}]
+    decoded, trailer = decode_float32_body(_encode_matrix(X, parties))
+    np.testing.assert_array_equal(decoded, X)
+    assert json.loads(trailer) == [{"chain": "wallet", "to_address": "b", "request_id": "r1"}, {"to_address": "c"}]
+    assert decode_float32_body(_encode_matrix(X))[1] == b""
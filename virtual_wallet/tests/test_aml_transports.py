@@ -0,0 +1,225 @@
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+requests = pytest.importorskip("requests")
+pytest.importorskip("httpx")
+
+from virtual_wallet.app import aml_client  # noqa: E402
+from virtual_wallet.app.aml_client import (  # noqa: E402
+    AMLDeadlineExceeded,
+    _encode_matrix,
+    _predict_body,
+    aml_predict,
+    aml_predict_batch,
+    client_stats,
+)
+
+PARTIES = {"chain": "wallet", "to_address": "w2", "from_address": None, "request_id": "r1"}
+
+
+def _row():
+    row = np.zeros(165, dtype=np.float32)
+    row[[0, 37, 94]] = [1250.5, 7.13, -3.0]
+    return row
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Echoes what it was sent; decodes AMLF bodies with the same layout as the backend."""
+
+    protocol_version = "HTTP/1.1"
+    delay_s = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.delay_s)
+        if self.headers["Content-Type"] == "application/octet-stream":
+            magic, rows, cols = aml_client._FLOAT32_HEADER.unpack_from(body)
+            size = aml_client._FLOAT32_HEADER.size + rows * cols * 4
+            X = np.frombuffer(body, dtype="<f4", count=rows * cols, offset=aml_client._FLOAT32_HEADER.size)
+            trailer = body[size:]
+            seen = {"shape": [rows, cols], "X": X.tolist(), "parties": json.loads(trailer) if trailer else None}
+        else:
+            seen = json.loads(body)
+        seen["path"] = self.path
+        out = json.dumps(seen).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("uds", 0)
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def client_state(monkeypatch):
+    """Fresh pools and counters, restored afterwards."""
+    for name in ("_session", "_uds_client", "_async_client", "_inprocess_score", "_inprocess_score_rows"):
+        monkeypatch.setattr(aml_client, name, None)
+    monkeypatch.setattr(aml_client, "_requests_sent", 0)
+    yield
+    for name in ("_session", "_uds_client"):
+        pool = getattr(aml_client, name)
+        if pool is not None:
+            pool.close()
+
+
+@pytest.fixture
+def http_server(client_state, monkeypatch):
+    server = _serve(ThreadingHTTPServer(("127.0.0.1", 0), Handler))
+    monkeypatch.setattr(aml_client, "AML_BASE", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(aml_client, "AML_TRANSPORT", "http")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def uds_server(client_state, monkeypatch):
+    if not hasattr(socketserver, "UnixStreamServer"):
+        pytest.skip("no Unix-domain sockets")
+    path = os.path.join(tempfile.mkdtemp(), "aml.sock")
+    server = _serve(UnixHTTPServer(path, Handler))
+    monkeypatch.setattr(aml_client, "AML_UDS_PATH", path)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_timeouts_are_clipped_to_the_deadline(monkeypatch):
+    monkeypatch.setattr(aml_client, "AML_CONNECT_TIMEOUT_S", 0.5)
+    monkeypatch.setattr(aml_client, "AML_READ_TIMEOUT_S", 5.0)
+    assert aml_client._timeout(None) == (0.5, 5.0)
+    connect, read = aml_client._timeout(time.monotonic() + 0.2)
+    assert 0 < connect <= 0.2 and 0 < read <= 0.2
+    with pytest.raises(AMLDeadlineExceeded):
+        aml_client._timeout(time.monotonic() - 0.01)
+    assert issubclass(AMLDeadlineExceeded, requests.Timeout)  # callers catch one exception type
+
+
+@pytest.mark.parametrize("wire_format", ["sparse", "float32", "dense"])
+def test_wire_formats_carry_the_same_row(monkeypatch, wire_format):
+    monkeypatch.setattr(aml_client, "AML_WIRE_FORMAT", wire_format)
+    row = _row()
+    body = _predict_body(row, PARTIES)
+    compact = {"chain": "wallet", "to_address": "w2", "request_id": "r1"}
+    if wire_format == "sparse":
+        assert body["json"]["indices"] == [0, 37, 94] and body["json"]["dim"] == 165
+        decoded = np.zeros(165, dtype=np.float32)
+        decoded[body["json"]["indices"]] = body["json"]["values"]
+        assert {k: body["json"][k] for k in compact} == compact
+    elif wire_format == "dense":
+        decoded = np.asarray(body["json"]["features"], dtype=np.float32)
+        assert {k: body["json"][k] for k in compact} == compact
+    else:
+        assert body["headers"]["Content-Type"] == "application/octet-stream" and body["params"] == compact
+        offset = aml_client._FLOAT32_HEADER.size
+        assert aml_client._FLOAT32_HEADER.unpack_from(body["content"]) == (b"AMLF", 1, 165)
+        decoded = np.frombuffer(body["content"], dtype="<f4", offset=offset)
+    np.testing.assert_array_equal(decoded, row)
+    assert "from_address" not in body.get("json", body.get("params"))
+
+
+def test_unknown_format_or_transport_is_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="transport"):
+        aml_predict(_row(), transport="carrier-pigeon")
+    monkeypatch.setattr(aml_client, "AML_WIRE_FORMAT", "xml")
+    with pytest.raises(ValueError, match="wire format"):
+        _predict_body(_row())
+
+
+@pytest.mark.parametrize("wire_format", ["sparse", "float32", "dense"])
+def test_http_transport_reuses_one_keep_alive_connection(http_server, monkeypatch, wire_format):
+    monkeypatch.setattr(aml_client, "AML_WIRE_FORMAT", wire_format)
+    for _ in range(5):
+        seen = aml_predict(_row(), deadline=time.monotonic() + 2, transport="http", parties=PARTIES)
+        assert seen["path"].startswith("/risk/predict")
+    stats = client_stats()
+    assert (stats["requests"], stats["connections_opened"], stats["connections_reused"]) == (5, 1, 4)
+
+
+def test_http_call_does_not_outlive_the_deadline(http_server, monkeypatch):
+    monkeypatch.setattr(Handler, "delay_s", 0.5)
+    t0 = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        aml_predict(_row(), deadline=t0 + 0.1, transport="http")
+    assert time.monotonic() - t0 < 0.4
+
+
+@pytest.mark.parametrize("transport", ["http", "uds"])
+def test_batch_body_reaches_the_server_with_parties(request, monkeypatch, transport):
+    request.getfixturevalue("http_server" if transport == "http" else "uds_server")
+    monkeypatch.setattr(aml_client, "AML_TRANSPORT", transport)
+    X = np.stack([_row(), _row() * 2])
+    parties = [PARTIES, {"to_address": "w3"}]
+    seen = aml_predict_batch(X, deadline=time.monotonic() + 2, parties=parties)
+    assert seen["path"] == "/risk/predict/batch" and seen["shape"] == [2, 165]
+    np.testing.assert_array_equal(np.asarray(seen["X"], dtype=np.float32).reshape(2, 165), X)
+    assert seen["parties"] == [{"chain": "wallet", "to_address": "w2", "request_id": "r1"}, {"to_address": "w3"}]
+
+
+def test_uds_transport_sends_the_configured_wire_format(uds_server, monkeypatch):
+    monkeypatch.setattr(aml_client, "AML_WIRE_FORMAT", "sparse")
+    seen = aml_predict(_row(), transport="uds", parties=PARTIES)
+    assert seen["path"] == "/risk/predict" and seen["indices"] == [0, 37, 94] and seen["to_address"] == "w2"
+
+
+def test_inprocess_transport_calls_the_scoring_function(client_state, monkeypatch):
+    calls = []
+
+    def score_features(features, **parties):
+        calls.append((np.array(features), parties))
+        return SimpleNamespace(model_dump=lambda: {"prediction": "licit", "risk_score": 0.25})
+
+    monkeypatch.setattr(aml_client, "_inprocess_score", score_features)
+    assert aml_predict(_row(), transport="inprocess", parties=PARTIES) == {"prediction": "licit", "risk_score": 0.25}
+    ((features, parties),) = calls
+    np.testing.assert_array_equal(features, _row())
+    assert parties == PARTIES
+    with pytest.raises(AMLDeadlineExceeded):
+        aml_predict(_row(), deadline=time.monotonic() - 1, transport="inprocess")
+    assert client_stats()["requests"] == 0  # no HTTP hop
+
+
+def test_inprocess_batch_passes_parties_as_models(client_state, monkeypatch):
+    pytest.importorskip("pydantic")
+    seen = {}
+
+    def score_rows(X, parties=None):
+        seen.update(X=X, parties=parties)
+        return SimpleNamespace(model_dump=lambda: {"count": len(X)})
+
+    monkeypatch.setattr(aml_client, "_inprocess_score_rows", score_rows)
+    X = np.stack([_row(), _row()])
+    assert aml_predict_batch(X, transport="inprocess", parties=[PARTIES, {"to_address": "w9"}]) == {"count": 2}
+    assert seen["X"].dtype == np.float32 and [p.to_address for p in seen["parties"]] == ["w2", "w9"]
+
+
+def test_matrix_encoding_without_parties_has_no_trailer():
+    X = np.arange(6, dtype=np.float64).reshape(2, 3)
+    body = _encode_matrix(X)
+    assert len(body) == aml_client._FLOAT32_HEADER.size + 6 * 4
@@ -0,0 +1,72 @@
+import csv
+import io
+import time
+
+import pytest
+
+pytest.importorskip("sqlmodel")
+
+from virtual_wallet.app.models import Alert  # noqa: E402
+
+ALERT_KEYS = set(Alert.model_fields)
+
+
+def _events(main):
+    return [event for _, event in main.alert_bus.since(0)[0]]
+
+
+def _seed(client, *balances):
+    for i, balance in enumerate(balances):
+        assert client.post("/api/wallets", json={"wallet_id": f"w{i}", "balance": balance}).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/api/transfer", "/api/transfer/async"])
+def test_transfer_alerts_are_published_as_json_rows(wallet_api, path):
+    main, client = wallet_api
+    _seed(client, 5000.0, 0.0)
+    r = client.post(path, json={"tx_id": "t1", "from_wallet": "w0", "to_wallet": "w1", "amount": 950.0})
+    assert r.json()["status"] == "blocked"
+    (event,) = _events(main)
+    assert set(event) == ALERT_KEYS
+    assert (event["tx_id"], event["level"]) == ("t1", "CRITICAL")
+    assert isinstance(event["created_at"], str)
+
+
+def test_dataset_alerts_have_the_transfer_event_shape(wallet_api):
+    main, client = wallet_api
+    client.post("/api/wallets/seed", json={"count": 6})
+    r = client.post("/api/dataset/generate", json={"scenario": "burst", "n": 60, "seed": 3})
+    assert r.status_code == 200, r.text
+
+    events = _events(main)
+    alerts = client.get("/api/alerts", params={"limit": 1000}).json()["alerts"]
+    assert events and len(events) == len(alerts)
+    assert all(set(event) == ALERT_KEYS for event in events)
+    assert all(isinstance(event["id"], int) and isinstance(event["created_at"], str) for event in events)
+    assert {event["id"] for event in events} == {alert["id"] for alert in alerts}
+
+
+def test_csv_dataset_job_end_to_end(wallet_api):
+    main, client = wallet_api
+    client.post("/api/wallets/seed", json={"count": 6})
+    mix = {"normal": 1500, "mule": 301}
+    r = client.post("/api/dataset/stream", json={"scenarios": mix, "chunk_rows": 1000, "seed": 5})
+    assert r.status_code == 200, r.text
+    job = r.json()["job"]
+
+    deadline = time.monotonic() + 30
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/api/dataset/jobs/{job['job_id']}").json()["job"]
+    assert job["status"] == "done", job
+    assert job["rows_written"] == job["rows_total"] == 1801
+    assert not list(main.DATA_DIR.glob("*.part"))
+
+    r = client.get(f"/api/dataset/download/{job['file']}")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == 1801
+    assert [row["tx_id"] for row in rows] == [f"tx_{i}" for i in range(1, 1802)]
+    assert [row["timestamp"] for row in rows] == sorted(row["timestamp"] for row in rows)
+    assert all(row["risk_label"] in ("LOW", "MEDIUM", "HIGH") for row in rows)
+    assert client.get("/api/dataset/download/missing.csv").status_code == 404
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sqlmodel")
+pytest.importorskip("aiosqlite")
+
+from sqlmodel import Session, SQLModel, create_engine  # noqa: E402
+
+from virtual_wallet.app import features  # noqa: E402
+from virtual_wallet.app.features import (  # noqa: E402
+    FEATURE_DIM,
+    TX_FEATURES,
+    WALLET_BLOCKS,
+    FeatureBuilder,
+    TxFeature,
+    load_wallet_aggregates,
+)
+from virtual_wallet.app.models import Transaction, Wallet  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(features.time, "monotonic", clock)
+    return clock
+
+
+def _fake_loader(calls):
+    def load(wallet_ids):
+        calls.append(sorted(wallet_ids))
+        out = {}
+        for w in wallet_ids:
+            agg = np.arange(8, dtype=np.float32) + (100 if w == "A" else 200 if w == "B" else 300)
+            agg.flags.writeable = False
+            out[w] = agg
+        return out
+
+    return load
+
+
+def test_layout_leaves_the_backend_velocity_block_free():
+    features._check_layout()
+    slots = {f.slot for f in TX_FEATURES}
+    for start in WALLET_BLOCKS.values():
+        slots.update(range(start, start + 8))
+    assert max(slots) < FEATURE_DIM and not slots & set(range(1, 37))
+
+
+@pytest.mark.parametrize("slot", [5, 37, 94, FEATURE_DIM])
+def test_layout_rejects_overlapping_or_out_of_range_slots(monkeypatch, slot):
+    monkeypatch.setattr(features, "TX_FEATURES", TX_FEATURES + (TxFeature("bad", slot, lambda a: a),))
+    with pytest.raises(ValueError):
+        features._check_layout()
+
+
+def test_aggregates_expire_after_ttl(clock):
+    calls = []
+    builder = FeatureBuilder(ttl_s=30, loader=_fake_loader(calls))
+    builder.wallet_aggregates(["A", "B"])
+    builder.wallet_aggregates(["B", "A", None])
+    assert calls == [["A", "B"]]
+    assert builder.is_cached("A", "B", None)
+
+    clock.now += 31
+    assert not builder.is_cached("A")
+    builder.wallet_aggregates(["A"])
+    assert calls == [["A", "B"], ["A"]]
+    assert builder.stats()["hits"] == 2 and builder.stats()["misses"] == 3
+
+
+def test_invalidate_and_clear_force_a_reload(clock):
+    calls = []
+    builder = FeatureBuilder(loader=_fake_loader(calls))
+    builder.wallet_aggregates(["A", "B"])
+    builder.invalidate("A")
+    assert not builder.is_cached("A") and builder.is_cached("B")
+    builder.wallet_aggregates(["A", "B"])
+    builder.clear()
+    builder.wallet_aggregates(["A", "B"])
+    assert calls == [["A", "B"], ["A"], ["A", "B"]]
+
+
+def test_cache_is_bounded(clock):
+    builder = FeatureBuilder(max_wallets=2, loader=_fake_loader([]))
+    builder.wallet_aggregates(["A", "B"])
+    builder.wallet_aggregates(["C"])
+    assert builder.stats()["cached_wallets"] == 1
+
+
+def test_build_row_and_build_matrix_agree(clock):
+    builder = FeatureBuilder(loader=_fake_loader([]))
+    amounts = [100.0, 9500.25, 0.0, 42.0]
+    senders = ["A", "B", "A", None]
+    receivers = ["B", "C", "C", "A"]
+
+    X = builder.build_matrix(amounts, senders, receivers)
+    rows = np.stack([builder.build_row(a, f, t).copy() for a, f, t in zip(amounts, senders, receivers)])
+    assert X.dtype == np.float32 and X.shape == (4, FEATURE_DIM)
+    np.testing.assert_array_equal(X, rows)
+    assert not X[:, 1:37].any()
+    assert X[0, 38] == 1.0 and X[1, 38] == 0.0  # round_amount
+    assert not X[3, WALLET_BLOCKS["sender"] : WALLET_BLOCKS["sender"] + 8].any()
+
+    no_senders = builder.build_matrix(amounts, None, receivers)
+    np.testing.assert_array_equal(no_senders[:, WALLET_BLOCKS["receiver"] :], X[:, WALLET_BLOCKS["receiver"] :])
+    assert builder.build_matrix([], None, []).shape == (0, FEATURE_DIM)
+
+
+def test_build_row_scratch_buffer_is_reused(clock):
+    builder = FeatureBuilder(loader=_fake_loader([]))
+    first = builder.build_row(100.0, "A", "B")
+    second = builder.build_row(5.0, None, "C")
+    assert first is second and second[0] == 5.0
+    own = np.zeros(FEATURE_DIM, dtype=np.float32)
+    assert builder.build_row(7.0, "A", "B", out=own) is own and first[0] == 5.0
+
+
+def test_load_wallet_aggregates_groups_by_direction(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'wallet.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Wallet(wallet_id="A", balance=50.0, tag="mixer"),
+                Wallet(wallet_id="B", balance=10.0),
+                Transaction(tx_id="1", from_wallet="A", to_wallet="B", amount=5.0),
+                Transaction(tx_id="2", from_wallet="A", to_wallet="B", amount=7.0),
+                Transaction(tx_id="3", from_wallet="A", to_wallet="C", amount=1.0),
+                Transaction(tx_id="4", from_wallet="C", to_wallet="A", amount=2.0),
+            ]
+        )
+        session.commit()
+    monkeypatch.setattr(features, "engine", engine)
+
+    aggs = load_wallet_aggregates(["A", "B", "missing"])
+    assert aggs["A"].tolist() == [50.0, 3, 13.0, 2, 1, 2.0, 1, 1.0]
+    assert aggs["B"].tolist() == [10.0, 0, 0, 0, 2, 12.0, 1, 0.0]
+    assert not aggs["missing"].any()
+    assert not aggs["A"].flags.writeable
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from virtual_wallet.app.generator import (
+    MIXER_ADDR,
+    MULE_ADDR,
+    NEXT,
+    SCENARIO_SPECS,
+    SCENARIOS,
+    SPECIAL_ADDRS,
+    chunked,
+    generate_columns,
+    generate_transactions,
+    iter_transactions,
+    mix_counts,
+)
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+WALLETS = [f"w{i:02d}" for i in range(20)]
+MIX = {"normal": 400, "burst": 150, "mule": 101, "layering": 250, "mixer": 60}
+
+
+def _stream_rows(mix=MIX, seed=7, now=NOW):
+    return list(iter_transactions(WALLETS, mix, seed=seed, now=now))
+
+
+def test_streaming_is_reproducible_with_seed_and_now():
+    assert _stream_rows() == _stream_rows()
+    assert _stream_rows() != _stream_rows(seed=8)
+
+
+def test_merge_is_time_ordered_and_stable_across_streams():
+    rows = _stream_rows()
+    leg_order = {leg.label: i for i, leg in enumerate(leg for s in MIX for leg in SCENARIO_SPECS[s])}
+    keys = [(row["timestamp"], leg_order[row["label_hint"]]) for row in rows]
+    assert keys == sorted(keys)  # ties keep the order the streams were given in
+    assert [row["tx_id"] for row in rows] == [f"tx_{i}" for i in range(1, len(rows) + 1)]
+    assert len(rows) == sum(MIX.values())
+
+
+def test_streamed_rows_follow_the_scenario_spec():
+    rows = _stream_rows()
+    for row in rows:
+        label = row["label_hint"]
+        (leg,) = [leg for legs in SCENARIO_SPECS.values() for leg in legs if leg.label == label]
+        lo, hi = leg.amount
+        assert lo <= row["amount"] <= hi
+        offset = row["timestamp"] - (NOW - leg.start)
+        assert timedelta(0) <= offset <= timedelta(seconds=(leg.slots - 1) * leg.step_s)
+        assert offset.total_seconds() % leg.step_s == 0
+        if label in ("BENIGN", "SUSPICIOUS_LAYERING"):
+            assert row["from_wallet"] != row["to_wallet"]
+    mule_in = [r for r in rows if r["label_hint"] == "SUSPICIOUS_MULE_IN"]
+    mule_out = [r for r in rows if r["label_hint"] == "SUSPICIOUS_MULE_OUT"]
+    assert (len(mule_in), len(mule_out)) == (50, 51)
+    assert {r["to_wallet"] for r in mule_in} == {r["from_wallet"] for r in mule_out} == {MULE_ADDR}
+    assert {r["to_wallet"] for r in rows if r["label_hint"] == "SUSPICIOUS_MIXER"} == {MIXER_ADDR}
+    assert len({r["from_wallet"] for r in rows if r["label_hint"] == "SUSPICIOUS_BURST"}) == 1
+
+
+def test_unknown_scenario_is_rejected():
+    with pytest.raises(ValueError):
+        _stream_rows({"normal": 5, "nope": 5})
+    assert set(SCENARIOS) == set(SCENARIO_SPECS)
+
+
+def test_chunked_is_lazy_and_keeps_the_remainder():
+    pulled = []
+
+    def rows():
+        for i in range(10):
+            pulled.append(i)
+            yield i
+
+    chunks = chunked(rows(), 4)
+    assert next(chunks) == [0, 1, 2, 3] and pulled == [0, 1, 2, 3]
+    assert list(chunks) == [[4, 5, 6, 7], [8, 9]]
+    assert list(chunked(iter(()), 4)) == []
+
+
+def _columns(mix, seed=11, now=NOW, **kw):
+    return generate_columns(WALLETS, mix, seed=seed, now=now, **kw)
+
+
+def test_columns_are_reproducible_with_seed_and_now():
+    mix = {s: 300 for s in SCENARIOS}
+    a, b = _columns(mix), _columns(mix)
+    assert all(np.array_equal(a[k], b[k]) for k in a)
+    assert not np.array_equal(a["amount"], _columns(mix, seed=12)["amount"])
+    assert generate_transactions(WALLETS, "mule", n=40, seed=3, now=NOW) == generate_transactions(
+        WALLETS, "mule", n=40, seed=3, now=NOW
+    )
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_columns_follow_the_scenario_spec(scenario):
+    cols = _columns({scenario: 401})
+    wallets = set(WALLETS)
+    for leg in SCENARIO_SPECS[scenario]:
+        mask = cols["label_hint"] == leg.label
+        frm, to = set(cols["from_wallet"][mask]), set(cols["to_wallet"][mask])
+        lo, hi = leg.amount
+        assert ((cols["amount"][mask] >= lo) & (cols["amount"][mask] <= hi)).all()
+        offset = (cols["timestamp"][mask] - np.datetime64(NOW - leg.start, "us")) // np.timedelta64(1, "s")
+        assert ((offset >= 0) & (offset <= (leg.slots - 1) * leg.step_s) & (offset % leg.step_s == 0)).all()
+        for spec, side in ((leg.sender, frm), (leg.receiver, to)):
+            if isinstance(spec, str):
+                assert side == {spec}
+            elif spec is None or spec == NEXT:
+                assert side <= wallets
+            else:
+                assert side <= wallets and len(side) <= spec
+        if leg.receiver == NEXT or (leg.sender is None and leg.receiver is None):
+            assert (cols["from_wallet"][mask] != cols["to_wallet"][mask]).all()
+    assert sorted(set(cols["label_hint"])) == sorted(leg.label for leg in SCENARIO_SPECS[scenario])
+    assert not set(cols["from_wallet"]) & set(SPECIAL_ADDRS) - {MULE_ADDR}
+
+
+def test_layering_moves_funds_one_hop_down_the_chain():
+    cols = _columns({"layering": 500})
+    pairs = set(zip(cols["from_wallet"].tolist(), cols["to_wallet"].tolist()))
+    nxt = dict(pairs)
+    assert len(nxt) == len(pairs) <= 5  # each hop has exactly one successor
+    assert len(set(nxt) - set(nxt.values())) == 1  # a single chain head
+
+
+def test_sorted_columns_are_time_ordered_with_stable_ties():
+    mix = {"burst": 300, "normal": 300, "mule": 300}
+    unsorted, merged = _columns(mix, sort=False), _columns(mix)
+    assert (np.diff(merged["timestamp"].astype("i8")) >= 0).all()
+    assert merged["tx_seq"].tolist() == list(range(1, 901))
+    order = np.lexsort((np.arange(900), unsorted["timestamp"]))
+    assert merged["amount"].tolist() == unsorted["amount"][order].tolist()
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 200, 50000])
+@pytest.mark.parametrize(
+    "proportions",
+    [{"normal": 1}, {"normal": 0.7, "mixer": 0.2, "mule": 0.1}, {"a": 1, "b": 1, "c": 1}, {"x": 3, "y": 0}],
+)
+def test_mix_counts_sum_to_n(n, proportions):
+    counts = mix_counts(n, proportions)
+    assert sum(counts.values()) == n and set(counts) == set(proportions)
+    total = sum(proportions.values())
+    assert all(abs(counts[k] - n * v / total) < 1 for k, v in proportions.items())
+
+
+def test_mix_counts_rejects_empty_proportions():
+    with pytest.raises(ValueError):
+        mix_counts(10, {"normal": 0})
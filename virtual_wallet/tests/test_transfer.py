@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+TRANSFERS = [("w0", "w1", 100.0), ("w1", "w2", 600.0), ("w0", "w2", 950.0), ("w2", "w0", 40.0)]
+
+
+def _seed(client, n=3, balance=2000.0):
+    for i in range(n):
+        assert client.post("/api/wallets", json={"wallet_id": f"w{i}", "balance": balance}).status_code == 200
+
+
+def _snapshot(client):
+    wallets = {w["wallet_id"]: w["balance"] for w in client.get("/api/wallets").json()["wallets"]}
+    txs = sorted(
+        (t["tx_id"], t["from_wallet"], t["to_wallet"], t["amount"], t["risk_label"])
+        for t in client.get("/api/transactions").json()["transactions"]
+    )
+    alerts = sorted((a["tx_id"], a["level"], a["message"]) for a in client.get("/api/alerts").json()["alerts"])
+    return wallets, txs, alerts
+
+
+def _run(client, path):
+    out = []
+    for i, (frm, to, amount) in enumerate(TRANSFERS):
+        r = client.post(path, json={"tx_id": f"t{i}", "from_wallet": frm, "to_wallet": to, "amount": amount})
+        assert r.status_code == 200, r.text
+        body = r.json()
+        out.append((body["status"], body["aml"]["risk_level"], body.get("tx", {}).get("amount")))
+    return out
+
+
+@pytest.mark.parametrize("path", ["/api/transfer", "/api/transfer/async"])
+def test_both_pipelines_settle_transfers_the_same_way(wallet_api, path):
+    _, client = wallet_api
+    _seed(client)
+    assert _run(client, path) == [
+        ("approved", "LOW", 100.0),
+        ("approved", "MEDIUM", 600.0),
+        ("blocked", "HIGH", None),
+        ("approved", "LOW", 40.0),
+    ]
+    wallets, txs, alerts = _snapshot(client)
+    assert wallets == {"w0": 1940.0, "w1": 1500.0, "w2": 2560.0}
+    assert [t[0] for t in txs] == ["t0", "t1", "t3"]
+    assert [(a[0], a[1]) for a in alerts] == [("t1", "WARN"), ("t2", "CRITICAL")]
+
+
+@pytest.mark.parametrize("path", ["/api/transfer", "/api/transfer/async"])
+def test_transfer_rejects_unknown_sender_and_overdraft(wallet_api, path):
+    _, client = wallet_api
+    _seed(client, balance=50.0)
+    missing = client.post(path, json={"from_wallet": "nobody", "to_wallet": "w1", "amount": 5.0})
+    broke = client.post(path, json={"from_wallet": "w0", "to_wallet": "w1", "amount": 60.0})
+    assert (missing.status_code, broke.status_code) == (404, 400)
+    assert _snapshot(client)[0] == {"w0": 50.0, "w1": 50.0, "w2": 50.0}
+
+
+def test_async_transfers_overlap_while_waiting_on_aml(wallet_api, fake_aml, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    main, client = wallet_api
+    _seed(client, n=10)
+    delay = 0.3
+
+    async def slow_check(chain, to_address, amount_usdt, from_address=None, deadline=None):
+        await asyncio.sleep(delay)
+        return fake_aml(amount_usdt)
+
+    monkeypatch.setattr(main, "check_tx_async", slow_check)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://wallet") as http:
+            t0 = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    http.post(
+                        "/api/transfer/async",
+                        json={"tx_id": f"c{i}", "from_wallet": f"w{i}", "to_wallet": f"w{(i + 1) % 10}", "amount": 10.0},
+                    )
+                    for i in range(10)
+                )
+            )
+            return time.perf_counter() - t0, responses
+
+    elapsed, responses = asyncio.run(burst())
+    assert all(r.status_code == 200 and r.json()["status"] == "approved" for r in responses)
+    assert elapsed < 10 * delay / 2  # the AML waits overlapped instead of queueing
+    assert len(client.get("/api/transactions").json()["transactions"]) == 10